@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Deque, Optional
+
+from src.log import logger
+from src.metrics import metrics
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; maps to HTTP 503."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class LoopLagMonitor:
+    """Measure event-loop lag by timing a periodic short sleep.
+
+    When the loop is saturated the sleep wakes up late; the difference
+    between the requested and actual interval is the lag. The monitor runs
+    as a background task on the loop serving requests and is (re)started
+    lazily so it always lives on the current loop.
+    """
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self.lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if (
+            self._task is not None
+            and not self._task.done()
+            and self._task.get_loop() is loop
+        ):
+            return
+        self.lag = 0.0
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lag = max(0.0, loop.time() - start - self.interval)
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+class AdmissionController:
+    """Cap in-flight scrapes with a short, bounded FIFO wait queue.
+
+    Up to `max_inflight` requests run concurrently; the next `max_queue`
+    wait at most `queue_timeout` seconds for a slot. Everything else, and
+    everything arriving while the loop lag exceeds `max_loop_lag`, is
+    rejected immediately so clients can fail fast and retry later.
+    A `max_inflight` of 0 disables the limit (in-flight requests are still
+    counted). Once `start_draining()` is called every new request is
+    rejected while admitted ones finish (see `drain`).
+    """
+
+    def __init__(
+        self,
+        max_inflight: int = 100,
+        max_queue: int = 200,
+        queue_timeout: float = 5.0,
+        max_loop_lag: float = 0.5,
+        retry_after: Optional[int] = None,
+        lag_monitor: Optional[LoopLagMonitor] = None,
+    ):
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_loop_lag = max_loop_lag
+        self.retry_after = (
+            retry_after if retry_after is not None else max(1, math.ceil(queue_timeout))
+        )
+        self.lag_monitor = lag_monitor
+        self.inflight = 0
+        self.draining = False
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @classmethod
+    def from_settings(cls, settings) -> "AdmissionController":
+        max_loop_lag = getattr(settings, "ADMISSION_MAX_LOOP_LAG", 0.5)
+        return cls(
+            max_inflight=getattr(settings, "ADMISSION_MAX_INFLIGHT", 100),
+            max_queue=getattr(settings, "ADMISSION_MAX_QUEUE", 200),
+            queue_timeout=getattr(settings, "ADMISSION_QUEUE_TIMEOUT", 5.0),
+            max_loop_lag=max_loop_lag,
+            retry_after=getattr(settings, "ADMISSION_RETRY_AFTER", None),
+            lag_monitor=LoopLagMonitor() if max_loop_lag > 0 else None,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_inflight > 0
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        metrics.incr("admission.rejected", reason=reason)
+        logger.warning(
+            "Shedding request reason=%s inflight=%s waiting=%s",
+            reason,
+            self.inflight,
+            self.waiting,
+        )
+        return AdmissionRejected(reason, self.retry_after)
+
+    async def acquire(self) -> None:
+        """Take an in-flight slot or raise `AdmissionRejected`."""
+        if self.draining:
+            raise self._reject("draining")
+        if not self.enabled:
+            self.inflight += 1
+            return
+        if self.lag_monitor is not None:
+            self.lag_monitor.ensure_started()
+            if self.max_loop_lag > 0 and self.lag_monitor.lag > self.max_loop_lag:
+                raise self._reject("loop_lag")
+
+        if self.inflight < self.max_inflight and not self._waiters:
+            self.inflight += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise self._reject("queue_full")
+
+        waiter: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait({waiter}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            if waiter.done():
+                # a slot was handed over just before cancellation: pass it on
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            raise
+        metrics.observe("admission.queue_wait_seconds", time.perf_counter() - start)
+        if not waiter.done():
+            waiter.cancel()
+            self._waiters.remove(waiter)
+            raise self._reject("queue_timeout")
+        # the slot was handed over by `release` (inflight already counted)
+
+    def release(self) -> None:
+        """Free a slot, handing it directly to the oldest live waiter."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)
+                return
+        self.inflight = max(0, self.inflight - 1)
+
+    def start_draining(self) -> None:
+        """Reject new requests from now on; admitted ones keep running."""
+        if not self.draining:
+            self.draining = True
+            logger.warning(
+                "Draining: rejecting new requests inflight=%s waiting=%s",
+                self.inflight,
+                self.waiting,
+            )
+
+    async def drain(self, timeout: float, poll: float = 0.05) -> bool:
+        """Stop admitting and wait up to `timeout` seconds for in-flight and
+        queued requests to finish. Returns False if some were still running."""
+        self.start_draining()
+        deadline = time.monotonic() + timeout
+        while self.inflight or self._waiters:
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(poll)
+        return True
+
+
+__all__ = ["AdmissionController", "AdmissionRejected", "LoopLagMonitor"]
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+import gc
+import os
+import signal
+import sys
+from typing import Callable, Optional
+
+from src.adapters.api.admission import AdmissionController
+from src.log import logger
+from src.metrics import metrics
+
+_MiB = 1024 * 1024
+
+
+def read_rss_bytes() -> Optional[int]:
+    """Resident set size of this process from /proc (None where unavailable)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            resident_pages = int(fh.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def trim_heap() -> None:
+    """Collect cyclic garbage and hand free heap pages back to the OS.
+
+    `malloc_trim` only exists in glibc; elsewhere only `gc.collect` runs.
+    Both can take a while on a large heap, so the watchdog calls this from a
+    worker thread: ctypes releases the GIL during `malloc_trim`, and
+    `gc.collect` is one full collection, which holds the GIL, once per check
+    over the limit.
+    """
+    import ctypes
+    import ctypes.util
+
+    gc.collect()
+    libc_name = ctypes.util.find_library("c")
+    if not libc_name:
+        return
+    try:
+        malloc_trim = ctypes.CDLL(libc_name).malloc_trim
+    except (OSError, AttributeError):
+        return
+    malloc_trim(0)
+
+
+def _terminate_self() -> None:
+    # the process manager (gunicorn, uvicorn --workers, k8s) starts a fresh
+    # worker; uvicorn runs the lifespan shutdown on SIGTERM
+    os.kill(os.getpid(), signal.SIGTERM)
+
+
+class MemoryWatchdog:
+    """Recycle the worker when its RSS stays above `max_rss_bytes`.
+
+    Every `interval` seconds the resident size is sampled. Above the limit
+    the heap is trimmed once; if that does not bring it back under, the
+    worker stops admitting scrapes (503 `draining`), waits up to
+    `drain_timeout` seconds for in-flight ones and then calls `recycle`
+    (SIGTERM to itself by default).
+    """
+
+    def __init__(
+        self,
+        admission: AdmissionController,
+        max_rss_bytes: int,
+        interval: float = 5.0,
+        drain_timeout: float = 30.0,
+        read_rss: Callable[[], Optional[int]] = read_rss_bytes,
+        trim: Callable[[], None] = trim_heap,
+        recycle: Callable[[], None] = _terminate_self,
+    ):
+        self.admission = admission
+        self.max_rss_bytes = max_rss_bytes
+        self.interval = interval
+        self.drain_timeout = drain_timeout
+        self._read_rss = read_rss
+        self._trim = trim
+        self._recycle = recycle
+        self.recycling = False
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_settings(
+        cls, settings, admission: AdmissionController
+    ) -> Optional["MemoryWatchdog"]:
+        max_rss_mb = getattr(settings, "MEMORY_MAX_RSS_MB", 0)
+        if max_rss_mb <= 0:
+            return None
+        return cls(
+            admission,
+            max_rss_bytes=int(max_rss_mb * _MiB),
+            interval=getattr(settings, "MEMORY_CHECK_INTERVAL", 5.0),
+            drain_timeout=getattr(settings, "MEMORY_DRAIN_TIMEOUT", 30.0),
+        )
+
+    def start(self) -> None:
+        if self._read_rss() is None:
+            logger.warning("Memory watchdog disabled: RSS not readable here")
+            return
+        self._task = asyncio.get_running_loop().create_task(
+            self._run(), name="memory-watchdog"
+        )
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while not self.recycling:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Memory watchdog check failed")
+
+    async def check(self) -> bool:
+        """Sample RSS once; returns True if the worker is being recycled."""
+        rss = self._read_rss()
+        if rss is None or rss <= self.max_rss_bytes:
+            return False
+        # in a worker thread so scrapes keep being served while the heap is trimmed
+        await asyncio.to_thread(self._trim)
+        trimmed = self._read_rss() or rss
+        metrics.incr("memory.trims")
+        if trimmed <= self.max_rss_bytes:
+            logger.info(
+                "Heap trim brought RSS from %.0f to %.0f MiB",
+                rss / _MiB,
+                trimmed / _MiB,
+            )
+            return False
+
+        self.recycling = True
+        metrics.incr("memory.recycles")
+        logger.warning(
+            "RSS %.0f MiB above limit %.0f MiB (heap blocks=%s); draining and "
+            "recycling the worker",
+            trimmed / _MiB,
+            self.max_rss_bytes / _MiB,
+            sys.getallocatedblocks(),
+        )
+        drained = await self.admission.drain(self.drain_timeout)
+        if not drained:
+            logger.warning(
+                "Drain timed out after %ss with %s scrapes in flight",
+                self.drain_timeout,
+                self.admission.inflight,
+            )
+        self._recycle()
+        return True
+
+
+__all__ = ["MemoryWatchdog", "read_rss_bytes", "trim_heap"]
@@ -1,10 +1,17 @@
 import json
+import time
 from typing import Any, Iterable, List
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
+from src.adapters.api.admission import AdmissionController, AdmissionRejected
 from src.log import logger, new_request_id, request_id_ctx_var
+from src.tracing import tracer
+
+# Paths subject to admission control (the expensive scrape endpoints)
+_ADMISSION_PATHS = ("/scrape", "/scrap")
 
 
 def _parse_allowed_origins(raw: str, allow_all: bool, env: str) -> List[str]:
@@ -54,7 +61,8 @@ def _default_allow_headers() -> Iterable[str]:
 
 
 def add_middlewares(app: FastAPI, settings: Any) -> None:
-    """Configure CORS (if requested) and add the request-id middleware.
+    """Configure CORS (if requested), admission control and the request-id
+    middleware.
 
     This centralizes the middleware configuration so `src/app.py` stays small.
     """
@@ -80,6 +88,31 @@ def add_middlewares(app: FastAPI, settings: Any) -> None:
             allow_credentials,
         )
 
+    admission = AdmissionController.from_settings(settings)
+    app.state.admission = admission
+
+    # Registered before the request-id middleware so it runs inside it and
+    # shed responses still carry X-Request-ID.
+    @app.middleware("http")
+    async def admission_control_middleware(request: Request, call_next):
+        """Cap in-flight scrapes; shed excess load with 503 + Retry-After."""
+        # with the limit disabled scrapes are still counted so a draining
+        # worker (memory watchdog) knows when they are done
+        if not request.url.path.startswith(_ADMISSION_PATHS):
+            return await call_next(request)
+        try:
+            await admission.acquire()
+        except AdmissionRejected as exc:
+            return JSONResponse(
+                status_code=503,
+                content={"detail": f"Server overloaded ({exc.reason}), retry later"},
+                headers={"Retry-After": str(exc.retry_after)},
+            )
+        try:
+            return await call_next(request)
+        finally:
+            admission.release()
+
     @app.middleware("http")
     async def add_request_id_middleware(request: Request, call_next):
         """Ensure a request id exists for every request and populate the log context."""
@@ -89,6 +122,7 @@ def add_middlewares(app: FastAPI, settings: Any) -> None:
             "X-Agent"
         )
         request_id_ctx_var.set(rid)
+        start = time.perf_counter()
         logger.debug(
             "HTTP request start %s %s request_id=%s agent=%s",
             request.method,
@@ -97,16 +131,24 @@ def add_middlewares(app: FastAPI, settings: Any) -> None:
             client_agent,
         )
         try:
-            response = await call_next(request)
+            # root span of the request's trace (trace id = request id)
+            with tracer.span(
+                "http.request", method=request.method, path=request.url.path
+            ) as span:
+                response = await call_next(request)
+                span.set("status_code", getattr(response, "status_code", 0))
         finally:
             request_id_ctx_var.set("-")
         response.headers["X-Request-ID"] = rid
+        duration_ms = (time.perf_counter() - start) * 1000
         logger.debug(
-            "HTTP request end %s %s request_id=%s status=%s agent=%s",
+            "HTTP request end %s %s request_id=%s status=%s agent=%s duration_ms=%.1f",
             request.method,
             request.url.path,
             rid,
             getattr(response, "status_code", "-"),
             client_agent,
+            duration_ms,
+            extra={"request_id": rid, "duration_ms": round(duration_ms, 3)},
         )
         return response
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, FrozenSet, List, Optional
+
+from fastapi import HTTPException, Request, Security, status
+
+from src.adapters.api.security import api_key_header
+from src.log import logger
+
+# Profiling modes accepted in the X-Profile header / `profile` query param
+MODES = frozenset({"sample", "cprofile", "memory"})
+
+# Source files whose allocations are reported separately (scrape hot path)
+_SCRAPE_PATH_FILES = ("*/domain/scrape_service.py", "*/http/scrape_provider_http.py")
+
+
+def _admin_keys() -> FrozenSet[str]:
+    from src.config import api_settings
+
+    raw = getattr(api_settings, "ADMIN_API_KEYS", None) or ""
+    return frozenset(k.strip() for k in raw.split(",") if k.strip())
+
+
+def require_admin(api_key: Optional[str] = Security(api_key_header)) -> str:
+    """Dependency accepting only keys listed in `ADMIN_API_KEYS`."""
+    if not api_key or api_key not in _admin_keys():
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Admin API key required"
+        )
+    return api_key
+
+
+def requested_modes(request: Request) -> FrozenSet[str]:
+    """Profiling modes asked for by the request (empty in the common case)."""
+    raw = request.headers.get("X-Profile") or request.query_params.get("profile")
+    if not raw:
+        return frozenset()
+    modes = frozenset(m.strip().lower() for m in raw.split(",") if m.strip())
+    if "all" in modes:
+        return MODES
+    unknown = modes - MODES
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown profile mode(s): {', '.join(sorted(unknown))}",
+        )
+    return modes
+
+
+class StackSampler:
+    """Sample the stack of one thread at a fixed interval.
+
+    Produces collapsed stacks (`outer;inner;leaf count`), the input format of
+    flamegraph tools. The event loop thread runs every coroutine, so samples
+    include any request served concurrently with the profiled one.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="stack-sampler", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack: List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_filename.rsplit('/', 1)[-1]}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> List[str]:
+        return [f"{stack} {count}" for stack, count in self.samples.most_common()]
+
+
+def _cprofile_top(profiler: cProfile.Profile, limit: int = 40) -> str:
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(limit)
+    return out.getvalue()
+
+
+def _format_diffs(diffs: List[tracemalloc.StatisticDiff]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "location": str(diff.traceback[0]) if diff.traceback else "?",
+            "size_diff_kb": round(diff.size_diff / 1024, 1),
+            "count_diff": diff.count_diff,
+        }
+        for diff in diffs
+        if diff.size_diff
+    ]
+
+
+def _without_profiler(snapshot: tracemalloc.Snapshot) -> tracemalloc.Snapshot:
+    return snapshot.filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        )
+    )
+
+
+def _memory_report(
+    baseline: tracemalloc.Snapshot,
+    snapshot: tracemalloc.Snapshot,
+    baseline_current: int,
+    limit: int = 20,
+) -> Dict[str, Any]:
+    """Memory used while the block ran, relative to its start.
+
+    The parsed document is torn down before the block exits, so what it
+    allocated is gone from `snapshot`; `peak_kb` (the high-water mark above
+    the starting point) is what captures it. `top` and `scrape_path` list
+    the per-line growth still alive at the end.
+    """
+    baseline = _without_profiler(baseline)
+    snapshot = _without_profiler(snapshot)
+    path_filters = tuple(
+        tracemalloc.Filter(True, pattern, all_frames=True)
+        for pattern in _SCRAPE_PATH_FILES
+    )
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "current_kb": round((current - baseline_current) / 1024, 1),
+        "peak_kb": round((peak - baseline_current) / 1024, 1),
+        "top": _format_diffs(snapshot.compare_to(baseline, "lineno")[:limit]),
+        # growth with ScrapeService.scrape / HttpxScrapeProvider.fetch
+        # somewhere in its traceback
+        "scrape_path": _format_diffs(
+            snapshot.filter_traces(path_filters).compare_to(
+                baseline.filter_traces(path_filters), "lineno"
+            )[:limit]
+        ),
+    }
+
+
+class ProfileStore:
+    """Keep the most recent profiles in memory, keyed by request id."""
+
+    def __init__(self, max_entries: int = 50):
+        self.max_entries = max_entries
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def put(self, request_id: str, profile: Dict[str, Any]) -> None:
+        self._profiles[request_id] = profile
+        self._profiles.move_to_end(request_id)
+        while len(self._profiles) > self.max_entries:
+            self._profiles.popitem(last=False)
+
+    def get(self, request_id: str) -> Optional[Dict[str, Any]]:
+        return self._profiles.get(request_id)
+
+    def ids(self) -> List[str]:
+        return list(self._profiles.keys())
+
+
+profile_store = ProfileStore()
+
+# Profilers and tracemalloc are process-global: profile one request at a time
+_busy = threading.Lock()
+
+
+@asynccontextmanager
+async def profile_request(
+    request_id: str, modes: FrozenSet[str], store: ProfileStore = profile_store
+) -> AsyncIterator[Dict[str, Any]]:
+    """Run the enclosed block under the requested profilers.
+
+    The resulting profile is stored under `request_id` (and yielded so the
+    caller can inspect it once the block exits).
+    """
+    if not _busy.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Another request is being profiled",
+        )
+    try:
+        async with _profiled(request_id, modes, store) as profile:
+            yield profile
+    finally:
+        # released even if a profiler or the report building failed
+        _busy.release()
+
+
+@asynccontextmanager
+async def _profiled(
+    request_id: str, modes: FrozenSet[str], store: ProfileStore
+) -> AsyncIterator[Dict[str, Any]]:
+    profile: Dict[str, Any] = {"request_id": request_id, "modes": sorted(modes)}
+    sampler = StackSampler(threading.get_ident()) if "sample" in modes else None
+    profiler = cProfile.Profile() if "cprofile" in modes else None
+    started_tracemalloc = False
+    baseline: Optional[tracemalloc.Snapshot] = None
+    baseline_current = 0
+    if "memory" in modes:
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        else:
+            tracemalloc.start(25)
+            started_tracemalloc = True
+        baseline = tracemalloc.take_snapshot()
+        baseline_current = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    try:
+        if sampler is not None:
+            sampler.start()
+        if profiler is not None:
+            profiler.enable()
+        yield profile
+    finally:
+        profile["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        try:
+            if profiler is not None:
+                profiler.disable()
+                profile["cprofile"] = _cprofile_top(profiler)
+            if sampler is not None:
+                sampler.stop()
+                profile["collapsed_stacks"] = sampler.collapsed()
+            if baseline is not None:
+                profile["memory"] = _memory_report(
+                    baseline, tracemalloc.take_snapshot(), baseline_current
+                )
+            store.put(request_id, profile)
+            logger.info(
+                "Stored profile request_id=%s modes=%s elapsed_ms=%s",
+                request_id,
+                ",".join(sorted(modes)),
+                profile["elapsed_ms"],
+            )
+        except Exception:
+            # a broken report must not fail the profiled request
+            logger.exception("Building profile %s failed", request_id)
+        finally:
+            if sampler is not None:
+                sampler.stop()
+            if started_tracemalloc:
+                tracemalloc.stop()
+
+
+__all__ = [
+    "MODES",
+    "ProfileStore",
+    "StackSampler",
+    "profile_request",
+    "profile_store",
+    "requested_modes",
+    "require_admin",
+]
@@ -0,0 +1,511 @@
+from __future__ import annotations
+
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    Optional,
+    Protocol,
+    Tuple,
+)
+
+from fastapi import Depends, HTTPException, Security, status
+
+from src.adapters.api.security import api_key_header
+from src.log import logger
+
+if TYPE_CHECKING:
+    import sqlite3
+
+# Identity used for requests that do not present an API key
+ANONYMOUS = "anonymous"
+
+
+@dataclass(frozen=True)
+class KeyQuota:
+    """Limits applied to one API key.
+
+    `rate` is the token refill per second and `burst` the bucket size.
+    `max_concurrent` and `daily_bytes` of 0 mean unlimited.
+    """
+
+    rate: float = 10.0
+    burst: int = 20
+    max_concurrent: int = 10
+    daily_bytes: int = 0
+
+
+class QuotaStore(Protocol):
+    """Storage for rate-limit counters.
+
+    Every operation is a single O(1) read-modify-write so a store can be
+    shared across worker processes (see `SQLiteQuotaStore`).
+    """
+
+    def take_token(
+        self, key: str, rate: float, burst: int, now: float, cost: float = 1.0
+    ) -> Tuple[bool, float]:
+        """Refill and try to take `cost` tokens; returns (allowed, tokens left).
+
+        Nothing is taken when fewer than `cost` tokens are available.
+        """
+        ...
+
+    def acquire_slot(self, key: str, limit: int) -> bool: ...
+
+    def release_slot(self, key: str) -> None: ...
+
+    def get_bytes(self, key: str, day: str) -> int: ...
+
+    def add_bytes(self, key: str, day: str, amount: int) -> int: ...
+
+
+def _refill(tokens: float, updated: float, rate: float, burst: int, now: float):
+    return min(float(burst), tokens + max(0.0, now - updated) * rate)
+
+
+class InMemoryQuotaStore:
+    """Per-process counters (default). Limits apply per worker."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._slots: Dict[str, int] = {}
+        self._bytes: Dict[str, Tuple[str, int]] = {}
+
+    def take_token(self, key, rate, burst, now, cost=1.0):
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (float(burst), now))
+            tokens = _refill(tokens, updated, rate, burst, now)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            return allowed, tokens
+
+    def acquire_slot(self, key, limit):
+        with self._lock:
+            current = self._slots.get(key, 0)
+            if limit and current >= limit:
+                return False
+            self._slots[key] = current + 1
+            return True
+
+    def release_slot(self, key):
+        with self._lock:
+            self._slots[key] = max(0, self._slots.get(key, 0) - 1)
+
+    def get_bytes(self, key, day):
+        with self._lock:
+            stored_day, total = self._bytes.get(key, (day, 0))
+            return total if stored_day == day else 0
+
+    def add_bytes(self, key, day, amount):
+        with self._lock:
+            stored_day, total = self._bytes.get(key, (day, 0))
+            total = (total if stored_day == day else 0) + amount
+            self._bytes[key] = (day, total)
+            return total
+
+
+class SQLiteQuotaStore:
+    """Counters in a local SQLite file, shared by every worker on the host.
+
+    Each operation runs in its own `BEGIN IMMEDIATE` transaction on
+    primary-key rows, so concurrent workers serialize on the database lock
+    and costs stay constant per request. The calls run on the event loop, so
+    a worker waits at most `busy_timeout` seconds for the lock: if it is
+    still held, taking a token or a slot counts as limited (429), while
+    slot releases and byte counts are kept in memory and applied by the next
+    transaction that gets the lock. Concurrency slots held by a worker that
+    crashes are not reclaimed until the file is reset.
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 0.05):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        # bookkeeping that could not get the lock: key -> slots to release,
+        # (key, day) -> bytes to add
+        self._pending_lock = threading.Lock()
+        self._pending_slots: Dict[str, int] = {}
+        self._pending_bytes: Dict[Tuple[str, str], int] = {}
+        with self._tx() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS slots "
+                "(key TEXT PRIMARY KEY, used INTEGER NOT NULL)"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS usage "
+                "(key TEXT PRIMARY KEY, day TEXT NOT NULL, bytes INTEGER NOT NULL)"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            import sqlite3  # only the sqlite store needs it
+
+            conn = sqlite3.connect(
+                self.path, timeout=self.busy_timeout, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _tx(self) -> Iterator[sqlite3.Connection]:
+        db = self._conn()
+        db.execute("BEGIN IMMEDIATE")
+        # holding the write lock now: fold in bookkeeping that missed it
+        with self._pending_lock:
+            slots, self._pending_slots = self._pending_slots, {}
+            added, self._pending_bytes = self._pending_bytes, {}
+        try:
+            for key, count in slots.items():
+                self._release(db, key, count)
+            for (key, day), amount in added.items():
+                self._add_bytes(db, key, day, amount)
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            with self._pending_lock:
+                for key, count in slots.items():
+                    self._pending_slots[key] = self._pending_slots.get(key, 0) + count
+                for day_key, amount in added.items():
+                    pending = self._pending_bytes.get(day_key, 0) + amount
+                    self._pending_bytes[day_key] = pending
+            raise
+        db.execute("COMMIT")
+
+    def take_token(self, key, rate, burst, now, cost=1.0):
+        try:
+            with self._tx() as db:
+                row = db.execute(
+                    "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+                ).fetchone()
+                tokens, updated = row if row else (float(burst), now)
+                tokens = _refill(tokens, updated, rate, burst, now)
+                allowed = tokens >= cost
+                if allowed:
+                    tokens -= cost
+                db.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated) "
+                    "VALUES (?, ?, ?)",
+                    (key, tokens, now),
+                )
+                return allowed, tokens
+        except _locked_errors() as exc:
+            logger.warning("Rate-limit store busy, limiting %s: %s", key[:6], exc)
+            return False, 0.0
+
+    def acquire_slot(self, key, limit):
+        try:
+            with self._tx() as db:
+                row = db.execute(
+                    "SELECT used FROM slots WHERE key = ?", (key,)
+                ).fetchone()
+                used = row[0] if row else 0
+                if limit and used >= limit:
+                    return False
+                db.execute(
+                    "INSERT OR REPLACE INTO slots (key, used) VALUES (?, ?)",
+                    (key, used + 1),
+                )
+                return True
+        except _locked_errors() as exc:
+            logger.warning("Rate-limit store busy, limiting %s: %s", key[:6], exc)
+            return False
+
+    def release_slot(self, key):
+        try:
+            with self._tx() as db:
+                self._release(db, key, 1)
+        except _locked_errors():
+            with self._pending_lock:
+                self._pending_slots[key] = self._pending_slots.get(key, 0) + 1
+
+    def get_bytes(self, key, day):
+        # WAL readers never wait for the writer lock
+        row = (
+            self._conn()
+            .execute("SELECT day, bytes FROM usage WHERE key = ?", (key,))
+            .fetchone()
+        )
+        total = row[1] if row and row[0] == day else 0
+        with self._pending_lock:
+            return total + self._pending_bytes.get((key, day), 0)
+
+    def add_bytes(self, key, day, amount):
+        try:
+            with self._tx() as db:
+                return self._add_bytes(db, key, day, amount)
+        except _locked_errors():
+            with self._pending_lock:
+                pending = self._pending_bytes.get((key, day), 0) + amount
+                self._pending_bytes[key, day] = pending
+            return self.get_bytes(key, day)
+
+    @staticmethod
+    def _release(db: sqlite3.Connection, key: str, count: int) -> None:
+        db.execute(
+            "UPDATE slots SET used = MAX(0, used - ?) WHERE key = ?", (count, key)
+        )
+
+    @staticmethod
+    def _add_bytes(db: sqlite3.Connection, key: str, day: str, amount: int) -> int:
+        row = db.execute(
+            "SELECT day, bytes FROM usage WHERE key = ?", (key,)
+        ).fetchone()
+        total = (row[1] if row and row[0] == day else 0) + amount
+        db.execute(
+            "INSERT OR REPLACE INTO usage (key, day, bytes) VALUES (?, ?, ?)",
+            (key, day, total),
+        )
+        return total
+
+
+def _locked_errors() -> type:
+    import sqlite3
+
+    # "database is locked" once busy_timeout expires
+    return sqlite3.OperationalError
+
+
+def parse_api_keys(raw: Optional[str], default: KeyQuota) -> Dict[str, KeyQuota]:
+    """Parse the API_KEYS setting.
+
+    Accepts a JSON object mapping each key to its (partial) quota, e.g.
+    `{"k1": {"rate": 5, "daily_bytes": 1000000}}`, or a comma-separated list
+    of keys that all get the default quota.
+    """
+    raw = (raw or "").strip()
+    if not raw:
+        return {}
+    if raw.startswith("{"):
+        parsed: Dict[str, Any] = json.loads(raw)
+        return {
+            key: KeyQuota(**{**default.__dict__, **(overrides or {})})
+            for key, overrides in parsed.items()
+        }
+    return {k.strip(): default for k in raw.split(",") if k.strip()}
+
+
+@dataclass
+class RateLimitContext:
+    """Outcome of the rate-limit check for one request."""
+
+    identity: str
+    quota: KeyQuota
+    remaining: float
+    bytes_used: int = 0
+    # limiter that issued the context, so routes charge the same store
+    limiter: Optional["RateLimiter"] = field(default=None, repr=False)
+
+    def take_tokens(self, count: int) -> None:
+        """Charge `count` more tokens (HTTP 429 if the bucket is short)."""
+        if self.limiter is not None:
+            self.limiter.take(self, count)
+
+    def record_bytes(self, amount: int) -> None:
+        """Count `amount` bytes against this caller's daily quota."""
+        if self.limiter is not None:
+            self.limiter.record_bytes(self, amount)
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "X-RateLimit-Limit": str(self.quota.burst),
+            "X-RateLimit-Remaining": str(max(0, int(self.remaining))),
+            # seconds until the bucket is full again
+            "X-RateLimit-Reset": str(
+                math.ceil((self.quota.burst - self.remaining) / self.quota.rate)
+                if self.quota.rate > 0
+                else 0
+            ),
+        }
+        if self.quota.daily_bytes:
+            headers["X-RateLimit-Bytes-Limit"] = str(self.quota.daily_bytes)
+            headers["X-RateLimit-Bytes-Remaining"] = str(
+                max(0, self.quota.daily_bytes - self.bytes_used)
+            )
+        return headers
+
+
+class RateLimiter:
+    """Per-API-key token bucket, concurrency and daily byte quotas."""
+
+    def __init__(
+        self,
+        quotas: Dict[str, KeyQuota],
+        default_quota: KeyQuota,
+        store: Optional[QuotaStore] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.quotas = quotas
+        self.default_quota = default_quota
+        self.store: QuotaStore = store or InMemoryQuotaStore()
+        self._clock = clock
+
+    def identify(self, api_key: Optional[str]) -> Tuple[str, KeyQuota]:
+        """Map a presented key to (identity, quota); unknown keys are rejected.
+
+        Requests without a key share the `anonymous` identity and default
+        quota, so the open scrape endpoint keeps working but is bounded.
+        """
+        if not api_key:
+            return ANONYMOUS, self.default_quota
+        quota = self.quotas.get(api_key)
+        if quota is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Invalid or missing API key",
+            )
+        return api_key, quota
+
+    def _today(self) -> str:
+        return datetime.fromtimestamp(self._clock(), tz=timezone.utc).strftime(
+            "%Y-%m-%d"
+        )
+
+    def check(self, identity: str, quota: KeyQuota) -> RateLimitContext:
+        """Take a request token and check the daily byte quota.
+
+        Raises HTTP 429 (with rate-limit headers and Retry-After) when over.
+        """
+        allowed, remaining = self.store.take_token(
+            identity, quota.rate, quota.burst, self._clock()
+        )
+        ctx = RateLimitContext(identity, quota, remaining, limiter=self)
+        if quota.daily_bytes:
+            ctx.bytes_used = self.store.get_bytes(identity, self._today())
+        if not allowed:
+            retry_after = math.ceil((1.0 - remaining) / quota.rate) if quota.rate else 1
+            raise self._too_many(ctx, "Rate limit exceeded", retry_after)
+        if quota.daily_bytes and ctx.bytes_used >= quota.daily_bytes:
+            raise self._too_many(
+                ctx, "Daily byte quota exceeded", self._until_midnight()
+            )
+        return ctx
+
+    def take(self, ctx: RateLimitContext, count: int) -> None:
+        """Take `count` more tokens for work beyond the request itself.
+
+        All or nothing: raises HTTP 429 without taking any when the bucket
+        holds fewer than `count` tokens.
+        """
+        if count <= 0:
+            return
+        quota = ctx.quota
+        allowed, ctx.remaining = self.store.take_token(
+            ctx.identity, quota.rate, quota.burst, self._clock(), cost=count
+        )
+        if not allowed:
+            retry_after = (
+                math.ceil((count - ctx.remaining) / quota.rate) if quota.rate else 1
+            )
+            raise self._too_many(ctx, "Rate limit exceeded", retry_after)
+
+    def acquire(self, ctx: RateLimitContext) -> None:
+        if not self.store.acquire_slot(ctx.identity, ctx.quota.max_concurrent):
+            raise self._too_many(ctx, "Too many concurrent scrapes", 1)
+
+    def release(self, ctx: RateLimitContext) -> None:
+        self.store.release_slot(ctx.identity)
+
+    def record_bytes(self, ctx: RateLimitContext, amount: int) -> None:
+        if ctx.quota.daily_bytes:
+            ctx.bytes_used = self.store.add_bytes(ctx.identity, self._today(), amount)
+
+    def _until_midnight(self) -> int:
+        now = self._clock()
+        return max(1, int(86400 - now % 86400))
+
+    def _too_many(
+        self, ctx: RateLimitContext, detail: str, retry_after: int
+    ) -> HTTPException:
+        logger.info("Rate limited identity=%s: %s", ctx.identity[:6], detail)
+        headers = ctx.headers()
+        headers["Retry-After"] = str(max(1, retry_after))
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers=headers,
+        )
+
+
+@lru_cache(maxsize=1)
+def get_rate_limiter() -> RateLimiter:
+    """Build the process-wide limiter from `api_settings` (overridable in tests)."""
+    from src.config import api_settings
+
+    default = KeyQuota(
+        rate=api_settings.RATE_LIMIT_DEFAULT_RATE,
+        burst=api_settings.RATE_LIMIT_DEFAULT_BURST,
+        max_concurrent=api_settings.RATE_LIMIT_DEFAULT_CONCURRENCY,
+        daily_bytes=api_settings.RATE_LIMIT_DEFAULT_DAILY_BYTES,
+    )
+    quotas = parse_api_keys(api_settings.API_KEYS, default)
+    if api_settings.API_KEY:
+        quotas.setdefault(api_settings.API_KEY, default)
+    for admin_key in (api_settings.ADMIN_API_KEYS or "").split(","):
+        if admin_key.strip():
+            quotas.setdefault(admin_key.strip(), default)
+    store: QuotaStore
+    if api_settings.RATE_LIMIT_STORE.lower() == "sqlite":
+        store = SQLiteQuotaStore(
+            api_settings.RATE_LIMIT_SQLITE_PATH,
+            busy_timeout=api_settings.RATE_LIMIT_SQLITE_BUSY_TIMEOUT,
+        )
+    else:
+        store = InMemoryQuotaStore()
+    return RateLimiter(quotas, default, store)
+
+
+async def enforce_rate_limit(
+    api_key: Optional[str] = Security(api_key_header),
+    limiter: RateLimiter = Depends(get_rate_limiter),
+):
+    """Dependency enforcing the caller's quotas around one scrape.
+
+    Yields the `RateLimitContext` so the route can attach `X-RateLimit-*`
+    headers and record the fetched bytes against the daily byte quota.
+    Error responses raised by the route get the same headers, so clients can
+    back off on 4xx/5xx too.
+    """
+    identity, quota = limiter.identify(api_key)
+    ctx = limiter.check(identity, quota)
+    limiter.acquire(ctx)
+    try:
+        yield ctx
+    except HTTPException as exc:
+        exc.headers = {**ctx.headers(), **(exc.headers or {})}
+        raise
+    finally:
+        limiter.release(ctx)
+
+
+__all__ = [
+    "ANONYMOUS",
+    "InMemoryQuotaStore",
+    "KeyQuota",
+    "QuotaStore",
+    "RateLimitContext",
+    "RateLimiter",
+    "SQLiteQuotaStore",
+    "enforce_rate_limit",
+    "get_rate_limiter",
+    "parse_api_keys",
+]
@@ -1,3 +1,3 @@
-from . import health, scrape
+from . import admin, health, monitors, scrape
 
-__all__ = ["health", "scrape"]
+__all__ = ["admin", "health", "monitors", "scrape"]
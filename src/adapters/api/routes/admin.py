@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import JSONResponse
+
+from src.adapters.api.profiling import profile_store, require_admin
+
+# Rutas administrativas: solo claves listadas en ADMIN_API_KEYS
+router = APIRouter(prefix="/admin", tags=["admin"])
+router.dependencies = [Depends(require_admin)]
+
+
+@router.get("/profiles", status_code=status.HTTP_200_OK)
+async def list_profiles():
+    """Request ids of the stored profiles, oldest first."""
+    return JSONResponse(content={"profiles": profile_store.ids()})
+
+
+@router.get("/profiles/{request_id}", status_code=status.HTTP_200_OK)
+async def get_profile(request_id: str):
+    """Profile captured for `request_id` (collapsed stacks, cProfile, memory)."""
+    profile = profile_store.get(request_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return JSONResponse(content=profile)
+
+
+@router.get("/proxies", status_code=status.HTTP_200_OK)
+async def list_proxies():
+    """Health, latency and throughput of each upstream proxy (if configured)."""
+    # Import facade at request-time to avoid circular imports
+    from src.application.api_app import api_facade
+
+    pool = api_facade.proxy_pool()
+    return JSONResponse(content={"proxies": pool.snapshot() if pool else []})
@@ -23,3 +23,11 @@ async def health_check():
         content={"project_name": project_name, "environment": environment},
         status_code=status.HTTP_200_OK,
     )
+
+
+@router.get("/metrics", status_code=status.HTTP_200_OK)
+async def metrics_snapshot():
+    """In-process metrics (counters and timing summaries) as JSON."""
+    from src.metrics import metrics
+
+    return JSONResponse(content=metrics.snapshot(), status_code=status.HTTP_200_OK)
@@ -0,0 +1,145 @@
+import json
+import time
+from dataclasses import asdict
+from typing import Dict, Optional
+from uuid import uuid4
+
+from fastapi import APIRouter, Depends, HTTPException, Security, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, HttpUrl, field_validator
+
+from src.adapters.api.ratelimit import ANONYMOUS
+from src.adapters.api.routes.scrape import (
+    Selectors,
+    selectors_to_domain,
+    validate_selectors,
+)
+from src.adapters.api.security import api_key_header, get_api_key, key_namespace
+from src.config import api_settings
+from src.domain.monitor import Monitor
+from src.log import logger
+
+router = APIRouter(prefix="/monitors", tags=["monitors"])
+router.dependencies = [Depends(get_api_key)]
+
+# Seconds between SSE keep-alive comments when no change happens
+_KEEPALIVE_SECONDS = 15.0
+
+
+class MonitorCreate(BaseModel):
+    url: HttpUrl
+    # selectors: mapping of name -> CSS selector or selector object (as /scrape)
+    selectors: Selectors
+    interval: float = 300.0
+    jitter: float = 0.0
+    headers: Dict[str, str] | None = None
+    timeout: float | None = 10.0
+    respect_robots: bool = True
+
+    _check_selectors = field_validator("selectors")(validate_selectors)
+
+
+def _scheduler():
+    # Import at request-time to avoid circular imports
+    from src.application.api_app import monitor_scheduler
+
+    return monitor_scheduler
+
+
+def _owner(api_key: Optional[str] = Security(api_key_header)) -> str:
+    """Hashed identity of the calling key; monitors are scoped to it."""
+    return key_namespace(api_key or ANONYMOUS)
+
+
+def _owned_monitor(monitor_id: str, owner: str) -> Monitor:
+    # other keys' monitors are reported as missing, not forbidden, so ids
+    # cannot be probed
+    monitor = _scheduler().get(monitor_id)
+    if monitor is None or monitor.owner != owner:
+        raise HTTPException(status_code=404, detail="Monitor not found")
+    return monitor
+
+
+def _monitor_json(monitor: Monitor) -> dict:
+    data = asdict(monitor)
+    data.pop("last_body_hash", None)
+    data.pop("last_fingerprint", None)
+    data.pop("owner", None)
+    # request headers may carry credentials for the target site
+    data.pop("headers", None)
+    return data
+
+
+@router.post("", status_code=status.HTTP_201_CREATED)
+async def create_monitor(body: MonitorCreate, owner: str = Depends(_owner)):
+    scheduler = _scheduler()
+    if body.interval < api_settings.MONITOR_MIN_INTERVAL:
+        raise HTTPException(
+            status_code=422,
+            detail=f"interval must be >= {api_settings.MONITOR_MIN_INTERVAL}s",
+        )
+    if len(scheduler.list_monitors()) >= api_settings.MONITOR_MAX_COUNT:
+        raise HTTPException(status_code=409, detail="Too many monitors")
+    if len(scheduler.list_monitors(owner)) >= api_settings.MONITOR_MAX_PER_KEY:
+        raise HTTPException(
+            status_code=409, detail="Too many monitors for this API key"
+        )
+
+    monitor = scheduler.add(
+        Monitor(
+            id=uuid4().hex,
+            url=str(body.url),
+            selectors=selectors_to_domain(body.selectors),
+            interval=body.interval,
+            jitter=max(0.0, min(body.jitter, body.interval)),
+            headers=body.headers,
+            timeout=body.timeout,
+            respect_robots=body.respect_robots,
+            owner=owner,
+        )
+    )
+    logger.info("API: monitor %s created url=%s", monitor.id, monitor.url)
+    return JSONResponse(
+        content=_monitor_json(monitor), status_code=status.HTTP_201_CREATED
+    )
+
+
+@router.get("", status_code=status.HTTP_200_OK)
+async def list_monitors(owner: str = Depends(_owner)):
+    monitors = _scheduler().list_monitors(owner)
+    return JSONResponse(content={"monitors": [_monitor_json(m) for m in monitors]})
+
+
+@router.get("/{monitor_id}", status_code=status.HTTP_200_OK)
+async def get_monitor(monitor_id: str, owner: str = Depends(_owner)):
+    monitor = _owned_monitor(monitor_id, owner)
+    return JSONResponse(content=_monitor_json(monitor))
+
+
+@router.delete("/{monitor_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_monitor(monitor_id: str, owner: str = Depends(_owner)):
+    _owned_monitor(monitor_id, owner)
+    _scheduler().remove(monitor_id)
+    return None
+
+
+@router.get("/{monitor_id}/events")
+async def monitor_events(monitor_id: str, owner: str = Depends(_owner)):
+    """Server-Sent Events stream with the per-key diffs of one monitor."""
+    _owned_monitor(monitor_id, owner)
+    scheduler = _scheduler()
+
+    subscription = scheduler.subscription(monitor_id)
+
+    async def _stream():
+        try:
+            while scheduler.get(monitor_id) is not None:
+                event = await subscription.get(timeout=_KEEPALIVE_SECONDS)
+                if event is None:
+                    yield f": keep-alive {int(time.time())}\n\n"
+                    continue
+                yield f"event: change\ndata: {json.dumps(event.to_dict())}\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(_stream(), media_type="text/event-stream")
@@ -1,30 +1,112 @@
-from typing import Any, Dict
+import os
+import re
+from contextlib import nullcontext
+from typing import Any, Dict, List, Literal, Union
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, ConfigDict, HttpUrl, field_validator, model_validator
 
+from src.adapters.api.profiling import (
+    profile_request,
+    requested_modes,
+    require_admin,
+)
+from src.adapters.api.ratelimit import (
+    ANONYMOUS,
+    RateLimitContext,
+    enforce_rate_limit,
+)
+from src.adapters.api.security import key_namespace
+from src.config import api_settings
 from src.domain.exceptions import ScrapeError
 from src.domain.scrape import ScrapeRequest as DomainScrapeRequest
-from src.log import logger
+from src.domain.selectors import SelectorInput, parse_selectors, parse_spec
+from src.log import logger, request_id_ctx_var
 
 router = APIRouter(tags=["scrape"])
 
+# File extension per sink kind accepted by /scrape/batch
+_SINK_EXTENSIONS = {"jsonl": ".jsonl", "parquet": ".parquet", "sqlite": ".sqlite3"}
+_SINK_NAME_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class SelectorSpecModel(BaseModel):
+    """Selector object: attribute / HTML extraction or a record of fields."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    selector: str = ""
+    extract: Literal["text", "attr", "html", "outer_html"] | None = None
+    attr: str | None = None
+    # record fields evaluated inside each match of `selector`
+    fields: Dict[str, Union[str, "SelectorSpecModel"]] | None = None
+    many: bool = True
+
+    @model_validator(mode="after")
+    def _check(self) -> "SelectorSpecModel":
+        parse_spec(self.model_dump(exclude_none=True), nested=True)
+        return self
+
+
+Selectors = Dict[str, Union[str, SelectorSpecModel]]
+
+
+def validate_selectors(selectors: Selectors) -> Selectors:
+    parse_selectors(selectors_to_domain(selectors))
+    return selectors
+
+
+def selectors_to_domain(selectors: Selectors) -> Dict[str, SelectorInput]:
+    return {
+        name: sel if isinstance(sel, str) else sel.model_dump(exclude_none=True)
+        for name, sel in selectors.items()
+    }
+
 
 class ScrapeRequest(BaseModel):
     url: HttpUrl
-    # selectors: mapping of name -> CSS selector
-    selectors: Dict[str, str]
+    # selectors: mapping of name -> CSS selector or selector object, e.g.
+    # {"links": {"selector": "a", "attr": "href"}} or
+    # {"cards": {"selector": ".card", "fields": {"title": "h2", "price": ".price"}}}
+    selectors: Selectors
     # optional headers to send with the request
     headers: Dict[str, str] | None = None
     timeout: float | None = 10.0
     # If provided and false, the server will skip robots.txt checks (useful for dev)
     respect_robots: bool | None = True
 
+    _check_selectors = field_validator("selectors")(validate_selectors)
+
+
+class BatchScrapeRequest(BaseModel):
+    items: List[ScrapeRequest]
+    sink: Literal["jsonl", "parquet", "sqlite"] = "jsonl"
+    # output file name (without extension) in the caller's directory under
+    # SINK_DIR; defaults to the request id. jsonl/sqlite outputs are
+    # appended to if they exist.
+    name: str | None = None
+
+
+def _to_domain(request: ScrapeRequest) -> DomainScrapeRequest:
+    return DomainScrapeRequest(
+        url=str(request.url),
+        selectors=selectors_to_domain(request.selectors),
+        headers=request.headers,
+        timeout=request.timeout,
+        respect_robots=(
+            request.respect_robots if request.respect_robots is not None else True
+        ),
+    )
+
 
 @router.post("/scrape", response_model=None, status_code=status.HTTP_200_OK)
 @router.post("/scrap", response_model=None, status_code=status.HTTP_200_OK)
-async def scrape_route(request: ScrapeRequest):
+async def scrape_route(
+    request: ScrapeRequest,
+    http_request: Request,
+    quota: RateLimitContext = Depends(enforce_rate_limit),
+):
     logger.info(
         "API: scrape request url=%s selectors=%s",
         request.url,
@@ -35,17 +117,19 @@ async def scrape_route(request: ScrapeRequest):
     from src.application.api_app import api_facade
 
     # Build domain request and delegate to the application facade
-    domain_req = DomainScrapeRequest(
-        url=str(request.url),
-        selectors=request.selectors,
-        headers=request.headers,
-        timeout=request.timeout,
-        respect_robots=(
-            request.respect_robots if request.respect_robots is not None else True
-        ),
-    )
+    domain_req = _to_domain(request)
+    # On-demand profiling (admin only); a plain header lookup otherwise.
+    profile_modes = requested_modes(http_request)
+    profile_scope: Any = nullcontext()
+    if profile_modes:
+        require_admin(http_request.headers.get("X-API-Key"))
+        profile_scope = profile_request(request_id_ctx_var.get(), profile_modes)
+
     try:
-        result = await api_facade.scrape(domain_req)
+        async with profile_scope:
+            result = await api_facade.scrape(domain_req)
+    except HTTPException:
+        raise
     except ScrapeError as exc:
         # Remote site responded with an error or network problem occurred.
         logger.exception("Facade error during scrape %s", request.url)
@@ -65,6 +149,90 @@ async def scrape_route(request: ScrapeRequest):
         raise HTTPException(status_code=500, detail="internal server error")
 
     # `result` is a domain ScrapeResult; convert to JSON-friendly structure
-    return JSONResponse(
+    response = JSONResponse(
         content={"url": result.url, "data": result.data}, status_code=status.HTTP_200_OK
     )
+    # same measure as /scrape/batch: the size of the page fetched
+    quota.record_bytes((result.meta or {}).get("bytes", 0))
+    response.headers.update(quota.headers())
+    if profile_modes:
+        response.headers["X-Profile-Id"] = request_id_ctx_var.get()
+    return response
+
+
+@router.post("/scrape/batch", response_model=None, status_code=status.HTTP_200_OK)
+async def scrape_batch_route(
+    request: BatchScrapeRequest,
+    quota: RateLimitContext = Depends(enforce_rate_limit),
+):
+    """Scrape many URLs into a server-side sink file instead of the response.
+
+    Output files live in a directory of their own per API key, so callers
+    cannot read or append to each other's results.
+    """
+    if quota.identity == ANONYMOUS:
+        raise HTTPException(
+            status_code=403, detail="An API key is required for batch scrapes"
+        )
+    if not request.items:
+        raise HTTPException(status_code=400, detail="items must not be empty")
+    if len(request.items) > api_settings.SCRAPE_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {api_settings.SCRAPE_BATCH_MAX_ITEMS} items per batch",
+        )
+    # one token per item: the dependency already took the first
+    if len(request.items) > quota.quota.burst:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {quota.quota.burst} items per batch for this API key",
+        )
+    name = request.name or request_id_ctx_var.get()
+    if not _SINK_NAME_RE.match(name):
+        raise HTTPException(status_code=400, detail="Invalid sink name")
+
+    filename = name + _SINK_EXTENSIONS[request.sink]
+    key_dir = os.path.join(api_settings.SINK_DIR, key_namespace(quota.identity))
+    os.makedirs(key_dir, exist_ok=True)
+    path = os.path.join(key_dir, filename)
+    if request.sink == "parquet" and os.path.exists(path):
+        # parquet files cannot be appended to
+        raise HTTPException(status_code=409, detail="Sink file already exists")
+
+    quota.take_tokens(len(request.items) - 1)
+
+    from src.application.api_app import api_facade
+    from src.application.factory import build_sink
+
+    logger.info(
+        "API: scrape batch items=%s sink=%s path=%s",
+        len(request.items),
+        request.sink,
+        path,
+    )
+    try:
+        sink = build_sink(request.sink, path)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=501, detail=str(exc))
+    try:
+        try:
+            counts = await api_facade.scrape_batch(
+                (_to_domain(item) for item in request.items),
+                sink,
+                concurrency=api_settings.SCRAPE_BATCH_CONCURRENCY,
+            )
+        finally:
+            # a batch that cannot be written fails the call
+            await sink.close()
+    except Exception:
+        logger.exception("Unexpected error during scrape batch")
+        raise HTTPException(status_code=500, detail="internal server error")
+
+    response = JSONResponse(
+        content={"sink": request.sink, "name": filename, **counts},
+        status_code=status.HTTP_200_OK,
+    )
+    # the pages go to the sink, not the response: charge what was fetched
+    quota.record_bytes(counts["bytes"])
+    response.headers.update(quota.headers())
+    return response
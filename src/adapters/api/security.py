@@ -1,3 +1,4 @@
+import hashlib
 from typing import Optional
 
 from fastapi import HTTPException, Security, status
@@ -8,18 +9,33 @@ from src.config import api_settings
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 
+def key_namespace(identity: str) -> str:
+    """Short stable hash of a key identity, used to scope per-key resources.
+
+    The key itself must not end up in file names, directory listings or
+    in-memory records that other callers can see.
+    """
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()[:16]
+
+
 def get_api_key(api_key: Optional[str] = Security(api_key_header)) -> None:
-    """Dependency that validates X-API-Key header against api_settings.API_KEY.
+    """Dependency that validates X-API-Key header against the configured keys.
 
-    If `api_settings.API_KEY` is not set, the dependency is a no-op (allows requests).
-    Otherwise it raises HTTP 403 if the header is missing or does not match.
+    Valid keys are `api_settings.API_KEY` plus any key listed in
+    `api_settings.API_KEYS`. If none is set, the dependency is a no-op (allows
+    requests). Otherwise it raises HTTP 403 if the header is missing or unknown.
     """
     expected = getattr(api_settings, "API_KEY", None)
-    if not expected:
+    if not expected and not getattr(api_settings, "API_KEYS", None):
         # API key protection disabled
         return None
 
-    if not api_key or api_key != expected:
+    # Lazy import: the rate limiter module depends on this one
+    from src.adapters.api.ratelimit import get_rate_limiter
+
+    if not api_key or (
+        api_key != expected and api_key not in get_rate_limiter().quotas
+    ):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Invalid or missing API key",
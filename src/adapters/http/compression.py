@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import zlib
+from functools import lru_cache
+from importlib import import_module
+from typing import Any, List, Optional
+
+# Only codings whose decoder can cap the output of every step are offered:
+# zlib's `max_length`, brotli's `output_buffer_limit` (brotli >= 1.1) and
+# zstandard's `stream_writer`, which hands output over in `write_size`
+# pieces. Older brotli releases and brotlicffi cannot, so br is then left out.
+_ENCODINGS = ["gzip", "deflate"]
+
+# Largest piece the zstd decoder hands over at once
+_ZSTD_WRITE_SIZE = 64 * 1024
+
+
+class DecompressionLimitExceeded(Exception):
+    """Decoded output would exceed the caller's byte budget."""
+
+
+class DecompressionError(Exception):
+    """The body is not valid data for its Content-Encoding."""
+
+
+@lru_cache(maxsize=None)
+def _optional_module(name: str) -> Any:
+    try:
+        return import_module(name)
+    except ImportError:
+        return None
+
+
+def _brotli() -> Any:
+    brotli = _optional_module("brotli")
+    # can_accept_more_data shipped together with output_buffer_limit
+    if brotli is None or not hasattr(brotli.Decompressor, "can_accept_more_data"):
+        return None
+    return brotli
+
+
+def supported_encodings() -> List[str]:
+    """Content codings we can decode, most preferred first."""
+    encodings = []
+    if _optional_module("zstandard") is not None:
+        encodings.append("zstd")
+    if _brotli() is not None:
+        encodings.append("br")
+    return encodings + _ENCODINGS
+
+
+def accept_encoding() -> str:
+    return ", ".join(supported_encodings())
+
+
+class _ZlibDecoder:
+    def __init__(self, wbits: int):
+        self._wbits = wbits
+        self._obj = zlib.decompressobj(wbits)
+        self._first = True
+
+    def decode(self, data: bytes, budget: int) -> bytes:
+        out: List[bytes] = []
+        produced = 0
+        try:
+            while data:
+                # max_length bounds every step; leftovers stay in unconsumed_tail
+                piece = self._obj.decompress(data, budget - produced + 1)
+                self._first = False
+                produced += len(piece)
+                if produced > budget:
+                    raise DecompressionLimitExceeded()
+                out.append(piece)
+                data = self._obj.unconsumed_tail
+        except zlib.error as exc:
+            if self._first and self._wbits == zlib.MAX_WBITS:
+                # "deflate" is sometimes sent as a raw deflate stream
+                self._wbits = -zlib.MAX_WBITS
+                self._obj = zlib.decompressobj(self._wbits)
+                return self.decode(data, budget)
+            raise DecompressionError(str(exc)) from exc
+        return b"".join(out)
+
+
+class _BrotliDecoder:
+    def __init__(self, brotli: Any):
+        self._error = brotli.error
+        self._obj = brotli.Decompressor()
+
+    def decode(self, data: bytes, budget: int) -> bytes:
+        out: List[bytes] = []
+        produced = 0
+        try:
+            while not self._obj.is_finished():
+                # the limit bounds every step (it may overshoot by one internal
+                # buffer); pending output is drained with empty input
+                piece = self._obj.process(
+                    data, output_buffer_limit=budget - produced + 1
+                )
+                data = b""
+                if not piece:
+                    break
+                produced += len(piece)
+                if produced > budget:
+                    raise DecompressionLimitExceeded()
+                out.append(piece)
+        except self._error as exc:
+            raise DecompressionError(str(exc)) from exc
+        return b"".join(out)
+
+
+class _BudgetWriter:
+    """Sink of the zstd stream writer that stops as soon as the budget is spent."""
+
+    def __init__(self) -> None:
+        self.budget = 0
+        self.produced = 0
+        self.out: List[bytes] = []
+
+    def write(self, piece: bytes) -> int:
+        self.produced += len(piece)
+        if self.produced > self.budget:
+            raise DecompressionLimitExceeded()
+        self.out.append(bytes(piece))
+        return len(piece)
+
+
+class _ZstdDecoder:
+    def __init__(self, zstandard: Any):
+        self._error = zstandard.ZstdError
+        self._sink = _BudgetWriter()
+        self._writer = zstandard.ZstdDecompressor().stream_writer(
+            self._sink, write_size=_ZSTD_WRITE_SIZE
+        )
+
+    def decode(self, data: bytes, budget: int) -> bytes:
+        self._sink.budget, self._sink.produced, self._sink.out = budget, 0, []
+        try:
+            self._writer.write(data)
+        except self._error as exc:
+            raise DecompressionError(str(exc)) from exc
+        return b"".join(self._sink.out)
+
+
+class _IdentityDecoder:
+    def decode(self, data: bytes, budget: int) -> bytes:
+        if len(data) > budget:
+            raise DecompressionLimitExceeded()
+        return data
+
+
+def make_decoder(content_encoding: Optional[str]) -> Any:
+    """Decoder for a Content-Encoding value; None if it is not supported.
+
+    `decoder.decode(chunk, budget)` returns the decoded bytes of `chunk` and
+    raises `DecompressionLimitExceeded` as soon as they exceed `budget`.
+    """
+    codings = [
+        c.strip().lower()
+        for c in (content_encoding or "").split(",")
+        if c.strip() and c.strip().lower() != "identity"
+    ]
+    if not codings:
+        return _IdentityDecoder()
+    if len(codings) > 1:
+        # stacked codings are practically unused by real servers
+        return None
+    coding = codings[0]
+    if coding in ("gzip", "x-gzip"):
+        return _ZlibDecoder(zlib.MAX_WBITS | 16)
+    if coding == "deflate":
+        return _ZlibDecoder(zlib.MAX_WBITS)
+    if coding == "br" and _brotli() is not None:
+        return _BrotliDecoder(_brotli())
+    if coding == "zstd" and _optional_module("zstandard") is not None:
+        return _ZstdDecoder(_optional_module("zstandard"))
+    return None
+
+
+__all__ = [
+    "DecompressionError",
+    "DecompressionLimitExceeded",
+    "accept_encoding",
+    "make_decoder",
+    "supported_encodings",
+]
@@ -0,0 +1,547 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import ipaddress
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from importlib.util import find_spec
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Protocol,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+import httpcore
+import httpx
+
+from src.log import logger
+from src.metrics import MetricsRegistry
+from src.metrics import metrics as default_metrics
+
+# (address family, ip) pairs as returned by resolvers
+Address = Tuple[int, str]
+
+T = TypeVar("T")
+
+
+class Resolver(Protocol):
+    """Async name resolver used by `DNSCache`.
+
+    Returns the resolved addresses and, when the backend knows it, the record
+    TTL in seconds (None lets the cache apply its default TTL).
+    """
+
+    async def resolve(
+        self, host: str, port: int
+    ) -> Tuple[List[Address], Optional[float]]: ...
+
+
+class SystemResolver:
+    """Resolver calling the blocking `getaddrinfo` on its own thread pool.
+
+    The lookups run on a dedicated executor of `max_workers` threads rather
+    than the loop's default one, so slow DNS cannot starve other work handed
+    to `asyncio.to_thread`. `getaddrinfo` does not expose TTLs, so entries
+    get the cache default TTL.
+    """
+
+    def __init__(self, max_workers: int = 4) -> None:
+        self.max_workers = max(1, max_workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def resolve(
+        self, host: str, port: int
+    ) -> Tuple[List[Address], Optional[float]]:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="dns"
+            )
+        infos = await asyncio.get_running_loop().run_in_executor(
+            self._executor,
+            functools.partial(socket.getaddrinfo, host, port, type=socket.SOCK_STREAM),
+        )
+        addresses: List[Address] = []
+        for family, _type, _proto, _canon, sockaddr in infos:
+            addr = (int(family), str(sockaddr[0]))
+            if addr not in addresses:
+                addresses.append(addr)
+        return addresses, None
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+class AiodnsResolver:
+    """Fully asynchronous resolver backed by `aiodns` (optional dependency).
+
+    Queries A and AAAA records concurrently and reports the smallest TTL.
+    """
+
+    def __init__(self) -> None:
+        try:
+            import aiodns  # type: ignore[import-not-found]
+        except ImportError as exc:  # pragma: no cover - depends on environment
+            raise RuntimeError(
+                "aiodns is not installed; install it or use DNS_RESOLVER=system"
+            ) from exc
+        self._resolver = aiodns.DNSResolver()
+
+    async def resolve(
+        self, host: str, port: int
+    ) -> Tuple[List[Address], Optional[float]]:
+        results = await asyncio.gather(
+            self._resolver.query(host, "AAAA"),
+            self._resolver.query(host, "A"),
+            return_exceptions=True,
+        )
+        addresses: List[Address] = []
+        ttls: List[float] = []
+        for family, result in zip((socket.AF_INET6, socket.AF_INET), results):
+            if isinstance(result, BaseException):
+                continue
+            for record in result:
+                addresses.append((int(family), record.host))
+                ttls.append(float(record.ttl))
+        if not addresses:
+            raise socket.gaierror(f"could not resolve {host}")
+        return addresses, (min(ttls) if ttls else None)
+
+
+def interleave_families(addresses: Iterable[Address]) -> List[Address]:
+    """Order addresses alternating IPv6/IPv4 (RFC 8305 section 4).
+
+    The family of the first address is kept first, so resolver preference is
+    respected while a broken family cannot delay the other one for long.
+    """
+    addrs = list(addresses)
+    if not addrs:
+        return []
+    first_family = addrs[0][0]
+    primary = [a for a in addrs if a[0] == first_family]
+    secondary = [a for a in addrs if a[0] != first_family]
+    ordered: List[Address] = []
+    for i in range(max(len(primary), len(secondary))):
+        if i < len(primary):
+            ordered.append(primary[i])
+        if i < len(secondary):
+            ordered.append(secondary[i])
+    return ordered
+
+
+@dataclass
+class _Entry:
+    addresses: List[Address]
+    ttl: float
+    expires_at: float
+
+
+def _is_ip_literal(host: str) -> Optional[Address]:
+    try:
+        ip = ipaddress.ip_address(host.strip("[]"))
+    except ValueError:
+        return None
+    family = socket.AF_INET6 if ip.version == 6 else socket.AF_INET
+    return int(family), str(ip)
+
+
+def build_resolver(name: str = "auto", threads: int = 4) -> Resolver:
+    """Resolver for the DNS_RESOLVER setting.
+
+    "auto" uses aiodns (no threads, real TTLs) when it is installed and the
+    system resolver on its own `threads`-sized pool otherwise.
+    """
+    name = name.lower()
+    if name == "aiodns" or (name == "auto" and find_spec("aiodns") is not None):
+        return AiodnsResolver()
+    return SystemResolver(max_workers=threads)
+
+
+class DNSCache:
+    """TTL-respecting DNS cache shared by all upstream connections.
+
+    Concurrent lookups for the same name are coalesced into one resolver
+    call, and entries close to expiry (within `prefetch_ratio` of their TTL)
+    are refreshed in the background so hot hosts never wait on resolution.
+    """
+
+    def __init__(
+        self,
+        resolver: Optional[Resolver] = None,
+        default_ttl: float = 60.0,
+        min_ttl: float = 5.0,
+        max_ttl: float = 3600.0,
+        prefetch_ratio: float = 0.1,
+        clock: Callable[[], float] = time.monotonic,
+        metrics: Optional[MetricsRegistry] = None,
+    ):
+        self.resolver: Resolver = resolver or SystemResolver()
+        self.default_ttl = default_ttl
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.prefetch_ratio = prefetch_ratio
+        self._clock = clock
+        self._metrics = metrics or default_metrics
+        self._entries: Dict[Tuple[str, int], _Entry] = {}
+        self._inflight: Dict[Tuple[str, int], asyncio.Future] = {}
+        self._prefetching: Set[Tuple[str, int]] = set()
+        # strong references to background refreshes; the loop only keeps
+        # weak ones, so an unreferenced task can be collected mid-flight
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def resolve(self, host: str, port: int) -> List[Address]:
+        literal = _is_ip_literal(host)
+        if literal is not None:
+            return [literal]
+
+        key = (host.lower(), port)
+        now = self._clock()
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > now:
+            self._metrics.incr("dns.cache_hits")
+            if entry.expires_at - now <= entry.ttl * self.prefetch_ratio:
+                self._schedule_prefetch(key)
+            return entry.addresses
+
+        self._metrics.incr("dns.cache_misses")
+        return await self._lookup(key)
+
+    def _schedule_prefetch(self, key: Tuple[str, int]) -> None:
+        if key in self._prefetching or key in self._inflight:
+            return
+        self._prefetching.add(key)
+        self._metrics.incr("dns.prefetches")
+
+        async def _refresh() -> None:
+            try:
+                await self._lookup(key)
+            except Exception as exc:
+                logger.debug("DNS prefetch failed for %s: %s", key[0], exc)
+            finally:
+                self._prefetching.discard(key)
+
+        task = asyncio.ensure_future(_refresh())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _lookup(self, key: Tuple[str, int]) -> List[Address]:
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._metrics.incr("dns.coalesced")
+            return await asyncio.shield(pending)
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        start = time.perf_counter()
+        try:
+            addresses, ttl = await self.resolver.resolve(*key)
+            if not addresses:
+                raise socket.gaierror(f"no addresses for {key[0]}")
+        except Exception as exc:
+            self._metrics.incr("dns.errors")
+            future.set_exception(exc)
+            # the exception was delivered to waiters (if any) via the future
+            future.exception()
+            raise
+        else:
+            ttl = min(self.max_ttl, max(self.min_ttl, ttl or self.default_ttl))
+            self._entries[key] = _Entry(addresses, ttl, self._clock() + ttl)
+            future.set_result(addresses)
+            return addresses
+        finally:
+            self._metrics.observe("dns.resolve_seconds", time.perf_counter() - start)
+            self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+async def happy_eyeballs(
+    addresses: List[Address],
+    connect: Callable[[str], Awaitable[T]],
+    delay: float = 0.25,
+    close: Optional[Callable[[T], Awaitable[None]]] = None,
+) -> T:
+    """Race connection attempts with a staggered start (RFC 8305).
+
+    Each address (interleaved by family) gets an attempt `delay` seconds
+    after the previous one started, or immediately if the previous failed.
+    The first successful connection wins; the others are cancelled and, if
+    they also connected, closed with `close`.
+    """
+    ordered = interleave_families(addresses)
+    if not ordered:
+        raise OSError("no addresses to connect to")
+
+    tasks: List[asyncio.Task] = []
+    winner: Optional[asyncio.Task] = None
+    last_exc: Optional[BaseException] = None
+    next_idx = 0
+    try:
+        while winner is None:
+            if next_idx < len(ordered):
+                tasks.append(asyncio.ensure_future(connect(ordered[next_idx][1])))
+                next_idx += 1
+            running = [t for t in tasks if not t.done()]
+            if not running:
+                if next_idx >= len(ordered):
+                    break
+                continue
+            done, _ = await asyncio.wait(
+                running,
+                timeout=delay if next_idx < len(ordered) else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                exc = task.exception()
+                if exc is None and winner is None:
+                    winner = task
+                elif exc is not None:
+                    last_exc = exc
+    finally:
+        for task in tasks:
+            if task is winner:
+                continue
+            if not task.done():
+                task.cancel()
+            elif close is not None and task.exception() is None:
+                await close(task.result())
+
+    if winner is None:
+        assert last_exc is not None
+        raise last_exc
+    return winner.result()
+
+
+class DNSCachingNetworkBackend(httpcore.AsyncNetworkBackend):
+    """httpcore network backend resolving names through a `DNSCache`.
+
+    TLS still uses the original host name (httpcore passes it separately
+    as `server_hostname`), so connecting by IP keeps SNI and certificate
+    checks intact.
+    """
+
+    def __init__(
+        self,
+        cache: DNSCache,
+        backend: httpcore.AsyncNetworkBackend,
+        happy_eyeballs_delay: float = 0.25,
+    ):
+        self.cache = cache
+        self._backend = backend
+        self.happy_eyeballs_delay = happy_eyeballs_delay
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: Optional[float] = None,
+        local_address: Optional[str] = None,
+        socket_options: Optional[Iterable] = None,
+    ) -> httpcore.AsyncNetworkStream:
+        try:
+            addresses = await self.cache.resolve(host, port)
+        except (OSError, socket.gaierror) as exc:
+            raise httpcore.ConnectError(str(exc)) from exc
+
+        async def _connect(ip: str) -> httpcore.AsyncNetworkStream:
+            return await self._backend.connect_tcp(
+                ip,
+                port,
+                timeout=timeout,
+                local_address=local_address,
+                socket_options=socket_options,
+            )
+
+        async def _close(stream: httpcore.AsyncNetworkStream) -> None:
+            await stream.aclose()
+
+        return await happy_eyeballs(
+            addresses, _connect, delay=self.happy_eyeballs_delay, close=_close
+        )
+
+    async def connect_unix_socket(
+        self,
+        path: str,
+        timeout: Optional[float] = None,
+        socket_options: Optional[Iterable] = None,
+    ) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(
+            path, timeout=timeout, socket_options=socket_options
+        )
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+def _httpcore_exception_map() -> List[Tuple[type, type]]:
+    # most specific first: the first match wins
+    return [
+        (httpcore.ConnectTimeout, httpx.ConnectTimeout),
+        (httpcore.ReadTimeout, httpx.ReadTimeout),
+        (httpcore.WriteTimeout, httpx.WriteTimeout),
+        (httpcore.PoolTimeout, httpx.PoolTimeout),
+        (httpcore.TimeoutException, httpx.TimeoutException),
+        (httpcore.ConnectError, httpx.ConnectError),
+        (httpcore.ReadError, httpx.ReadError),
+        (httpcore.WriteError, httpx.WriteError),
+        (httpcore.NetworkError, httpx.NetworkError),
+        (httpcore.ProxyError, httpx.ProxyError),
+        (httpcore.UnsupportedProtocol, httpx.UnsupportedProtocol),
+        (httpcore.LocalProtocolError, httpx.LocalProtocolError),
+        (httpcore.RemoteProtocolError, httpx.RemoteProtocolError),
+        (httpcore.ProtocolError, httpx.ProtocolError),
+    ]
+
+
+@contextmanager
+def _map_httpcore_exceptions() -> Iterator[None]:
+    """Re-raise httpcore errors as the httpx ones callers catch."""
+    try:
+        yield
+    except Exception as exc:
+        for source, target in _httpcore_exception_map():
+            if isinstance(exc, source):
+                raise target(str(exc)) from exc
+        raise
+
+
+class _ResponseStream(httpx.AsyncByteStream):
+    def __init__(self, stream: AsyncIterable[bytes]):
+        self._stream = stream
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        with _map_httpcore_exceptions():
+            async for part in self._stream:
+                yield part
+
+    async def aclose(self) -> None:
+        aclose = getattr(self._stream, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+class DNSCachingTransport(httpx.AsyncBaseTransport):
+    """httpx transport whose connections resolve names through a `DNSCache`.
+
+    The httpcore pool (or HTTP/SOCKS proxy pool for `proxy`) is built explicitly with
+    a `DNSCachingNetworkBackend`, using only public httpcore/httpx APIs.
+    """
+
+    def __init__(
+        self,
+        cache: DNSCache,
+        happy_eyeballs_delay: float = 0.25,
+        limits: Optional[httpx.Limits] = None,
+        proxy: Optional[str] = None,
+        verify: bool = True,
+        http2: bool = False,
+    ):
+        limits = limits or httpx.Limits(
+            max_connections=100, max_keepalive_connections=20
+        )
+        backend = DNSCachingNetworkBackend(
+            cache, httpcore.AnyIOBackend(), happy_eyeballs_delay=happy_eyeballs_delay
+        )
+        options: Dict[str, Any] = {
+            "ssl_context": httpx.create_ssl_context(verify=verify),
+            "max_connections": limits.max_connections,
+            "max_keepalive_connections": limits.max_keepalive_connections,
+            "keepalive_expiry": limits.keepalive_expiry,
+            "http2": http2,
+            "network_backend": backend,
+        }
+        self._pool: httpcore.AsyncConnectionPool
+        if proxy is None:
+            self._pool = httpcore.AsyncConnectionPool(**options)
+            return
+        parsed = httpx.Proxy(proxy)
+        proxy_url = httpcore.URL(
+            scheme=parsed.url.raw_scheme,
+            host=parsed.url.raw_host,
+            port=parsed.url.port,
+            target=parsed.url.raw_path,
+        )
+        if parsed.url.scheme in ("http", "https"):
+            self._pool = httpcore.AsyncHTTPProxy(
+                proxy_url=proxy_url,
+                proxy_auth=parsed.raw_auth,
+                proxy_headers=parsed.headers.raw,
+                **options,
+            )
+        elif parsed.url.scheme in ("socks5", "socks5h"):
+            # needs the socksio package (httpx[socks]), as plain httpx does
+            self._pool = httpcore.AsyncSOCKSProxy(
+                proxy_url=proxy_url, proxy_auth=parsed.raw_auth, **options
+            )
+        else:
+            raise ValueError(f"Unsupported proxy scheme {parsed.url.scheme!r}")
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        assert isinstance(request.stream, httpx.AsyncByteStream)
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        with _map_httpcore_exceptions():
+            response = await self._pool.handle_async_request(core_request)
+        assert isinstance(response.stream, AsyncIterable)
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.headers,
+            stream=_ResponseStream(response.stream),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._pool.aclose()
+
+
+def build_dns_transport(
+    cache: DNSCache, happy_eyeballs_delay: float = 0.25, **kwargs: Any
+) -> DNSCachingTransport:
+    """Return an httpx transport whose connections resolve through `cache`.
+
+    `kwargs` are `DNSCachingTransport` options (`limits`, `proxy`, ...).
+    """
+    return DNSCachingTransport(
+        cache, happy_eyeballs_delay=happy_eyeballs_delay, **kwargs
+    )
+
+
+__all__ = [
+    "AiodnsResolver",
+    "DNSCache",
+    "DNSCachingNetworkBackend",
+    "DNSCachingTransport",
+    "Resolver",
+    "SystemResolver",
+    "build_dns_transport",
+    "build_resolver",
+    "happy_eyeballs",
+    "interleave_families",
+]
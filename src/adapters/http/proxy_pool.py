@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from src.log import logger
+from src.metrics import MetricsRegistry
+from src.metrics import metrics as default_metrics
+
+if TYPE_CHECKING:
+    import httpx
+
+STRATEGIES = ("affinity", "least_latency")
+
+ClientFactory = Callable[[str], "httpx.AsyncClient"]
+
+
+def proxy_label(url: str) -> str:
+    """`host:port` of a proxy URL (credentials never reach logs/metrics)."""
+    parts = urlsplit(url)
+    return f"{parts.hostname}:{parts.port}" if parts.port else str(parts.hostname)
+
+
+@dataclass
+class ProxyEndpoint:
+    """One upstream proxy with its own persistent connection pool."""
+
+    url: str
+    client: Any
+    label: str = ""
+    requests: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    # times ejected in a row; the ejection period doubles each time
+    ejections: int = 0
+    ejected_until: float = 0.0
+    inflight: int = 0
+    bytes: int = 0
+    busy_seconds: float = 0.0
+    # exponentially weighted success rate (1.0 = healthy) and latency
+    health: float = 1.0
+    latency: Optional[float] = None
+
+    def available(self, now: float) -> bool:
+        return self.ejected_until <= now
+
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        return {
+            "proxy": self.label,
+            "available": self.available(now),
+            "ejected_for": round(max(0.0, self.ejected_until - now), 3),
+            "requests": self.requests,
+            "failures": self.failures,
+            "inflight": self.inflight,
+            "health": round(self.health, 3),
+            "latency_ms": (
+                round(self.latency * 1000, 1) if self.latency is not None else None
+            ),
+            "bytes": self.bytes,
+            "bytes_per_second": (
+                round(self.bytes / self.busy_seconds) if self.busy_seconds else 0
+            ),
+        }
+
+
+def _default_client_factory(max_connections: int) -> ClientFactory:
+    def factory(proxy_url: str) -> "httpx.AsyncClient":
+        import httpx
+
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+        return httpx.AsyncClient(proxy=proxy_url, limits=limits, timeout=10.0)
+
+    return factory
+
+
+class ProxyPool:
+    """Pool of upstream proxies with health scoring and ejection.
+
+    Strategies:
+
+    - `affinity`: rendezvous hashing of the target host, so a host keeps
+      using the same proxy (and its warm connections) and only the hosts of
+      an ejected proxy move elsewhere;
+    - `least_latency`: the available proxy with the lowest latency EWMA,
+      weighted by its in-flight requests and health.
+
+    A proxy failing `eject_after` times in a row (connection/proxy errors,
+    not HTTP statuses of the target) is ejected for `eject_seconds`, doubled
+    on each consecutive ejection. When every proxy is ejected the one due
+    back first is used, so traffic never stops completely.
+    """
+
+    def __init__(
+        self,
+        proxies: List[str],
+        strategy: str = "affinity",
+        max_connections: int = 100,
+        eject_after: int = 3,
+        eject_seconds: float = 30.0,
+        max_eject_seconds: float = 600.0,
+        alpha: float = 0.2,
+        client_factory: Optional[ClientFactory] = None,
+        clock: Callable[[], float] = time.monotonic,
+        metrics: MetricsRegistry = default_metrics,
+    ):
+        if not proxies:
+            raise ValueError("at least one proxy is required")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"strategy must be one of {', '.join(STRATEGIES)}")
+        self.strategy = strategy
+        self.eject_after = max(1, eject_after)
+        self.eject_seconds = eject_seconds
+        self.max_eject_seconds = max_eject_seconds
+        self.alpha = alpha
+        self._clock = clock
+        self._metrics = metrics
+        factory = client_factory or _default_client_factory(max_connections)
+        self.endpoints = [
+            ProxyEndpoint(url=url, client=factory(url), label=proxy_label(url))
+            for url in proxies
+        ]
+
+    @classmethod
+    def from_settings(cls, settings: Any, **kwargs: Any) -> "ProxyPool":
+        proxies = [p.strip() for p in settings.SCRAPE_PROXIES.split(",") if p.strip()]
+        return cls(
+            proxies,
+            strategy=settings.SCRAPE_PROXY_STRATEGY,
+            max_connections=settings.SCRAPE_HTTP_MAX_CONNECTIONS,
+            eject_after=settings.SCRAPE_PROXY_EJECT_AFTER,
+            eject_seconds=settings.SCRAPE_PROXY_EJECT_SECONDS,
+            **kwargs,
+        )
+
+    # -- selection --------------------------------------------------------
+
+    def choose(self, host: str) -> ProxyEndpoint:
+        now = self._clock()
+        candidates = [e for e in self.endpoints if e.available(now)]
+        if not candidates:
+            # everything is ejected: probe the proxy that returns first
+            return min(self.endpoints, key=lambda e: e.ejected_until)
+        if self.strategy == "affinity":
+            return max(candidates, key=lambda e: self._weight(host, e))
+        return min(candidates, key=self._cost)
+
+    @staticmethod
+    def _weight(host: str, endpoint: ProxyEndpoint) -> int:
+        digest = hashlib.blake2b(
+            f"{host}|{endpoint.url}".encode(), digest_size=8
+        ).digest()
+        return int.from_bytes(digest, "big")
+
+    @staticmethod
+    def _cost(endpoint: ProxyEndpoint) -> float:
+        # untried proxies cost nothing, so each one gets sampled
+        latency = endpoint.latency or 0.0
+        return latency * (1 + endpoint.inflight) / max(endpoint.health, 0.05)
+
+    # -- accounting -------------------------------------------------------
+
+    def started(self, endpoint: ProxyEndpoint) -> float:
+        endpoint.inflight += 1
+        return time.perf_counter()
+
+    def record(
+        self,
+        endpoint: ProxyEndpoint,
+        start: float,
+        ok: Optional[bool],
+        nbytes: int = 0,
+    ) -> None:
+        """Account a finished request; `ok=None` (cancelled) is not scored."""
+        elapsed = time.perf_counter() - start
+        endpoint.inflight = max(0, endpoint.inflight - 1)
+        if ok is None:
+            return
+        endpoint.requests += 1
+        endpoint.health += self.alpha * ((1.0 if ok else 0.0) - endpoint.health)
+        label = endpoint.label
+        self._metrics.incr(
+            "proxy.requests", proxy=label, outcome="ok" if ok else "error"
+        )
+        if ok:
+            endpoint.consecutive_failures = 0
+            endpoint.ejections = 0
+            endpoint.bytes += nbytes
+            endpoint.busy_seconds += elapsed
+            endpoint.latency = (
+                elapsed
+                if endpoint.latency is None
+                else endpoint.latency + self.alpha * (elapsed - endpoint.latency)
+            )
+            self._metrics.incr("proxy.bytes", nbytes, proxy=label)
+            self._metrics.observe("proxy.latency_seconds", elapsed, proxy=label)
+            return
+
+        endpoint.failures += 1
+        endpoint.consecutive_failures += 1
+        if endpoint.consecutive_failures >= self.eject_after:
+            period = min(
+                self.max_eject_seconds, self.eject_seconds * 2**endpoint.ejections
+            )
+            endpoint.ejected_until = self._clock() + period
+            endpoint.ejections += 1
+            endpoint.consecutive_failures = 0
+            self._metrics.incr("proxy.ejections", proxy=label)
+            logger.warning("Proxy %s ejected for %.0fs", endpoint.label, period)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        now = self._clock()
+        return [e.snapshot(now) for e in self.endpoints]
+
+    async def aclose(self) -> None:
+        for endpoint in self.endpoints:
+            await endpoint.client.aclose()
+
+
+__all__ = ["ProxyEndpoint", "ProxyPool", "STRATEGIES", "proxy_label"]
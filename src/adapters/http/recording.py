@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from src.adapters.http.scrape_provider_http import FetchedPage
+from src.domain.exceptions import ScrapeError
+from src.domain.ports.scrape_provider import ScrapeProvider
+from src.log import logger
+
+# Response headers worth keeping in the archive (the rest is noise for replay)
+_KEPT_HEADERS = frozenset(
+    {"content-type", "content-encoding", "content-length", "retry-after", "server"}
+)
+
+
+class CassetteArchive:
+    """Append-only archive of fetches stored as gzip-compressed JSON lines.
+
+    Each entry is written as its own gzip member, so the file stays readable
+    (by `gzip.open` or `zcat`) even if the process dies mid-recording. An
+    entry holds the URL, status, selected headers, body, elapsed seconds
+    and, for failed fetches, the error message.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock, gzip.open(self.path, "ab") as fh:
+            fh.write(line)
+
+    def load(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Return recorded entries grouped by URL, in recording order."""
+        entries: Dict[str, List[Dict[str, Any]]] = {}
+        if not os.path.exists(self.path):
+            return entries
+        with gzip.open(self.path, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    entry = json.loads(line)
+                    entries.setdefault(entry["url"], []).append(entry)
+        return entries
+
+
+class RecordingScrapeProvider:
+    """Decorator that records every fetch of the wrapped provider.
+
+    When the provider exposes `fetch_page` (as `HttpxScrapeProvider` does)
+    status and headers are recorded too; otherwise a 200 is assumed.
+    Failures are recorded and re-raised so replay reproduces them.
+    """
+
+    def __init__(self, provider: ScrapeProvider, archive: CassetteArchive):
+        self.provider = provider
+        self.archive = archive
+
+    async def _write(self, entry: Dict[str, Any]) -> None:
+        # compression and disk IO off the event loop
+        await asyncio.to_thread(self.archive.append, entry)
+
+    async def fetch(
+        self,
+        url: str,
+        headers: dict | None = None,
+        timeout: float | None = 10.0,
+        respect_robots: bool = True,
+    ) -> str:
+        start = time.perf_counter()
+        fetch_page = getattr(self.provider, "fetch_page", None)
+        try:
+            if fetch_page is not None:
+                page: FetchedPage = await fetch_page(
+                    url, headers=headers, timeout=timeout, respect_robots=respect_robots
+                )
+            else:
+                text = await self.provider.fetch(
+                    url, headers=headers, timeout=timeout, respect_robots=respect_robots
+                )
+                page = FetchedPage(url=url, status_code=200, text=text)
+        except ScrapeError as exc:
+            await self._write(
+                {
+                    "url": url,
+                    "status": exc.status_code,
+                    "error": str(exc),
+                    "retry_after": exc.retry_after,
+                    "elapsed": time.perf_counter() - start,
+                    "recorded_at": time.time(),
+                }
+            )
+            raise
+
+        await self._write(
+            {
+                "url": url,
+                "status": page.status_code,
+                "headers": {
+                    k.lower(): v
+                    for k, v in page.headers.items()
+                    if k.lower() in _KEPT_HEADERS
+                },
+                "body": page.text,
+                "elapsed": page.elapsed or time.perf_counter() - start,
+                "recorded_at": time.time(),
+            }
+        )
+        return page.text
+
+
+class ReplayScrapeProvider:
+    """`ScrapeProvider` serving responses from a `CassetteArchive`.
+
+    URLs recorded several times are replayed round-robin, so variance in
+    the recorded bodies and latencies is preserved. With
+    `simulate_latency` each response is delayed by its recorded elapsed
+    time (times `latency_scale`). Unknown URLs raise a 404 `ScrapeError`.
+    """
+
+    def __init__(
+        self,
+        archive: CassetteArchive,
+        simulate_latency: bool = False,
+        latency_scale: float = 1.0,
+    ):
+        self.simulate_latency = simulate_latency
+        self.latency_scale = latency_scale
+        self._entries = archive.load()
+        self._cursor: Dict[str, int] = {}
+        logger.info(
+            "Replay archive %s loaded urls=%s", archive.path, len(self._entries)
+        )
+
+    def _next(self, url: str) -> Optional[Dict[str, Any]]:
+        recorded = self._entries.get(url)
+        if not recorded:
+            return None
+        idx = self._cursor.get(url, 0)
+        self._cursor[url] = (idx + 1) % len(recorded)
+        return recorded[idx]
+
+    async def fetch(
+        self,
+        url: str,
+        headers: dict | None = None,
+        timeout: float | None = 10.0,
+        respect_robots: bool = True,
+    ) -> str:
+        entry = self._next(url)
+        if entry is None:
+            raise ScrapeError(f"No recording for {url}", status_code=404)
+        if self.simulate_latency and entry.get("elapsed"):
+            await asyncio.sleep(entry["elapsed"] * self.latency_scale)
+        if "error" in entry:
+            raise ScrapeError(
+                entry["error"],
+                status_code=entry.get("status"),
+                retry_after=entry.get("retry_after"),
+            )
+        return entry["body"]
+
+
+__all__ = ["CassetteArchive", "RecordingScrapeProvider", "ReplayScrapeProvider"]
@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+from src.domain.exceptions import ScrapeError
+from src.domain.ports.scrape_provider import ScrapeProvider
+from src.log import logger
+
+
+class RetryBudget:
+    """Token bucket that bounds the extra load created by retries or hedges.
+
+    Every primary request deposits `ratio` tokens and every retry (or hedge)
+    withdraws one, so extra attempts stay around `ratio` of the primary
+    traffic. A small `min_per_second` reserve lets low-traffic processes
+    still retry occasionally. During an incident, when most requests fail,
+    the budget drains and further retries are refused instead of
+    multiplying the load on the upstream.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.1,
+        min_per_second: float = 1.0,
+        max_tokens: float = 100.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self._clock = clock
+        self._tokens = min(max_tokens, max(1.0, min_per_second))
+        self._last = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = max(0.0, now - self._last)
+        self._last = now
+        self._tokens = min(
+            self.max_tokens, self._tokens + elapsed * self.min_per_second
+        )
+
+    def deposit(self) -> None:
+        """Credit the budget for one primary request."""
+        self._refill()
+        self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        """Spend one token for an extra attempt; False if the budget is empty."""
+        self._refill()
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+    @property
+    def available(self) -> float:
+        self._refill()
+        return self._tokens
+
+
+# One budget per kind ("retry", "hedge") for the whole process, shared by
+# every provider built from settings (API, CLI, recording wrappers).
+_SHARED_BUDGETS: Dict[str, RetryBudget] = {}
+
+
+def shared_budget(kind: str, ratio: float) -> RetryBudget:
+    """Return the process-wide budget for `kind`, creating it on first use.
+
+    A later call with another `ratio` updates the shared budget in place.
+    """
+    budget = _SHARED_BUDGETS.get(kind)
+    if budget is None:
+        budget = _SHARED_BUDGETS[kind] = RetryBudget(ratio=ratio)
+    else:
+        budget.ratio = ratio
+    return budget
+
+
+class LatencyTracker:
+    """Rolling window of successful fetch latencies, kept per host."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, host: str, seconds: float) -> None:
+        samples = self._samples.get(host)
+        if samples is None:
+            samples = self._samples[host] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def percentile(self, host: str, pct: float) -> Optional[float]:
+        """Return the `pct` percentile (0-100) for `host`.
+
+        Returns None until at least `min_samples` latencies were recorded so
+        hedging does not kick in on a cold, noisy estimate.
+        """
+        samples = self._samples.get(host)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+        return ordered[idx]
+
+
+class ResilientScrapeProvider:
+    """Decorator around a `ScrapeProvider` adding retries and hedged requests.
+
+    Scrape fetches are idempotent GETs, so they can be safely repeated:
+
+    - Retries: failures without an HTTP status (connect errors, timeouts) and
+      responses with a retryable status (429/503 by default) are retried
+      with full-jitter exponential backoff. A `Retry-After` delay advertised
+      by the upstream is honoured, and requests asking for more than
+      `max_retry_after` seconds are not retried at all.
+    - Hedging: when a fetch takes longer than the `hedge_percentile`
+      latency observed for the same host, a duplicate request is sent and
+      whichever finishes first wins; the loser is cancelled.
+
+    Both mechanisms draw from `RetryBudget`s (process-wide ones with
+    `from_settings`, see `shared_budget`) so they cannot amplify load during
+    an upstream incident. All attempts of one fetch, backoff included, stay
+    within its `timeout`: a retry that could not start before that deadline
+    is not made, and later attempts get only the time that is left.
+    """
+
+    def __init__(
+        self,
+        provider: ScrapeProvider,
+        max_attempts: int = 3,
+        backoff_base: float = 0.2,
+        backoff_max: float = 5.0,
+        max_retry_after: float = 30.0,
+        retryable_statuses: Iterable[int] = (429, 503),
+        retry_budget: Optional[RetryBudget] = None,
+        hedge_enabled: bool = True,
+        hedge_percentile: float = 95.0,
+        hedge_min_delay: float = 0.05,
+        hedge_budget: Optional[RetryBudget] = None,
+        latency_tracker: Optional[LatencyTracker] = None,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.provider = provider
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.retryable_statuses = frozenset(retryable_statuses)
+        self.retry_budget = retry_budget or RetryBudget(ratio=0.1)
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_budget = hedge_budget or RetryBudget(ratio=0.05)
+        self.latency = latency_tracker or LatencyTracker()
+        self._sleep = sleep
+        self._clock = clock
+
+    @classmethod
+    def from_settings(
+        cls, provider: ScrapeProvider, settings: Any
+    ) -> "ResilientScrapeProvider":
+        """Build the decorator from `CommonSettings`-like values."""
+        return cls(
+            provider,
+            max_attempts=settings.SCRAPE_RETRY_MAX_ATTEMPTS,
+            backoff_base=settings.SCRAPE_RETRY_BACKOFF_BASE,
+            backoff_max=settings.SCRAPE_RETRY_BACKOFF_MAX,
+            retry_budget=shared_budget("retry", settings.SCRAPE_RETRY_BUDGET_RATIO),
+            hedge_enabled=settings.SCRAPE_HEDGE_ENABLED,
+            hedge_percentile=settings.SCRAPE_HEDGE_PERCENTILE,
+            hedge_budget=shared_budget("hedge", settings.SCRAPE_HEDGE_BUDGET_RATIO),
+        )
+
+    def _is_retryable(self, exc: ScrapeError) -> bool:
+        if not getattr(exc, "retryable", True):
+            return False
+        status = getattr(exc, "status_code", None)
+        return status is None or status in self.retryable_statuses
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> Optional[float]:
+        """Delay before retry number `attempt` (1-based); None to give up."""
+        if retry_after is not None and retry_after > self.max_retry_after:
+            return None
+        delay = random.uniform(
+            0, min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        )
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def _hedge_delay(self, host: str) -> Optional[float]:
+        if not self.hedge_enabled:
+            return None
+        pct = self.latency.percentile(host, self.hedge_percentile)
+        if pct is None:
+            return None
+        return max(self.hedge_min_delay, pct)
+
+    async def fetch(
+        self,
+        url: str,
+        headers: dict | None = None,
+        timeout: float | None = 10.0,
+        respect_robots: bool = True,
+    ) -> str:
+        host = urlparse(url).netloc
+        deadline = self._clock() + timeout if timeout else None
+        attempt_timeout = timeout
+
+        async def _call() -> str:
+            return await self.provider.fetch(
+                url,
+                headers=headers,
+                timeout=attempt_timeout,
+                respect_robots=respect_robots,
+            )
+
+        self.retry_budget.deposit()
+        self.hedge_budget.deposit()
+        attempt = 0
+        while True:
+            try:
+                return await self._fetch_hedged(host, _call)
+            except ScrapeError as exc:
+                attempt += 1
+                if attempt >= self.max_attempts or not self._is_retryable(exc):
+                    raise
+                delay = self._backoff(attempt, getattr(exc, "retry_after", None))
+                if delay is None:
+                    logger.info(
+                        "Not retrying %s: Retry-After %.1fs exceeds limit",
+                        url,
+                        exc.retry_after,
+                    )
+                    raise
+                if deadline is not None:
+                    # time left for the next attempt once the backoff is over
+                    remaining = deadline - self._clock() - delay
+                    if remaining <= 0:
+                        logger.info(
+                            "Not retrying %s: %.1fs timeout would be exceeded",
+                            url,
+                            timeout,
+                        )
+                        raise
+                    attempt_timeout = remaining
+                if not self.retry_budget.try_withdraw():
+                    logger.warning("Retry budget exhausted; not retrying %s", url)
+                    raise
+                logger.info(
+                    "Retrying %s attempt=%s in %.3fs after error: %s",
+                    url,
+                    attempt + 1,
+                    delay,
+                    exc,
+                )
+                await self._sleep(delay)
+
+    async def _timed(self, host: str, call: Callable[[], Awaitable[str]]) -> str:
+        start = time.monotonic()
+        result = await call()
+        self.latency.record(host, time.monotonic() - start)
+        return result
+
+    async def _fetch_hedged(self, host: str, call: Callable[[], Awaitable[str]]) -> str:
+        delay = self._hedge_delay(host)
+        if delay is None:
+            return await self._timed(host, call)
+
+        primary = asyncio.ensure_future(self._timed(host, call))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+            if not self.hedge_budget.try_withdraw():
+                logger.debug("Hedge budget exhausted for host=%s", host)
+                return await primary
+
+            logger.debug("Hedging request to host=%s after %.3fs", host, delay)
+            pending.add(asyncio.ensure_future(self._timed(host, call)))
+            last_exc: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    exc = task.exception()
+                    if exc is None:
+                        return task.result()
+                    last_exc = exc
+            assert last_exc is not None
+            raise last_exc
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+__all__ = [
+    "LatencyTracker",
+    "ResilientScrapeProvider",
+    "RetryBudget",
+    "shared_budget",
+]
@@ -1,21 +1,221 @@
 from __future__ import annotations
 
+import asyncio
+import time
 import urllib.robotparser as robotparser
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    NoReturn,
+    Optional,
+    Tuple,
+)
 from urllib.parse import urlparse
 
-import httpx
-
+from src.adapters.http.compression import (
+    DecompressionError,
+    DecompressionLimitExceeded,
+    accept_encoding,
+    make_decoder,
+)
 from src.domain.exceptions import ScrapeError
 from src.domain.ports.scrape_provider import ScrapeProvider
 from src.log import logger
+from src.metrics import metrics
+from src.tracing import current_span, tracer
+
+if TYPE_CHECKING:
+    import httpx
+
+    from src.adapters.http.dns import DNSCache
+    from src.adapters.http.proxy_pool import ProxyPool
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    """Return the delay in seconds encoded in a `Retry-After` header value.
+
+    The header may be either a number of seconds or an HTTP-date. Invalid or
+    missing values return None.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+@dataclass
+class FetchedPage:
+    """Target page response details (used e.g. to record fetches)."""
+
+    url: str
+    status_code: int
+    text: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    # seconds spent in `fetch_page` (robots.txt check included)
+    elapsed: float = 0.0
+    # bytes received for the page (as sent on the wire)
+    size: int = 0
+
+
+class RobotsCache:
+    """Cache of parsed robots.txt decisions per origin.
+
+    Entries live `ttl` seconds. Concurrent lookups of the same origin share
+    a single robots.txt download.
+    """
+
+    def __init__(
+        self, ttl: float = 3600.0, clock: Callable[[], float] = time.monotonic
+    ):
+        self.ttl = ttl
+        self._clock = clock
+        # robots_url -> (expires_at, rules); rules is a parser, DENY_ALL or
+        # None (no usable robots.txt: everything allowed)
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    async def get(self, robots_url: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._entries.get(robots_url)
+        if entry is not None and entry[0] > self._clock():
+            metrics.incr("robots_cache.hits")
+            return entry[1]
+        pending = self._pending.get(robots_url)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        metrics.incr("robots_cache.misses")
+        future = asyncio.get_running_loop().create_future()
+        self._pending[robots_url] = future
+        try:
+            rules = await load()
+        except BaseException as exc:
+            future.set_exception(exc)
+            # mark retrieved so an unawaited future does not log a warning
+            future.exception()
+            raise
+        finally:
+            self._pending.pop(robots_url, None)
+        self._entries[robots_url] = (self._clock() + self.ttl, rules)
+        future.set_result(rules)
+        return rules
+
+
+# robots.txt answered 401/403: treat the whole site as disallowed
+DENY_ALL = object()
+
+# robots.txt bodies beyond this size are ignored (Google stops at 500 KiB)
+ROBOTS_MAX_BYTES = 512 * 1024
+
+# Bodies smaller than this are never rejected for their compression ratio:
+# tiny, highly repetitive pages legitimately compress very well.
+_RATIO_FLOOR_BYTES = 1024 * 1024
 
 
 class HttpxScrapeProvider:
     """Httpx-based implementation of the `ScrapeProvider` port.
 
     Keeps network concerns (headers, timeouts, error mapping) out of the domain.
+    When a `DNSCache` is given, upstream connections resolve names through it
+    instead of a blocking `getaddrinfo` per connection.
+
+    By default every fetch opens (and closes) its own client. With
+    `pooled=True`, or an injected `client`, one `httpx.AsyncClient` is shared
+    so keep-alive connections are reused across fetches; call `aclose()` when
+    done. `robots_cache` (or `robots_cache_ttl`) avoids downloading
+    robots.txt on every fetch. With a `proxy_pool` each fetch goes through
+    the persistent client of the proxy chosen for the target host.
+
+    Bodies are advertised and decoded as gzip/deflate, plus br/zstd when a
+    decoder that bounds its output is installed. Decoding is incremental and
+    a response is rejected as soon as it exceeds `max_body_bytes` decoded
+    bytes or `max_compression_ratio` times its compressed size
+    (decompression bombs).
     """
 
+    def __init__(
+        self,
+        dns_cache: Optional[DNSCache] = None,
+        happy_eyeballs_delay: float = 0.25,
+        client: Optional[httpx.AsyncClient] = None,
+        pooled: bool = False,
+        max_connections: int = 100,
+        robots_cache: Optional[RobotsCache] = None,
+        robots_cache_ttl: Optional[float] = None,
+        proxy_pool: Optional[ProxyPool] = None,
+        max_body_bytes: int = 10 * 1024 * 1024,
+        max_compression_ratio: float = 100.0,
+    ):
+        self.dns_cache = dns_cache
+        self.happy_eyeballs_delay = happy_eyeballs_delay
+        self.pooled = pooled or client is not None
+        self.max_connections = max_connections
+        self._client = client
+        self._owns_client = client is None
+        if robots_cache is None and robots_cache_ttl:
+            robots_cache = RobotsCache(ttl=robots_cache_ttl)
+        self.robots_cache = robots_cache
+        self.proxy_pool = proxy_pool
+        self.max_body_bytes = max_body_bytes
+        self.max_compression_ratio = max_compression_ratio
+
+    def _client_kwargs(self, timeout: float | None) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {"timeout": timeout}
+        if self.dns_cache is not None:
+            from src.adapters.http.dns import build_dns_transport
+
+            kwargs["transport"] = build_dns_transport(
+                self.dns_cache, happy_eyeballs_delay=self.happy_eyeballs_delay
+            )
+        return kwargs
+
+    def _shared_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            import httpx
+
+            limits = httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            )
+            kwargs: Dict[str, Any] = {"timeout": 10.0, "limits": limits}
+            if self.dns_cache is not None:
+                from src.adapters.http.dns import build_dns_transport
+
+                kwargs["transport"] = build_dns_transport(
+                    self.dns_cache,
+                    happy_eyeballs_delay=self.happy_eyeballs_delay,
+                    limits=limits,
+                )
+            self._client = httpx.AsyncClient(**kwargs)
+        return self._client
+
+    async def warmup(self) -> None:
+        """Import httpx and, when pooled, create the shared client up front."""
+        import httpx  # noqa: F401
+
+        if self.pooled:
+            self._shared_client()
+
+    async def aclose(self) -> None:
+        """Close the shared and proxy clients (no-op for per-fetch clients)."""
+        if self._client is not None and self._owns_client:
+            await self._client.aclose()
+            self._client = None
+        if self.proxy_pool is not None:
+            await self.proxy_pool.aclose()
+
     async def fetch(
         self,
         url: str,
@@ -23,12 +223,29 @@ class HttpxScrapeProvider:
         timeout: float | None = 10.0,
         respect_robots: bool = True,
     ) -> str:
+        page = await self.fetch_page(
+            url, headers=headers, timeout=timeout, respect_robots=respect_robots
+        )
+        return page.text
+
+    async def fetch_page(
+        self,
+        url: str,
+        headers: dict | None = None,
+        timeout: float | None = 10.0,
+        respect_robots: bool = True,
+    ) -> FetchedPage:
+        """Like `fetch` but also returns the status, headers and timing."""
+        import httpx
+
+        start = time.perf_counter()
         DEFAULT_HEADERS = {
             "User-Agent": (
                 "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
                 "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
             ),
             "Accept-Language": "en-US,en;q=0.9",
+            "Accept-Encoding": accept_encoding(),
         }
 
         # normalize keys to Title-Case (e.g. "user-agent" -> "User-Agent") and
@@ -39,60 +256,258 @@ class HttpxScrapeProvider:
         hdrs = {**_normalize(DEFAULT_HEADERS), **_normalize(headers or {})}
         logger.debug("Fetch headers for %s: %s", url, hdrs)
 
-        # Respect robots.txt before requesting the target page (unless caller opts out)
-        parsed = urlparse(url)
-        robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+        with tracer.span("fetch", url=url):
+            try:
+                if self.proxy_pool is not None:
+                    return await self._fetch_via_proxy(
+                        self.proxy_pool, url, hdrs, timeout, respect_robots, start
+                    )
+                if self.pooled:
+                    return await self._fetch_with(
+                        self._shared_client(), url, hdrs, timeout, respect_robots, start
+                    )
+                async with httpx.AsyncClient(**self._client_kwargs(timeout)) as client:
+                    return await self._fetch_with(
+                        client, url, hdrs, timeout, respect_robots, start
+                    )
+            except httpx.HTTPStatusError as exc:
+                status = exc.response.status_code if exc.response is not None else None
+                retry_after = (
+                    _parse_retry_after(exc.response.headers.get("Retry-After"))
+                    if exc.response is not None
+                    else None
+                )
+                logger.error("HTTP error while fetching %s status=%s", url, status)
+                raise ScrapeError(
+                    f"HTTP error: {exc}", status_code=status, retry_after=retry_after
+                )
+            except httpx.RequestError as exc:
+                logger.error("Request error while fetching %s: %s", url, exc)
+                raise ScrapeError(f"Request error: {exc}")
+
+    async def _fetch_via_proxy(
+        self,
+        pool: ProxyPool,
+        url: str,
+        hdrs: dict,
+        timeout: float | None,
+        respect_robots: bool,
+        start: float,
+    ) -> FetchedPage:
+        import httpx
+
+        endpoint = pool.choose(urlparse(url).hostname or "")
+        begin = pool.started(endpoint)
+        # None: cancelled (e.g. a hedge that lost); not the proxy's fault
+        ok: Optional[bool] = None
+        nbytes = 0
+        try:
+            page = await self._fetch_with(
+                endpoint.client, url, hdrs, timeout, respect_robots, start
+            )
+            ok, nbytes = True, page.size
+            return page
+        except httpx.HTTPStatusError as exc:
+            # the target answered through the proxy, unless the proxy itself
+            # refused us (407)
+            ok = exc.response.status_code != 407
+            nbytes = exc.response.num_bytes_downloaded
+            raise
+        except httpx.RequestError:
+            ok = False
+            raise
+        except ScrapeError:
+            # robots.txt disallow: the proxy worked
+            ok = True
+            raise
+        finally:
+            pool.record(endpoint, begin, ok, nbytes)
 
+    async def _load_robots(
+        self, client: httpx.AsyncClient, robots_url: str, hdrs: dict, timeout: Any
+    ) -> Any:
+        import httpx
+
+        # if robots.txt cannot be fetched (network, oversized), we log and proceed
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                # optionally fetch robots.txt; if it fails (network), we log and proceed
-                r = None
-                if respect_robots:
-                    try:
-                        r = await client.get(robots_url, headers=hdrs)
-                    except httpx.RequestError as exc:
-                        logger.debug(
-                            "Could not fetch robots.txt %s: %s", robots_url, exc
-                        )
+            r, text = await self._get(
+                client, robots_url, hdrs, timeout, ROBOTS_MAX_BYTES, check_status=False
+            )
+        except (httpx.RequestError, ScrapeError) as exc:
+            logger.debug("Could not fetch robots.txt %s: %s", robots_url, exc)
+            return None
+        if r.status_code == 200:
+            rp = robotparser.RobotFileParser()
+            rp.parse(text.splitlines())
+            return rp
+        if r.status_code in (401, 403):
+            # treat explicit forbidden for robots.txt as disallow
+            logger.info(
+                "robots.txt returned %s for %s; treating as disallow",
+                r.status_code,
+                robots_url,
+            )
+            return DENY_ALL
+        return None
+
+    async def _fetch_with(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        hdrs: dict,
+        timeout: float | None,
+        respect_robots: bool,
+        start: float,
+    ) -> FetchedPage:
+        # Respect robots.txt before requesting the target page (unless caller opts out)
+        if respect_robots:
+            parsed = urlparse(url)
+            robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+
+            def load() -> Awaitable[Any]:
+                return self._load_robots(client, robots_url, hdrs, timeout)
+
+            with tracer.span("robots", url=robots_url):
+                if self.robots_cache is not None:
+                    rules = await self.robots_cache.get(robots_url, load)
                 else:
-                    logger.debug(
-                        "Skipping robots.txt check for %s (respect_robots=False)", url
-                    )
+                    rules = await load()
 
-                if r is not None and r.status_code == 200:
-                    rp = robotparser.RobotFileParser()
-                    rp.parse(r.text.splitlines())
-                    # prefer X-Agent if present (middleware or client can set it),
-                    # otherwise use User-Agent.
-                    ua = hdrs.get("X-Agent") or hdrs.get("User-Agent") or "*"
-                    try:
-                        allowed = rp.can_fetch(ua, url)
-                    except Exception:
-                        allowed = True
-
-                    if not allowed:
-                        logger.info("Disallowed by robots.txt %s ua=%s", url, ua)
-                        raise ScrapeError("Disallowed by robots.txt", status_code=403)
-                elif r is not None and r.status_code in (401, 403):
-                    # treat explicit forbidden for robots.txt as disallow
-                    logger.info(
-                        "robots.txt returned %s for %s; treating as disallow",
-                        r.status_code,
-                        robots_url,
-                    )
+            if rules is DENY_ALL:
+                raise ScrapeError("Disallowed by robots.txt", status_code=403)
+            if rules is not None:
+                # prefer X-Agent if present (middleware or client can set it),
+                # otherwise use User-Agent.
+                ua = hdrs.get("X-Agent") or hdrs.get("User-Agent") or "*"
+                try:
+                    allowed = rules.can_fetch(ua, url)
+                except Exception:
+                    allowed = True
+
+                if not allowed:
+                    logger.info("Disallowed by robots.txt %s ua=%s", url, ua)
                     raise ScrapeError("Disallowed by robots.txt", status_code=403)
+        else:
+            logger.debug("Skipping robots.txt check for %s (respect_robots=False)", url)
 
-                # fetch the target page
-                resp = await client.get(url, headers=hdrs)
+        # fetch the target page
+        resp, text = await self._get(client, url, hdrs, timeout, self.max_body_bytes)
+        return FetchedPage(
+            url=url,
+            status_code=resp.status_code,
+            text=text,
+            headers=dict(resp.headers),
+            elapsed=time.perf_counter() - start,
+            size=resp.num_bytes_downloaded,
+        )
+
+    async def _get(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        hdrs: dict,
+        timeout: Any,
+        max_bytes: int,
+        check_status: bool = True,
+    ) -> Tuple[httpx.Response, str]:
+        """GET `url` and return the response with its size-limited text."""
+        span = current_span()
+        # httpx reports connection set-up through the "trace" extension
+        extensions = {"trace": _connect_trace(span)} if span.sampled else None
+        async with client.stream(
+            "GET", url, headers=hdrs, timeout=timeout, extensions=extensions
+        ) as resp:
+            if check_status:
                 resp.raise_for_status()
-                return resp.text
-        except httpx.HTTPStatusError as exc:
-            status = exc.response.status_code if exc.response is not None else None
-            logger.error("HTTP error while fetching %s status=%s", url, status)
-            raise ScrapeError(f"HTTP error: {exc}", status_code=status)
-        except httpx.RequestError as exc:
-            logger.error("Request error while fetching %s: %s", url, exc)
-            raise ScrapeError(f"Request error: {exc}")
+            with tracer.span("download", status_code=resp.status_code) as download:
+                body = await self._read_body(resp, url, max_bytes)
+                download.set("bytes", len(body))
+                download.set("wire_bytes", resp.num_bytes_downloaded)
+        return resp, body.decode(resp.encoding or "utf-8", errors="replace")
+
+    async def _read_body(self, resp: httpx.Response, url: str, max_bytes: int) -> bytes:
+        encoding = (resp.headers.get("Content-Encoding") or "identity").lower()
+        source: AsyncIterator[bytes]
+        if resp.is_stream_consumed:
+            # body already read and decoded by the transport (in-memory
+            # responses); the limits still apply to the decoded bytes
+            decoder, source = make_decoder(None), _single(resp.content)
+        else:
+            decoder, source = make_decoder(encoding), resp.aiter_raw()
+        if decoder is None:
+            self._reject(url, "encoding", f"unsupported Content-Encoding {encoding}")
+        declared = resp.headers.get("Content-Length") or ""
+        if declared.isdigit() and int(declared) > max_bytes:
+            # even the compressed body is over the limit: don't download it
+            self._reject(url, "size", f"body exceeds {max_bytes} bytes")
+
+        chunks = []
+        total = 0
+        try:
+            async for raw in source:
+                chunk = decoder.decode(raw, max_bytes - total)
+                total += len(chunk)
+                if (
+                    total > _RATIO_FLOOR_BYTES
+                    and total > self.max_compression_ratio * resp.num_bytes_downloaded
+                ):
+                    self._reject(
+                        url,
+                        "ratio",
+                        f"compression ratio above {self.max_compression_ratio:g}",
+                    )
+                chunks.append(chunk)
+        except DecompressionLimitExceeded:
+            self._reject(url, "size", f"body exceeds {max_bytes} bytes")
+        except DecompressionError as exc:
+            self._reject(url, "encoding", f"corrupt {encoding} body: {exc}")
+
+        compressed = resp.num_bytes_downloaded
+        metrics.incr("fetch.bytes_compressed", compressed, encoding=encoding)
+        metrics.incr("fetch.bytes_decompressed", total, encoding=encoding)
+        if compressed:
+            metrics.observe("fetch.compression_ratio", total / compressed)
+        return b"".join(chunks)
+
+    def _reject(self, url: str, reason: str, message: str) -> NoReturn:
+        metrics.incr("fetch.rejected_bodies", reason=reason)
+        logger.warning("Rejected response body of %s: %s", url, message)
+        # the same response would be rejected again: do not retry
+        raise ScrapeError(f"Response rejected: {message}", retryable=False)
+
+
+def _connect_trace(parent: Any) -> Callable[[str, dict], Awaitable[None]]:
+    """httpx trace hook recording TCP connect and TLS handshake spans."""
+    started: Dict[str, int] = {}
+
+    async def trace(event: str, info: dict) -> None:
+        if not event.startswith("connection."):
+            return
+        step, _, phase = event[len("connection.") :].rpartition(".")
+        if phase == "started":
+            started[step] = time.time_ns()
+        elif step in started and phase in ("complete", "failed"):
+            name = "tls" if step == "start_tls" else "connect"
+            attributes = (
+                {"error": repr(info.get("exception"))} if phase == "failed" else {}
+            )
+            tracer.record(name, started.pop(step), time.time_ns(), parent, **attributes)
+
+    return trace
+
+
+async def _single(data: bytes) -> AsyncIterator[bytes]:
+    yield data
+
+
+def __getattr__(name: str) -> Any:
+    # httpx is imported on first use (it is the heaviest import of the API);
+    # `scrape_provider_http.httpx` still resolves for callers and test patches.
+    if name == "httpx":
+        import httpx
+
+        return httpx
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-__all__ = ["HttpxScrapeProvider"]
+__all__ = ["FetchedPage", "HttpxScrapeProvider", "RobotsCache"]
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from src.domain.scrape import ScrapeResult
+from src.log import logger
+from src.metrics import metrics
+
+Row = Dict[str, Any]
+
+
+def result_row(result: ScrapeResult, error: Optional[str] = None) -> Row:
+    """Flatten a result into the row stored by every sink."""
+    return {
+        "url": result.url,
+        "data": result.data,
+        "error": error,
+        "scraped_at": time.time(),
+    }
+
+
+def encode_data(row: Row) -> str:
+    return json.dumps(row["data"], ensure_ascii=False)
+
+
+class BatchingSink(ABC):
+    """Base class buffering rows and writing them in batches.
+
+    A batch is written when `flush_size` rows are buffered or, if
+    `flush_interval` is set, when the oldest buffered row is that many
+    seconds old. Writes run in a worker thread (`_write_batch`) so file and
+    database IO never blocks the event loop; batches are written in order.
+    A failed write puts its rows back at the head of the buffer and raises,
+    so the next flush retries them and `close` fails if they never land.
+    """
+
+    kind = "base"
+
+    def __init__(self, flush_size: int = 500, flush_interval: Optional[float] = 1.0):
+        self.flush_size = max(1, flush_size)
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self._buffer: List[Row] = []
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+        self._closed = False
+
+    # -- subclass hooks (run in a worker thread) -----------------------------
+
+    @abstractmethod
+    def _write_batch(self, rows: List[Row]) -> None: ...
+
+    def _close(self) -> None:
+        pass
+
+    # -- ResultSink -----------------------------------------------------------
+
+    async def write(self, result: ScrapeResult, error: Optional[str] = None) -> None:
+        if self._closed:
+            raise RuntimeError("sink is closed")
+        self._buffer.append(result_row(result, error))
+        if len(self._buffer) >= self.flush_size:
+            await self.flush()
+        elif self.flush_interval and self._timer is None:
+            self._timer = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def flush(self) -> None:
+        async with self._lock:
+            if not self._buffer:
+                return
+            rows, self._buffer = self._buffer, []
+            start = time.perf_counter()
+            try:
+                await asyncio.to_thread(self._write_batch, rows)
+            except BaseException:
+                self._buffer = rows + self._buffer
+                metrics.incr("sink.flush_errors", sink=self.kind)
+                raise
+            self.rows_written += len(rows)
+            metrics.incr("sink.rows_written", len(rows), sink=self.kind)
+            metrics.observe(
+                "sink.flush_seconds", time.perf_counter() - start, sink=self.kind
+            )
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        try:
+            await self.flush()
+        finally:
+            # release the file/connection even if the last batch failed; the
+            # error still reaches the caller
+            self._closed = True
+            await asyncio.to_thread(self._close)
+        logger.debug("Sink %s closed rows=%s", self.kind, self.rows_written)
+
+    async def _flush_later(self) -> None:
+        try:
+            await asyncio.sleep(self.flush_interval or 0)
+            self._timer = None
+            await self.flush()
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            logger.exception("Periodic flush of %s sink failed", self.kind)
+
+    async def __aenter__(self) -> "BatchingSink":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+
+__all__ = ["BatchingSink", "Row", "encode_data", "result_row"]
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import IO, List, Optional
+
+from src.adapters.sinks.batching import BatchingSink, Row
+
+
+class JsonlSink(BatchingSink):
+    """Append-only JSON-lines file, rotated once it exceeds `max_bytes`.
+
+    Rotated files are renamed `<stem>.00001<suffix>`, `<stem>.00002<suffix>`
+    and so on, so the active file always keeps the configured name.
+    """
+
+    kind = "jsonl"
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: Optional[int] = None,
+        flush_size: int = 500,
+        flush_interval: Optional[float] = 1.0,
+    ):
+        super().__init__(flush_size=flush_size, flush_interval=flush_interval)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.rotated: List[str] = []
+        self._fh: Optional[IO[str]] = None
+
+    def _open(self) -> IO[str]:
+        if self._fh is None:
+            self._fh = open(self.path, "a", encoding="utf-8")
+        return self._fh
+
+    def _rotate(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        stem, suffix = os.path.splitext(self.path)
+        index = len(self.rotated) + 1
+        target = f"{stem}.{index:05d}{suffix}"
+        while os.path.exists(target):
+            index += 1
+            target = f"{stem}.{index:05d}{suffix}"
+        os.replace(self.path, target)
+        self.rotated.append(target)
+
+    def _write_batch(self, rows: List[Row]) -> None:
+        fh = self._open()
+        fh.write("".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows))
+        fh.flush()
+        if self.max_bytes and fh.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+__all__ = ["JsonlSink"]
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from typing import Any, List, Optional
+
+from src.adapters.sinks.batching import BatchingSink, Row, encode_data
+
+
+class ParquetSink(BatchingSink):
+    """Parquet file written with `pyarrow` (optional dependency).
+
+    Every flushed batch becomes one row group, so `flush_size` is the row
+    group size. `data` is stored as a JSON string column because selector
+    keys differ between requests. The file footer is only written on
+    `close()`.
+    """
+
+    kind = "parquet"
+
+    def __init__(
+        self,
+        path: str,
+        flush_size: int = 10_000,
+        flush_interval: Optional[float] = None,
+        compression: str = "zstd",
+    ):
+        super().__init__(flush_size=flush_size, flush_interval=flush_interval)
+        try:
+            import pyarrow as pa  # type: ignore[import-not-found,import-untyped]
+            import pyarrow.parquet as pq  # type: ignore[import-not-found,import-untyped]
+        except ImportError as exc:  # pragma: no cover - depends on environment
+            raise RuntimeError(
+                "pyarrow is not installed; install it or use the jsonl/sqlite sinks"
+            ) from exc
+        self._pa = pa
+        self.path = path
+        self._schema = pa.schema(
+            [
+                ("url", pa.string()),
+                ("data", pa.string()),
+                ("error", pa.string()),
+                ("scraped_at", pa.float64()),
+            ]
+        )
+        self._writer: Any = pq.ParquetWriter(
+            path, self._schema, compression=compression
+        )
+
+    def _write_batch(self, rows: List[Row]) -> None:
+        pa = self._pa
+        table = pa.Table.from_arrays(
+            [
+                pa.array([row["url"] for row in rows], pa.string()),
+                pa.array([encode_data(row) for row in rows], pa.string()),
+                pa.array([row["error"] for row in rows], pa.string()),
+                pa.array([row["scraped_at"] for row in rows], pa.float64()),
+            ],
+            schema=self._schema,
+        )
+        self._writer.write_table(table, row_group_size=len(rows))
+
+    def _close(self) -> None:
+        self._writer.close()
+
+
+__all__ = ["ParquetSink"]
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import List, Optional
+
+from src.adapters.sinks.batching import BatchingSink, Row, encode_data
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    data TEXT NOT NULL,
+    error TEXT,
+    scraped_at REAL NOT NULL
+)
+"""
+
+
+class SQLiteSink(BatchingSink):
+    """Insert results into a SQLite table, one transaction per batch.
+
+    `data` is stored as JSON text (queryable with SQLite's JSON functions).
+    """
+
+    kind = "sqlite"
+
+    def __init__(
+        self,
+        path: str,
+        table: str = "scrape_results",
+        flush_size: int = 500,
+        flush_interval: Optional[float] = 1.0,
+    ):
+        super().__init__(flush_size=flush_size, flush_interval=flush_interval)
+        if not table.isidentifier():
+            raise ValueError(f"invalid table name: {table!r}")
+        self.path = path
+        self.table = table
+        # batches are written from worker threads, one at a time
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA.format(table=table))
+        self._conn.commit()
+        self._insert = (
+            f"INSERT INTO {table} (url, data, error, scraped_at) VALUES (?, ?, ?, ?)"
+        )
+
+    def _write_batch(self, rows: List[Row]) -> None:
+        with self._conn:
+            self._conn.executemany(
+                self._insert,
+                [
+                    (row["url"], encode_data(row), row["error"], row["scraped_at"])
+                    for row in rows
+                ],
+            )
+
+    def _close(self) -> None:
+        self._conn.close()
+
+
+__all__ = ["SQLiteSink"]
@@ -1,12 +1,16 @@
+import time
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
+from src.adapters.api.memory import MemoryWatchdog
 from src.adapters.api.middleware import add_middlewares
-from src.adapters.api.routes import health, scrape
+from src.adapters.api.routes import admin, health, monitors, scrape
 from src.application.factory import create_facade
+from src.application.monitor_scheduler import MonitorScheduler
 from src.config import api_settings, ensure_api_required_env_vars
-from src.log import logger
+from src.log import logger, setup_logging, shutdown_logging
+from src.tracing import configure_tracing, tracer
 
 
 @asynccontextmanager
@@ -14,8 +18,34 @@ async def lifespan(app: FastAPI):
     logger.info(
         f"La aplicación se está iniciando en ambiente: {api_settings.ENVIRONMENT}"
     )
+    if api_settings.STARTUP_WARMUP:
+        start = time.perf_counter()
+        selectors = [
+            s.strip() for s in (api_settings.WARMUP_SELECTORS or "").split(",")
+        ]
+        try:
+            await api_facade.warmup([s for s in selectors if s])
+        except Exception:
+            # a bad WARMUP_SELECTORS value must not prevent start-up
+            logger.exception("Warmup failed")
+        logger.info("Warmup done in %.1f ms", (time.perf_counter() - start) * 1000)
+    monitor_scheduler.start()
+    watchdog = MemoryWatchdog.from_settings(api_settings, app.state.admission)
+    if watchdog is not None:
+        watchdog.start()
     yield
+    if watchdog is not None:
+        await watchdog.stop()
+    await monitor_scheduler.stop()
+    await api_facade.aclose()
+    admission = getattr(app.state, "admission", None)
+    if admission is not None and admission.lag_monitor is not None:
+        admission.lag_monitor.stop()
+    # Export spans still queued
+    tracer.shutdown()
     logger.info("La aplicación se ha apagado.")
+    # Flush queued log records before the worker exits
+    shutdown_logging()
 
 
 # Instantiate facade for the API adapter
@@ -23,11 +53,16 @@ async def lifespan(app: FastAPI):
 # creating API resources. This prevents the application from starting with a
 # missing API secret while keeping CLI imports unaffected.
 ensure_api_required_env_vars()
+setup_logging()
+configure_tracing(api_settings)
 
 api_facade = create_facade(
     project_name=api_settings.PROJECT_NAME, environment=api_settings.ENVIRONMENT
 )
 
+# Change monitors share the facade's domain service (and its provider)
+monitor_scheduler = MonitorScheduler(api_facade.scrape_service)
+
 
 app = FastAPI(
     title=f"{api_settings.PROJECT_NAME} ({api_settings.ENVIRONMENT})",
@@ -41,3 +76,5 @@ add_middlewares(app, api_settings)
 # Include routers
 app.include_router(health.router)  # type: ignore
 app.include_router(scrape.router)  # type: ignore
+app.include_router(monitors.router)  # type: ignore
+app.include_router(admin.router)  # type: ignore
@@ -0,0 +1,456 @@
+"""Command-line batch runner.
+
+Reads scrape requests (JSONL or CSV, from a file or stdin), runs them
+through `ScrapeService` with bounded concurrency and streams one JSON line
+per request to stdout or a file. Progress and a final throughput/latency
+summary go to stderr. Completed rows are checkpointed so an interrupted run
+can continue with `--resume`.
+
+Usage:
+    python -m src.application.cli urls.jsonl -o results.jsonl -c 50
+    cat urls.csv | python -m src.application.cli - --format csv \\
+        --selectors '{"title": "h1"}'
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Set, TextIO, Tuple
+
+from src.application.factory import create_facade
+from src.config import ensure_common_required_env_vars, get_core_settings
+from src.domain.exceptions import ScrapeError
+from src.domain.scrape import ScrapeRequest
+from src.domain.selectors import SelectorInput, parse_selectors
+from src.log import logger, setup_logging
+from src.tracing import configure_tracing, tracer
+
+# (line number, request) or (line number, error message) for invalid rows
+InputRow = Tuple[int, Any]
+
+
+def _json_field(value: Any, name: str) -> Optional[Dict[str, str]]:
+    if value in (None, ""):
+        return None
+    if isinstance(value, str):
+        value = json.loads(value)
+    if not isinstance(value, dict):
+        raise ValueError(f"{name} must be an object")
+    return {str(k): str(v) for k, v in value.items()}
+
+
+def _selectors_field(value: Any) -> Optional[Dict[str, SelectorInput]]:
+    """Selector map from JSON text or an object (values may be specs)."""
+    if value in (None, ""):
+        return None
+    if isinstance(value, str):
+        value = json.loads(value)
+    if not isinstance(value, dict):
+        raise ValueError("selectors must be an object")
+    parse_selectors(value)
+    return value
+
+
+def _build_request(row: Dict[str, Any], args: argparse.Namespace) -> ScrapeRequest:
+    url = (row.get("url") or "").strip()
+    if not url:
+        raise ValueError("missing url")
+    selectors = _selectors_field(row.get("selectors")) or args.selectors
+    if not selectors:
+        raise ValueError("no selectors (set them per row or with --selectors)")
+    timeout = row.get("timeout")
+    respect_robots = row.get("respect_robots")
+    if isinstance(respect_robots, str):
+        respect_robots = respect_robots.strip().lower() not in ("0", "false", "no")
+    return ScrapeRequest(
+        url=url,
+        selectors=selectors,
+        headers=_json_field(row.get("headers"), "headers"),
+        timeout=float(timeout) if timeout not in (None, "") else args.timeout,
+        respect_robots=(
+            args.respect_robots if respect_robots in (None, "") else respect_robots
+        ),
+    )
+
+
+def read_requests(
+    source: TextIO, fmt: str, args: argparse.Namespace
+) -> Iterator[InputRow]:
+    """Yield `(line, ScrapeRequest)` or `(line, error)` for every input row.
+
+    JSONL rows are objects with `url`, `selectors` and optional `headers`,
+    `timeout` and `respect_robots` (a bare URL string is accepted too). CSV
+    rows need a `url` column and either a JSON `selectors` column or one
+    column per selector name.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(source)
+        known = {"url", "selectors", "headers", "timeout", "respect_robots"}
+        for line, row in enumerate(reader):
+            try:
+                extra = {k: v for k, v in row.items() if k and k not in known and v}
+                if extra and not row.get("selectors"):
+                    row = {**row, "selectors": extra}
+                yield line, _build_request(row, args)
+            except (ValueError, TypeError) as exc:
+                yield line, f"invalid input: {exc}"
+        return
+
+    for line, raw in enumerate(source):
+        raw = raw.strip()
+        if not raw:
+            yield line, "invalid input: empty line"
+            continue
+        try:
+            data = json.loads(raw)
+            if isinstance(data, str):
+                data = {"url": data}
+            if not isinstance(data, dict):
+                raise ValueError("row must be an object")
+            yield line, _build_request(data, args)
+        except (ValueError, TypeError) as exc:
+            yield line, f"invalid input: {exc}"
+
+
+class Checkpoint:
+    """Input rows already written to the output, persisted as JSON.
+
+    Rows finish out of order, so the file keeps the first row not yet done
+    (`next`) plus the done rows after it.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.next = 0
+        self.done: Set[int] = set()
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> "Checkpoint":
+        checkpoint = cls(path)
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as fh:
+                state = json.load(fh)
+            checkpoint.next = int(state.get("next", 0))
+            checkpoint.done = set(state.get("done", []))
+        return checkpoint
+
+    def is_done(self, line: int) -> bool:
+        return line < self.next or line in self.done
+
+    def mark(self, line: int) -> None:
+        self.done.add(line)
+        while self.next in self.done:
+            self.done.remove(self.next)
+            self.next += 1
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"next": self.next, "done": sorted(self.done)}, fh)
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+@dataclass
+class RunStats:
+    ok: int = 0
+    failed: int = 0
+    skipped: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    latencies: List[float] = field(default_factory=list)
+
+    @property
+    def done(self) -> int:
+        return self.ok + self.failed
+
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+
+        def pct(p: float) -> float:
+            if not ordered:
+                return 0.0
+            idx = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+            return round(ordered[idx] * 1000, 1)
+
+        return {
+            "ok": self.ok,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "elapsed_s": round(time.perf_counter() - self.started, 3),
+            "throughput_per_s": round(self.rate(), 2),
+            "latency_ms": {
+                "p50": pct(50),
+                "p90": pct(90),
+                "p99": pct(99),
+                "max": pct(100),
+            },
+        }
+
+
+async def run(
+    requests: Iterator[InputRow],
+    out: TextIO,
+    facade: Any,
+    concurrency: int = 20,
+    checkpoint: Optional[Checkpoint] = None,
+    progress: Optional[TextIO] = None,
+    progress_interval: float = 2.0,
+    checkpoint_interval: float = 5.0,
+) -> RunStats:
+    """Scrape every row of `requests`, writing one JSON line per row to `out`."""
+    checkpoint = checkpoint or Checkpoint(None)
+    stats = RunStats()
+
+    def _persist() -> None:
+        out.flush()
+        checkpoint.save()
+
+    def _emit(line: int, row: Dict[str, Any]) -> None:
+        out.write(json.dumps({"line": line, **row}, ensure_ascii=False) + "\n")
+        checkpoint.mark(line)
+
+    async def _worker() -> None:
+        for line, request in requests:
+            if checkpoint.is_done(line):
+                stats.skipped += 1
+                continue
+            if isinstance(request, str):
+                stats.failed += 1
+                _emit(line, {"url": None, "data": None, "error": request})
+                continue
+            start = time.perf_counter()
+            try:
+                result = await facade.scrape(request)
+            except ScrapeError as exc:
+                stats.failed += 1
+                _emit(
+                    line,
+                    {
+                        "url": request.url,
+                        "data": None,
+                        "error": str(exc),
+                        "status_code": exc.status_code,
+                    },
+                )
+                continue
+            except Exception as exc:
+                # e.g. an invalid selector in this row: record it and go on
+                # with the rest of the file
+                logger.exception("CLI: row %s failed", line)
+                stats.failed += 1
+                _emit(
+                    line,
+                    {
+                        "url": request.url,
+                        "data": None,
+                        "error": f"{type(exc).__name__}: {exc}",
+                    },
+                )
+                continue
+            elapsed = time.perf_counter() - start
+            stats.ok += 1
+            stats.latencies.append(elapsed)
+            _emit(
+                line,
+                {
+                    "url": result.url,
+                    "data": result.data,
+                    "error": None,
+                    "elapsed_ms": round(elapsed * 1000, 1),
+                },
+            )
+
+    async def _ticker() -> None:
+        last_save = time.monotonic()
+        while True:
+            await asyncio.sleep(progress_interval)
+            if progress is not None:
+                progress.write(
+                    f"[scrape] {stats.done} done ({stats.ok} ok, {stats.failed} "
+                    f"failed, {stats.skipped} skipped) {stats.rate():.1f}/s\n"
+                )
+                progress.flush()
+            if time.monotonic() - last_save >= checkpoint_interval:
+                _persist()
+                last_save = time.monotonic()
+
+    ticker = asyncio.create_task(_ticker())
+    try:
+        await asyncio.gather(*(_worker() for _ in range(max(1, concurrency))))
+    finally:
+        ticker.cancel()
+        # also reached on Ctrl-C: keep what was written so far resumable
+        _persist()
+    return stats
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.application.cli",
+        description="Scrape URLs listed in a JSONL/CSV file (or stdin).",
+    )
+    parser.add_argument("input", help="input file, or - for stdin")
+    parser.add_argument(
+        "--format",
+        choices=("jsonl", "csv"),
+        help="input format (default: from the file extension, jsonl for stdin)",
+    )
+    parser.add_argument(
+        "-o", "--output", help="output JSONL file (default: stdout)", default="-"
+    )
+    parser.add_argument(
+        "--selectors",
+        type=_selectors_field,
+        help='default selectors as JSON, e.g. \'{"title": "h1"}\'',
+    )
+    parser.add_argument("-c", "--concurrency", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument(
+        "--no-robots",
+        dest="respect_robots",
+        action="store_false",
+        help="skip robots.txt checks",
+    )
+    parser.add_argument(
+        "--parser-workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="processes parsing HTML (0 parses on the event loop)",
+    )
+    parser.add_argument(
+        "--no-pool",
+        dest="pooled",
+        action="store_false",
+        help="open a new HTTP client per URL instead of reusing connections",
+    )
+    parser.add_argument("--max-connections", type=int, default=100)
+    parser.add_argument(
+        "--robots-ttl",
+        type=float,
+        default=3600.0,
+        help="seconds robots.txt rules are cached per site (0 disables)",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        help="checkpoint file (default: <output>.checkpoint when writing a file)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="skip rows recorded in the checkpoint and append to the output",
+    )
+    parser.add_argument("--progress-interval", type=float, default=2.0)
+    parser.add_argument("-q", "--quiet", action="store_true", help="no progress")
+    parser.add_argument("--log-level", default="WARNING")
+    return parser
+
+
+def _input_format(args: argparse.Namespace) -> str:
+    if args.format:
+        return args.format
+    return "csv" if args.input.lower().endswith(".csv") else "jsonl"
+
+
+async def _main(args: argparse.Namespace) -> RunStats:
+    checkpoint_path = args.checkpoint or (
+        f"{args.output}.checkpoint" if args.output != "-" else None
+    )
+    if args.resume and not checkpoint_path:
+        raise SystemExit("--resume needs --checkpoint when writing to stdout")
+    checkpoint = (
+        Checkpoint.load(checkpoint_path) if args.resume else Checkpoint(checkpoint_path)
+    )
+    if not args.resume:
+        checkpoint.clear()
+
+    parser_pool = None
+    if args.parser_workers > 0:
+        # spawn: the parent already runs threads (logging, executors)
+        parser_pool = ProcessPoolExecutor(
+            max_workers=args.parser_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    core_settings = get_core_settings()
+    facade = create_facade(
+        project_name=core_settings.PROJECT_NAME,
+        environment=core_settings.ENVIRONMENT,
+        http_options={
+            "pooled": args.pooled,
+            "max_connections": args.max_connections,
+            "robots_cache_ttl": args.robots_ttl or None,
+        },
+        parser_pool=parser_pool,
+    )
+
+    source = (
+        sys.stdin
+        if args.input == "-"
+        else open(args.input, encoding="utf-8", newline="")
+    )
+    if args.output == "-":
+        out = sys.stdout
+    else:
+        out = open(args.output, "a" if args.resume else "w", encoding="utf-8")
+    try:
+        return await run(
+            read_requests(source, _input_format(args), args),
+            out,
+            facade,
+            concurrency=args.concurrency,
+            checkpoint=checkpoint,
+            progress=None if args.quiet else sys.stderr,
+            progress_interval=args.progress_interval,
+        )
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+        await facade.aclose()
+        if parser_pool is not None:
+            parser_pool.shutdown(cancel_futures=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    ensure_common_required_env_vars()
+    # stdout carries the results
+    setup_logging(stream=sys.stderr, log_level=args.log_level)
+    configure_tracing(get_core_settings())
+    try:
+        stats = asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        sys.stderr.write("[scrape] interrupted; rerun with --resume to continue\n")
+        return 130
+    finally:
+        tracer.shutdown()
+    summary = stats.summary()
+    logger.info("CLI run finished %s", summary)
+    if not args.quiet:
+        sys.stderr.write(f"[scrape] summary {json.dumps(summary)}\n")
+    return 0
+
+
+__all__ = ["Checkpoint", "RunStats", "build_parser", "main", "read_requests", "run"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
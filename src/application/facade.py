@@ -1,15 +1,19 @@
-from typing import Optional, final
+import asyncio
+from typing import Any, Dict, Iterable, Iterator, Optional, final
 
+from src.domain.exceptions import ScrapeError
+from src.domain.ports.result_sink import ResultSink
 from src.domain.scrape import ScrapeRequest, ScrapeResult
 from src.domain.scrape_service import ScrapeService
 from src.log import logger
+from src.tracing import tracer
 
 
 @final
 class ApplicationFacade:
     """
     Application Facade.
-    Exposes `health_check` and `scrape` application operations.
+    Exposes `health_check`, `scrape` and `scrape_batch` application operations.
     """
 
     def __init__(
@@ -30,6 +34,37 @@ class ApplicationFacade:
         # single annotated assignment to keep mypy happy
         self.scrape_service: ScrapeService = scrape_service
 
+    def _providers(self) -> Iterator[Any]:
+        # the provider and, for decorators (resilience, recording), the
+        # providers they wrap
+        provider: Any = self.scrape_service.provider
+        while provider is not None:
+            yield provider
+            provider = getattr(provider, "provider", None)
+
+    def proxy_pool(self) -> Any:
+        """The upstream `ProxyPool` in use, if any."""
+        for provider in self._providers():
+            pool = getattr(provider, "proxy_pool", None)
+            if pool is not None:
+                return pool
+        return None
+
+    async def warmup(self, selectors: Iterable[str] = ()) -> None:
+        """Pre-load parsers, compile selectors and create HTTP pools."""
+        await self.scrape_service.warmup(selectors)
+        for provider in self._providers():
+            warmup = getattr(provider, "warmup", None)
+            if warmup is not None:
+                await warmup()
+
+    async def aclose(self) -> None:
+        """Release pooled connections held by the providers."""
+        for provider in self._providers():
+            aclose = getattr(provider, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
     def health_check(self):
         logger.info("Facade: health_check called")
         return self.project_name, self.environment
@@ -37,4 +72,57 @@ class ApplicationFacade:
     async def scrape(self, request: ScrapeRequest) -> ScrapeResult:
         """Delegate scraping work to the domain service."""
         logger.debug("Facade: scrape url=%s", request.url)
-        return await self.scrape_service.scrape(request)
+        with tracer.span("facade.scrape", url=request.url):
+            return await self.scrape_service.scrape(request)
+
+    async def scrape_batch(
+        self,
+        requests: Iterable[ScrapeRequest],
+        sink: ResultSink,
+        concurrency: int = 10,
+    ) -> Dict[str, int]:
+        """Scrape many requests straight into `sink` (results are not kept).
+
+        Failed URLs are written with their error so the sink holds one row
+        per request. The sink is flushed but not closed. Returns counts of
+        `written` and `failed` rows and the `bytes` of the pages fetched.
+        """
+        counts = {"written": 0, "failed": 0, "bytes": 0}
+        # workers pull from one shared iterator, so `requests` may be a lazy
+        # generator and only `concurrency` requests are in flight at a time
+        pending = iter(requests)
+
+        async def _worker() -> None:
+            for request in pending:
+                try:
+                    result = await self.scrape_service.scrape(request)
+                except ScrapeError as exc:
+                    counts["failed"] += 1
+                    await sink.write(ScrapeResult(url=request.url, data={}), str(exc))
+                    continue
+                except Exception as exc:
+                    # e.g. an invalid selector: fail this row, keep the others
+                    # going (letting it escape would leave sibling workers
+                    # writing into a sink the caller is closing)
+                    logger.exception("Facade: scrape_batch item failed %s", request.url)
+                    counts["failed"] += 1
+                    await sink.write(
+                        ScrapeResult(url=request.url, data={}),
+                        f"{type(exc).__name__}: {exc}",
+                    )
+                    continue
+                counts["written"] += 1
+                counts["bytes"] += (result.meta or {}).get("bytes", 0)
+                await sink.write(result)
+
+        with tracer.span("facade.scrape_batch", concurrency=concurrency) as span:
+            await asyncio.gather(*(_worker() for _ in range(max(1, concurrency))))
+            await sink.flush()
+            span.set("written", counts["written"])
+            span.set("failed", counts["failed"])
+        logger.info(
+            "Facade: scrape_batch written=%s failed=%s",
+            counts["written"],
+            counts["failed"],
+        )
+        return counts
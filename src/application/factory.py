@@ -1,25 +1,168 @@
-from typing import Any, Optional
+from typing import Any, Dict, Optional
 
 from src.application.facade import ApplicationFacade
 
 
+def _dns_proxy_client_factory(dns_cache: Any, core_settings: Any) -> Any:
+    """Proxy clients that resolve the proxy hosts through the DNS cache."""
+
+    def factory(proxy_url: str) -> Any:
+        import httpx
+
+        from src.adapters.http.dns import build_dns_transport
+
+        limits = httpx.Limits(
+            max_connections=core_settings.SCRAPE_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=core_settings.SCRAPE_HTTP_MAX_CONNECTIONS,
+        )
+        transport = build_dns_transport(
+            dns_cache,
+            happy_eyeballs_delay=core_settings.HAPPY_EYEBALLS_DELAY,
+            proxy=proxy_url,
+            limits=limits,
+        )
+        return httpx.AsyncClient(transport=transport, timeout=10.0)
+
+    return factory
+
+
+def _build_base_provider(core_settings: Any, **http_options: Any) -> Any:
+    """Build the live, recording or replaying provider (SCRAPE_PROVIDER_MODE).
+
+    `http_options` are extra `HttpxScrapeProvider` arguments (e.g. `pooled`,
+    `robots_cache_ttl`) for the live and record modes.
+    """
+    mode = core_settings.SCRAPE_PROVIDER_MODE.lower()
+    if mode == "replay":
+        from src.adapters.http.recording import CassetteArchive, ReplayScrapeProvider
+
+        return ReplayScrapeProvider(
+            CassetteArchive(core_settings.SCRAPE_ARCHIVE_PATH),
+            simulate_latency=core_settings.REPLAY_SIMULATE_LATENCY,
+            latency_scale=core_settings.REPLAY_LATENCY_SCALE,
+        )
+
+    from src.adapters.http.scrape_provider_http import HttpxScrapeProvider
+
+    dns_cache = None
+    if core_settings.DNS_CACHE_ENABLED:
+        from src.adapters.http.dns import DNSCache, build_resolver
+
+        dns_cache = DNSCache(
+            resolver=build_resolver(
+                core_settings.DNS_RESOLVER, core_settings.DNS_RESOLVER_THREADS
+            ),
+            default_ttl=core_settings.DNS_CACHE_DEFAULT_TTL,
+            prefetch_ratio=core_settings.DNS_CACHE_PREFETCH_RATIO,
+        )
+
+    proxy_pool = None
+    if core_settings.SCRAPE_PROXIES:
+        from src.adapters.http.proxy_pool import ProxyPool
+
+        proxy_kwargs: Dict[str, Any] = {}
+        if dns_cache is not None:
+            proxy_kwargs["client_factory"] = _dns_proxy_client_factory(
+                dns_cache, core_settings
+            )
+        proxy_pool = ProxyPool.from_settings(core_settings, **proxy_kwargs)
+
+    options: Dict[str, Any] = {
+        "proxy_pool": proxy_pool,
+        "pooled": core_settings.SCRAPE_HTTP_POOLED,
+        "max_connections": core_settings.SCRAPE_HTTP_MAX_CONNECTIONS,
+        "robots_cache_ttl": core_settings.ROBOTS_CACHE_TTL or None,
+        "max_body_bytes": core_settings.SCRAPE_MAX_BODY_BYTES,
+        "max_compression_ratio": core_settings.SCRAPE_MAX_COMPRESSION_RATIO,
+        **http_options,
+    }
+    provider: Any = HttpxScrapeProvider(
+        dns_cache=dns_cache,
+        happy_eyeballs_delay=core_settings.HAPPY_EYEBALLS_DELAY,
+        **options,
+    )
+    if mode == "record":
+        from src.adapters.http.recording import (
+            CassetteArchive,
+            RecordingScrapeProvider,
+        )
+
+        provider = RecordingScrapeProvider(
+            provider, CassetteArchive(core_settings.SCRAPE_ARCHIVE_PATH)
+        )
+    return provider
+
+
+def _build_provider(base: Any = None, **http_options: Any) -> Any:
+    """Build the outbound provider according to core settings.
+
+    `base` replaces the settings-selected provider (e.g. a replay provider in
+    benchmarks); the optional resilience layer still wraps it.
+    """
+    from src.config import core_settings
+
+    provider = (
+        base
+        if base is not None
+        else _build_base_provider(core_settings, **http_options)
+    )
+    if core_settings.SCRAPE_RESILIENCE_ENABLED:
+        from src.adapters.http.resilient_provider import ResilientScrapeProvider
+
+        provider = ResilientScrapeProvider.from_settings(provider, core_settings)
+    return provider
+
+
+def build_sink(kind: str, path: str, core_settings: Any = None) -> Any:
+    """Build a `ResultSink` ("jsonl", "parquet" or "sqlite") writing to `path`."""
+    if core_settings is None:
+        from src.config import core_settings
+
+    kind = kind.lower()
+    batching = {
+        "flush_size": core_settings.SINK_FLUSH_SIZE,
+        "flush_interval": core_settings.SINK_FLUSH_INTERVAL or None,
+    }
+    if kind == "jsonl":
+        from src.adapters.sinks.jsonl_sink import JsonlSink
+
+        return JsonlSink(
+            path, max_bytes=core_settings.SINK_JSONL_MAX_BYTES or None, **batching
+        )
+    if kind == "sqlite":
+        from src.adapters.sinks.sqlite_sink import SQLiteSink
+
+        return SQLiteSink(path, **batching)
+    if kind == "parquet":
+        from src.adapters.sinks.parquet_sink import ParquetSink
+
+        return ParquetSink(path, **batching)
+    raise ValueError(f"unknown sink kind: {kind!r}")
+
+
 def create_facade(
     project_name: str, environment: str, **kwargs: Any
 ) -> ApplicationFacade:
     """Create an ApplicationFacade with sensible defaults.
 
-    Accepts optional keyword args (e.g. `scrape_service`) to inject domain
-    dependencies for testing or alternate implementations.
+    Accepts optional keyword args (e.g. `scrape_service`, or `provider` to
+    use a specific `ScrapeProvider` such as `ReplayScrapeProvider`) to inject
+    domain dependencies for testing or alternate implementations.
+    `http_options` are passed to the HTTP adapter and `parser_pool` to the
+    domain service.
     """
     scrape_service = kwargs.get("scrape_service")
     if scrape_service is None:
         # Lazy import adapter and domain types to avoid import cycles at module
         # import time for CLI/test runners that may not need HTTP adapters.
-        from src.adapters.http.scrape_provider_http import HttpxScrapeProvider
         from src.domain.scrape_service import ScrapeService
 
-        provider = HttpxScrapeProvider()
-        scrape_service = ScrapeService(provider=provider)
+        scrape_service = ScrapeService(
+            provider=_build_provider(
+                kwargs.get("provider"), **kwargs.get("http_options", {})
+            ),
+            parser_pool=kwargs.get("parser_pool"),
+        )
 
     return ApplicationFacade(
         project_name=project_name,
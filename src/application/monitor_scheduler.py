@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import random
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set
+
+from src.domain.exceptions import ScrapeError
+from src.domain.monitor import (
+    Monitor,
+    MonitorEvent,
+    body_hash,
+    diff_data,
+    fingerprint,
+)
+from src.domain.scrape_service import ScrapeService
+from src.log import logger
+from src.metrics import metrics
+
+# Callback invoked for each change event (plain function or coroutine)
+MonitorCallback = Callable[[MonitorEvent], Any]
+
+
+class MonitorScheduler:
+    """In-process asyncio scheduler for change monitors.
+
+    Every monitor runs in its own task: fetch the page, skip parsing when
+    the body hash is unchanged, otherwise extract the selectors and publish
+    a `MonitorEvent` holding only the keys that changed. Events are pushed
+    to registered callbacks and to `subscribe()` streams.
+    """
+
+    def __init__(self, scrape_service: ScrapeService, subscriber_queue_size: int = 100):
+        self.scrape_service = scrape_service
+        self.subscriber_queue_size = subscriber_queue_size
+        self._monitors: Dict[str, Monitor] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._callbacks: List[MonitorCallback] = []
+        self._subscribers: Set["Subscription"] = set()
+        self._running = False
+
+    # -- registry -------------------------------------------------------
+
+    def add(self, monitor: Monitor) -> Monitor:
+        if monitor.id in self._monitors:
+            raise ValueError(f"monitor {monitor.id} already exists")
+        self._monitors[monitor.id] = monitor
+        if self._running:
+            self._start_task(monitor)
+        return monitor
+
+    def remove(self, monitor_id: str) -> bool:
+        monitor = self._monitors.pop(monitor_id, None)
+        task = self._tasks.pop(monitor_id, None)
+        if task is not None:
+            task.cancel()
+        return monitor is not None
+
+    def get(self, monitor_id: str) -> Optional[Monitor]:
+        return self._monitors.get(monitor_id)
+
+    def list_monitors(self, owner: Optional[str] = None) -> List[Monitor]:
+        """All monitors, or only those of `owner` when given."""
+        monitors = list(self._monitors.values())
+        if owner is None:
+            return monitors
+        return [m for m in monitors if m.owner == owner]
+
+    def add_callback(self, callback: MonitorCallback) -> None:
+        self._callbacks.append(callback)
+
+    # -- lifecycle ------------------------------------------------------
+
+    def start(self) -> None:
+        """Start a task per monitor on the running loop."""
+        self._running = True
+        for monitor in self._monitors.values():
+            if monitor.id not in self._tasks:
+                self._start_task(monitor)
+
+    async def stop(self) -> None:
+        self._running = False
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _start_task(self, monitor: Monitor) -> None:
+        self._tasks[monitor.id] = asyncio.get_running_loop().create_task(
+            self._run(monitor), name=f"monitor-{monitor.id}"
+        )
+
+    async def _run(self, monitor: Monitor) -> None:
+        # random initial offset spreads monitors created at the same time
+        await asyncio.sleep(random.uniform(0, monitor.jitter))
+        while True:
+            try:
+                await self.check(monitor)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Monitor %s check crashed", monitor.id)
+            delay = monitor.interval + random.uniform(-monitor.jitter, monitor.jitter)
+            await asyncio.sleep(max(0.0, delay))
+
+    # -- checks ---------------------------------------------------------
+
+    async def check(self, monitor: Monitor) -> Optional[MonitorEvent]:
+        """Run one check; returns the published event, if anything changed."""
+        monitor.checks += 1
+        monitor.last_checked = time.time()
+        try:
+            content = await self.scrape_service.provider.fetch(
+                monitor.url,
+                headers=monitor.headers,
+                timeout=monitor.timeout,
+                respect_robots=monitor.respect_robots,
+            )
+        except ScrapeError as exc:
+            monitor.errors += 1
+            metrics.incr("monitor.errors")
+            logger.warning("Monitor %s fetch failed: %s", monitor.id, exc)
+            return None
+
+        digest = body_hash(content)
+        if digest == monitor.last_body_hash:
+            # identical page: no need to parse or diff
+            metrics.incr("monitor.unchanged_body")
+            return None
+        monitor.last_body_hash = digest
+
+        data = self.scrape_service.extract(content, monitor.selectors)
+        fp = fingerprint(data)
+        if fp == monitor.last_fingerprint:
+            metrics.incr("monitor.unchanged_data")
+            return None
+
+        event = MonitorEvent(
+            monitor_id=monitor.id,
+            url=monitor.url,
+            checked_at=monitor.last_checked,
+            changes=diff_data(monitor.last_data, data),
+            initial=monitor.last_fingerprint is None,
+        )
+        monitor.last_fingerprint = fp
+        monitor.last_data = data
+        monitor.changes += 1
+        metrics.incr("monitor.changes")
+        await self._publish(event)
+        return event
+
+    async def _publish(self, event: MonitorEvent) -> None:
+        for subscription in list(self._subscribers):
+            subscription.push(event)
+        for callback in self._callbacks:
+            try:
+                result = callback(event)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception("Monitor callback failed for %s", event.monitor_id)
+
+    # -- streaming ------------------------------------------------------
+
+    def subscription(self, monitor_id: Optional[str] = None) -> "Subscription":
+        """Register a bounded event queue (optionally for one monitor).
+
+        Slow consumers lose the oldest events rather than holding memory.
+        Call `close()` on the subscription when done.
+        """
+        subscription = Subscription(self, monitor_id, self.subscriber_queue_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    async def subscribe(
+        self, monitor_id: Optional[str] = None
+    ) -> AsyncIterator[MonitorEvent]:
+        """Yield change events (optionally for one monitor) as they happen."""
+        subscription = self.subscription(monitor_id)
+        try:
+            while True:
+                yield await subscription.queue.get()
+        finally:
+            subscription.close()
+
+
+class Subscription:
+    def __init__(
+        self, scheduler: MonitorScheduler, monitor_id: Optional[str], maxsize: int
+    ):
+        self._scheduler = scheduler
+        self.monitor_id = monitor_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    def push(self, event: MonitorEvent) -> None:
+        if self.monitor_id is not None and event.monitor_id != self.monitor_id:
+            return
+        if self.queue.full():
+            self.queue.get_nowait()
+            metrics.incr("monitor.dropped_events")
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[MonitorEvent]:
+        """Next event, or None if nothing arrived within `timeout` seconds."""
+        if not self.queue.empty():
+            return self.queue.get_nowait()
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self._scheduler._subscribers.discard(self)
+
+
+__all__ = ["MonitorCallback", "MonitorScheduler", "Subscription"]
@@ -34,12 +34,23 @@ class ScrapeError(DomainError):
     """Raised when a scraping operation fails (network / HTTP / parsing).
 
     `status_code` may contain the remote HTTP status code (e.g. 403)
-    when the error originated from an HTTP response.
+    when the error originated from an HTTP response. `retry_after` carries
+    the delay in seconds advertised by a `Retry-After` header, if any.
+    `retryable=False` marks failures that repeating the request cannot fix
+    (e.g. a response body rejected by size limits).
     """
 
-    def __init__(self, message: str, status_code: int | None = None):
+    def __init__(
+        self,
+        message: str,
+        status_code: int | None = None,
+        retry_after: float | None = None,
+        retryable: bool = True,
+    ):
         super().__init__(message)
         self.status_code = status_code
+        self.retry_after = retry_after
+        self.retryable = retryable
 
 
 __all__ = [
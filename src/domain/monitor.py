@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class Monitor:
+    """A URL + selector map re-scraped on a schedule to detect changes."""
+
+    id: str
+    url: str
+    selectors: Dict[str, Any]
+    # seconds between checks; each wait is randomized by +/- `jitter` seconds
+    interval: float
+    jitter: float = 0.0
+    headers: Optional[Dict[str, str]] = None
+    timeout: Optional[float] = 10.0
+    respect_robots: bool = True
+    # hashed identity of the API key that created the monitor; None for
+    # monitors registered in-process (visible to nobody through the API)
+    owner: Optional[str] = None
+    # state from the previous check
+    last_body_hash: Optional[str] = None
+    last_fingerprint: Optional[str] = None
+    last_data: Optional[Dict[str, Any]] = None
+    last_checked: Optional[float] = None
+    checks: int = 0
+    changes: int = 0
+    errors: int = 0
+
+
+@dataclass
+class MonitorEvent:
+    """Per-key changes detected by one check of a monitor.
+
+    Each entry of `changes` holds the `added` and `removed` items of that key
+    plus its new full `value`. The first check of a monitor reports every
+    key as added and sets `initial`.
+    """
+
+    monitor_id: str
+    url: str
+    checked_at: float
+    changes: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    initial: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "monitor_id": self.monitor_id,
+            "url": self.url,
+            "checked_at": self.checked_at,
+            "initial": self.initial,
+            "changes": self.changes,
+        }
+
+
+def body_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def fingerprint(data: Dict[str, Any]) -> str:
+    """Stable hash of extracted data (key order independent)."""
+    encoded = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _key_of(item: Any) -> str:
+    return item if isinstance(item, str) else json.dumps(item, sort_keys=True)
+
+
+def _as_list(value: Any) -> List[Any]:
+    # single-value specs (many=False) yield a scalar or None
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def diff_data(
+    old: Optional[Dict[str, Any]], new: Dict[str, Any]
+) -> Dict[str, Dict[str, Any]]:
+    """Return only the keys whose values changed between two extractions.
+
+    Items are compared as multisets so a repeated value that appears once
+    more (or less) is reported too; order-only changes report the new
+    `value` with empty `added`/`removed` lists.
+    """
+    old = old or {}
+    changes: Dict[str, Dict[str, Any]] = {}
+    for key in set(old) | set(new):
+        if old.get(key) == new.get(key):
+            continue
+        before = _as_list(old.get(key))
+        after = _as_list(new.get(key))
+        remaining: Dict[str, int] = {}
+        for item in before:
+            k = _key_of(item)
+            remaining[k] = remaining.get(k, 0) + 1
+        added = []
+        for item in after:
+            k = _key_of(item)
+            if remaining.get(k, 0) > 0:
+                remaining[k] -= 1
+            else:
+                added.append(item)
+        removed = []
+        for item in before:
+            k = _key_of(item)
+            if remaining.get(k, 0) > 0:
+                remaining[k] -= 1
+                removed.append(item)
+        changes[key] = {"added": added, "removed": removed, "value": new.get(key, [])}
+    return changes
+
+
+__all__ = [
+    "Monitor",
+    "MonitorEvent",
+    "body_hash",
+    "diff_data",
+    "fingerprint",
+]
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from typing import Optional, Protocol
+
+from src.domain.scrape import ScrapeResult
+
+
+class ResultSink(Protocol):
+    """Domain port (outbound) for persisting scrape results in bulk.
+
+    Implementations buffer results and write them in batches; `close()`
+    flushes whatever is still buffered and releases the underlying file or
+    connection.
+    """
+
+    async def write(self, result: ScrapeResult, error: Optional[str] = None) -> None:
+        """Queue one result (or a failed URL, when `error` is set)."""
+        ...
+
+    async def flush(self) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+__all__ = ["ResultSink"]
@@ -1,11 +1,14 @@
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Optional
+
+from src.domain.selectors import SelectorInput
 
 
 @dataclass
 class ScrapeRequest:
     url: str
-    selectors: Dict[str, str]
+    # name -> CSS selector string or selector spec (see src.domain.selectors)
+    selectors: Dict[str, SelectorInput]
     headers: Optional[Dict[str, str]] = None
     timeout: Optional[float] = 10.0
     # If False, the provider should skip robots.txt checks. Default True.
@@ -15,7 +18,9 @@ class ScrapeRequest:
 @dataclass
 class ScrapeResult:
     url: str
-    data: Dict[str, List[str]]
+    # name -> list of extracted values (strings or records); a single value
+    # (or None) for specs with many=False
+    data: Dict[str, Any]
     meta: Optional[Dict[str, Any]] = None
 
 
@@ -1,13 +1,15 @@
 from __future__ import annotations
 
-from typing import Dict
-
-from bs4 import BeautifulSoup
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, Dict, Iterable, Mapping, Optional
 
 from src.domain.exceptions import ScrapeError
 from src.domain.ports.scrape_provider import ScrapeProvider
 from src.domain.scrape import ScrapeRequest, ScrapeResult
+from src.domain.selectors import SelectorInput, apply_specs, parse_selectors
 from src.log import logger
+from src.tracing import tracer
 
 
 class ScrapeService:
@@ -16,18 +18,35 @@ class ScrapeService:
     The domain service focuses on parsing and transformation. Network IO is
     delegated to the `ScrapeProvider` outbound port so the domain remains
     independent of httpx or other HTTP clients.
+
+    With a `parser_pool` (e.g. a `ProcessPoolExecutor`) HTML is parsed in
+    the pool so the event loop keeps fetching while pages are parsed.
     """
 
-    def __init__(self, provider: ScrapeProvider):
+    def __init__(
+        self, provider: ScrapeProvider, parser_pool: Optional[Executor] = None
+    ):
         self.provider = provider
+        self.parser_pool = parser_pool
 
     async def scrape(self, request: ScrapeRequest) -> ScrapeResult:
+        with tracer.span(
+            "scrape", url=request.url, selectors=len(request.selectors)
+        ) as span:
+            result = await self._scrape(request)
+            span.set("keys", len(result.data))
+            return result
+
+    async def _scrape(self, request: ScrapeRequest) -> ScrapeResult:
         logger.info(
             "Service: scraping %s selectors=%s",
             request.url,
             list(request.selectors.keys()),
         )
 
+        # invalid selector specs fail before any network IO (ValueError)
+        parse_selectors(request.selectors)
+
         # Delegate network fetching to the provider (outbound port).
         try:
             content = await self.provider.fetch(
@@ -44,14 +63,69 @@ class ScrapeService:
             # propagate domain scraping/network errors
             raise
 
+        if self.parser_pool is not None:
+            # parse and extract happen in another process: one span for both
+            with tracer.span("parse_extract", parser_pool=True):
+                data = await asyncio.get_running_loop().run_in_executor(
+                    self.parser_pool, extract_data, content, request.selectors
+                )
+        else:
+            data = self.extract(content, request.selectors)
+        # size of the fetched page, for byte quotas on batch scrapes
+        fetched = len(content.encode("utf-8", "replace"))
+        return ScrapeResult(url=request.url, data=data, meta={"bytes": fetched})
+
+    async def warmup(self, selectors: Iterable[str] = ()) -> None:
+        """Import the parser and compile `selectors` ahead of the first scrape.
+
+        With a parser pool, its workers are started and warmed up too.
+        """
+        sample = {str(i): sel for i, sel in enumerate(["title", *selectors])}
+        self.extract(_WARMUP_HTML, sample)
+        if self.parser_pool is not None:
+            await asyncio.get_running_loop().run_in_executor(
+                self.parser_pool, extract_data, _WARMUP_HTML, sample
+            )
+
+    def extract(
+        self, content: str, selectors: Mapping[str, SelectorInput]
+    ) -> Dict[str, Any]:
+        """Parse `content` once and evaluate every selector spec against it."""
+        return extract_data(content, selectors)
+
+
+_WARMUP_HTML = "<html><head><title>warmup</title></head><body></body></html>"
+
+
+def extract_data(
+    content: str, selectors: Mapping[str, SelectorInput]
+) -> Dict[str, Any]:
+    """Module-level extraction so it can run in a process pool (picklable)."""
+    specs = parse_selectors(selectors)
+    # imported on first parse: keeps bs4/soupsieve out of worker start-up
+    from bs4 import BeautifulSoup
+
+    with tracer.span("parse", chars=len(content)):
         soup = BeautifulSoup(content, "html.parser")
-        data: Dict[str, list[str]] = {}
-        for name, selector in request.selectors.items():
-            elements = soup.select(selector)
-            items = [el.get_text(strip=True) for el in elements]
-            data[name] = items
+    try:
+        with tracer.span("extract", selectors=len(specs)):
+            # one walk of the document for the whole selector map
+            return apply_specs(soup, specs)
+    finally:
+        _teardown(soup)
+
 
-        return ScrapeResult(url=request.url, data=data)
+def _teardown(soup: Any) -> None:
+    """Break the parsed tree apart so it is freed right away.
+
+    A tree is a web of parent/sibling/next references that only the cyclic
+    GC would reclaim, late and in bulk. Results are plain str/dict/list, so
+    nothing points into the tree any more. The document object itself is
+    not linked to its first element, hence the per-child decompose.
+    """
+    for child in list(soup.contents):
+        child.decompose()
+    soup.decompose()
 
 
-__all__ = ["ScrapeService"]
+__all__ = ["ScrapeService", "extract_data"]
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Union
+
+# What to take from each matched element
+EXTRACT_MODES = ("text", "attr", "html", "outer_html")
+
+# A selector as given by clients: a CSS selector string (text of every
+# match) or a spec object, see `parse_spec`.
+SelectorInput = Union[str, Mapping[str, Any]]
+
+
+@dataclass(frozen=True)
+class SelectorSpec:
+    """How to extract one key of `ScrapeResult.data`.
+
+    `selector` is a CSS selector (empty: the parent element itself, only
+    meaningful for record fields). Each match yields its text, an
+    attribute, its inner HTML or its outer HTML, or, with `fields`, a record
+    whose fields are evaluated against that match only. `many=False` returns
+    the first value (or None) instead of a list.
+    """
+
+    selector: str
+    extract: str = "text"
+    attr: Optional[str] = None
+    fields: Optional[Dict[str, "SelectorSpec"]] = None
+    many: bool = True
+
+
+def parse_spec(raw: SelectorInput, nested: bool = False) -> SelectorSpec:
+    """Validate a client selector (string or mapping) into a `SelectorSpec`.
+
+    Mapping keys: `selector`, `extract` (text | attr | html | outer_html),
+    `attr` (implies `extract="attr"`), `fields` (name -> selector, evaluated
+    inside each match) and `many`. Raises ValueError on invalid specs.
+    """
+    if isinstance(raw, str):
+        if not raw.strip() and not nested:
+            raise ValueError("selector must not be empty")
+        return SelectorSpec(selector=_check_css(raw.strip()))
+    if not isinstance(raw, Mapping):
+        raise ValueError("selector must be a string or an object")
+
+    unknown = set(raw) - {"selector", "extract", "attr", "fields", "many"}
+    if unknown:
+        raise ValueError(f"unknown selector option(s): {', '.join(sorted(unknown))}")
+    selector = str(raw.get("selector") or "").strip()
+    if not selector and not nested:
+        raise ValueError("selector must not be empty")
+    _check_css(selector)
+
+    attr = raw.get("attr")
+    extract = raw.get("extract") or ("attr" if attr else "text")
+    if extract not in EXTRACT_MODES:
+        raise ValueError(f"extract must be one of {', '.join(EXTRACT_MODES)}")
+    if extract == "attr" and not attr:
+        raise ValueError('extract "attr" needs an "attr" name')
+
+    fields = None
+    if raw.get("fields") is not None:
+        if not isinstance(raw["fields"], Mapping) or not raw["fields"]:
+            raise ValueError("fields must be a non-empty object")
+        fields = {
+            str(name): parse_spec(sub, nested=True)
+            for name, sub in raw["fields"].items()
+        }
+    return SelectorSpec(
+        selector=selector,
+        extract=extract,
+        attr=str(attr) if attr else None,
+        fields=fields,
+        many=bool(raw.get("many", True)),
+    )
+
+
+def _check_css(selector: str) -> str:
+    """Compile `selector` so malformed CSS fails validation, not extraction.
+
+    soupsieve caches compiled selectors, so matching reuses this work.
+    """
+    if not selector:
+        return selector
+    # imported on first use: keeps soupsieve out of start-up
+    import soupsieve
+
+    try:
+        soupsieve.compile(selector)
+    except soupsieve.SelectorSyntaxError as exc:
+        reason = str(exc).splitlines()[0]
+        raise ValueError(f"invalid CSS selector {selector!r}: {reason}") from exc
+    return selector
+
+
+def parse_selectors(selectors: Mapping[str, SelectorInput]) -> Dict[str, SelectorSpec]:
+    specs: Dict[str, SelectorSpec] = {}
+    for name, raw in selectors.items():
+        try:
+            specs[name] = parse_spec(raw)
+        except ValueError as exc:
+            raise ValueError(f"selector {name!r}: {exc}") from exc
+    return specs
+
+
+def _value(element: Any, spec: SelectorSpec) -> Any:
+    if spec.fields is not None:
+        return {name: apply_spec(element, sub) for name, sub in spec.fields.items()}
+    if spec.extract == "attr":
+        value = element.get(spec.attr)
+        # multi-valued attributes (class, rel) come back as lists
+        if isinstance(value, list):
+            return " ".join(value)
+        return str(value) if value is not None else None
+    if spec.extract == "html":
+        return element.decode_contents()
+    if spec.extract == "outer_html":
+        return str(element)
+    return element.get_text(strip=True)
+
+
+def _result(matches: List[Any], spec: SelectorSpec) -> Any:
+    # elements lacking the requested attribute are skipped
+    values: List[Any] = [v for v in (_value(m, spec) for m in matches) if v is not None]
+    if spec.many:
+        return values
+    return values[0] if values else None
+
+
+def apply_spec(root: Any, spec: SelectorSpec) -> Any:
+    """Evaluate `spec` against `root` (a parsed document or element)."""
+    if not spec.selector:
+        matches = [root]
+    elif spec.many:
+        matches = root.select(spec.selector)
+    else:
+        first = root.select_one(spec.selector)
+        matches = [first] if first is not None else []
+    return _result(matches, spec)
+
+
+class SelectorIndex:
+    """Top-level selectors of a selector map merged into one matcher.
+
+    Each compiled selector is filed under a key of its rightmost compound
+    (an id, else a class, else the tag name; selector lists under each of
+    their alternatives), so while walking the document every element is
+    only tested against the selectors that could possibly match it.
+    Selectors without such a key (`*`, `:not(...)`) are tested on every
+    element. Results equal `apply_spec` per key: matches in document order,
+    `many=False` keeps the first one.
+    """
+
+    def __init__(self, specs: Mapping[str, SelectorSpec]):
+        import soupsieve
+
+        self.specs = dict(specs)
+        self._compiled: Dict[str, Any] = {}
+        self._by_id: Dict[str, List[str]] = {}
+        self._by_class: Dict[str, List[str]] = {}
+        self._by_tag: Dict[str, List[str]] = {}
+        self._always: List[str] = []
+        for name, spec in self.specs.items():
+            if not spec.selector:
+                continue
+            compiled = soupsieve.compile(spec.selector)
+            self._compiled[name] = compiled
+            for selector in compiled.selectors:
+                self._file(name, selector)
+
+    def _file(self, name: str, selector: Any) -> None:
+        # keys are lower-cased so the lookup can only over-select (quirks
+        # mode matches classes case-insensitively); `match` has the last word
+        ids = getattr(selector, "ids", ())
+        classes = getattr(selector, "classes", ())
+        tag = getattr(getattr(selector, "tag", None), "name", None)
+        if ids:
+            bucket = self._by_id.setdefault(ids[0].lower(), [])
+        elif classes:
+            bucket = self._by_class.setdefault(classes[0].lower(), [])
+        elif tag and tag != "*":
+            bucket = self._by_tag.setdefault(tag.lower(), [])
+        else:
+            bucket = self._always
+        if name not in bucket:
+            bucket.append(name)
+
+    def _candidates(self, element: Any) -> List[str]:
+        names = list(self._always)
+        names += self._by_tag.get(element.name.lower(), ())
+        if self._by_id:
+            el_id = element.get("id")
+            if isinstance(el_id, str):
+                names += self._by_id.get(el_id.lower(), ())
+        if self._by_class:
+            classes = element.get("class") or ()
+            for cls in [classes] if isinstance(classes, str) else classes:
+                names += self._by_class.get(cls.lower(), ())
+        return names
+
+    def apply(self, root: Any) -> Dict[str, Any]:
+        """Evaluate every spec against `root` in one walk of its subtree."""
+        from bs4 import Tag
+        from soupsieve.css_match import CSSMatch
+
+        # one matcher per selector and document, scoped at `root` as
+        # `root.select` does (`:scope` keeps its meaning)
+        matchers = {
+            name: CSSMatch(c.selectors, root, c.namespaces, c.flags).match
+            for name, c in self._compiled.items()
+        }
+        matches: Dict[str, List[Any]] = {name: [] for name in self._compiled}
+        # selectors still looking for their first (`many=False`) match
+        pending_single = {n for n in self._compiled if not self.specs[n].many}
+        any_many = len(pending_single) < len(self._compiled)
+        if matchers:
+            for element in root.descendants:
+                if not isinstance(element, Tag):
+                    continue
+                candidates = self._candidates(element)
+                seen = set()
+                for name in candidates:
+                    if name in seen:
+                        continue
+                    seen.add(name)
+                    found = matches[name]
+                    if found and name in pending_single:
+                        continue
+                    if matchers[name](element):
+                        found.append(element)
+                        pending_single.discard(name)
+                if not any_many and not pending_single:
+                    break
+        return {
+            name: (
+                _result(matches[name], spec)
+                if name in matches
+                else apply_spec(root, spec)
+            )
+            for name, spec in self.specs.items()
+        }
+
+
+def apply_specs(root: Any, specs: Mapping[str, SelectorSpec]) -> Dict[str, Any]:
+    """Evaluate a whole selector map against `root` in a single document walk."""
+    return SelectorIndex(specs).apply(root)
+
+
+__all__ = [
+    "EXTRACT_MODES",
+    "SelectorIndex",
+    "SelectorInput",
+    "SelectorSpec",
+    "apply_spec",
+    "apply_specs",
+    "parse_selectors",
+    "parse_spec",
+]
@@ -1,9 +1,17 @@
+import atexit
 import contextvars
+import json
 import logging
+import queue
+import random
 import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, TextIO, Tuple
 from uuid import uuid4
 
-from src.config import core_settings as settings
+from src.metrics import metrics
 
 # Formato de log legible para desarrollo. Incluimos request_id para trazar
 # peticiones a través de capas. Nivel por defecto: DEBUG (desarrollo).
@@ -15,29 +23,206 @@ request_id_ctx_var: contextvars.ContextVar[str] = contextvars.ContextVar(
     "request_id", default="-"
 )
 
+# Atributos estándar de LogRecord; el resto se considera "extra" en JSON
+_RECORD_ATTRS = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", None, None)).keys()
+) | {"message", "asctime", "request_id"}
 
-class RequestIdFormatter(logging.Formatter):
-    def format(self, record):
-        # Ensure record has request_id attribute for formatting
+
+def _capture_request_id(record: logging.LogRecord) -> None:
+    # The request id lives in a contextvar of the emitting coroutine, so it
+    # must be read before the record crosses to the writer thread.
+    if not hasattr(record, "request_id"):
         try:
             record.request_id = request_id_ctx_var.get()
         except Exception:
             record.request_id = "-"
+
+
+class RequestIdFormatter(logging.Formatter):
+    def format(self, record):
+        # Ensure record has request_id attribute for formatting
+        _capture_request_id(record)
         return super().format(record)
 
 
-def setup_logging():
-    """Configura el sistema de logging para la aplicación."""
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(RequestIdFormatter(LOG_FORMAT, datefmt=DATE_FORMAT))
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including `request_id` and any `extra` fields
+    (e.g. `duration_ms`) passed by the caller."""
+
+    def format(self, record):
+        _capture_request_id(record)
+        payload = {
+            "ts": self.formatTime(record, DATE_FORMAT),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": record.request_id,
+            "module": record.module,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Sample and rate-limit hot-path DEBUG/INFO records.
+
+    `rates` maps logger names to the fraction of DEBUG/INFO records kept
+    (a logger inherits the rate of its closest configured parent).
+    `max_per_second` caps each distinct message template per logger; 0
+    disables the cap. WARNING and above always pass.
+    """
+
+    def __init__(
+        self, rates: Optional[Dict[str, float]] = None, max_per_second: float = 0
+    ):
+        super().__init__()
+        self.rates = rates or {}
+        self.max_per_second = max_per_second
+        self._buckets: Dict[Tuple[str, str], list] = {}
+        self._lock = threading.Lock()
+
+    def _rate_for(self, name: str) -> float:
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return self.rates.get("", 1.0)
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate_for(record.name)
+        if rate < 1.0 and random.random() >= rate:
+            return False
+        if self.max_per_second > 0:
+            key = (record.name, str(record.msg))
+            now = time.monotonic()
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = [self.max_per_second, now]
+                tokens = min(
+                    self.max_per_second,
+                    bucket[0] + (now - bucket[1]) * self.max_per_second,
+                )
+                bucket[1] = now
+                if tokens < 1:
+                    bucket[0] = tokens
+                    return False
+                bucket[0] = tokens - 1
+        return True
+
+
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves formatting to the writer thread.
+
+    The stdlib handler formats records before enqueueing so they can be
+    pickled; our queue is in-process, so only the request id is captured and
+    the record is handed over as-is. When the queue is full the record is
+    dropped (and counted) instead of blocking the event loop.
+    """
+
+    def prepare(self, record):
+        _capture_request_id(record)
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.incr("log.dropped_records")
+
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[DeferredQueueHandler] = None
+
+
+def _parse_sampling(raw: Optional[str]) -> Dict[str, float]:
+    """Parse "logger=rate,other=rate" into a dict; invalid entries are ignored."""
+    rates: Dict[str, float] = {}
+    for part in (raw or "").split(","):
+        name, sep, value = part.strip().partition("=")
+        if not sep:
+            continue
+        try:
+            rates[name.strip()] = max(0.0, min(1.0, float(value)))
+        except ValueError:
+            continue
+    return rates
+
+
+def shutdown_logging() -> None:
+    """Flush pending records and stop the background writer, if any.
+
+    Later records are written synchronously by the same handler, so nothing
+    logged during interpreter shutdown is lost.
+    """
+    global _listener, _queue_handler
+    if _listener is None or _queue_handler is None:
+        return
+    _listener.stop()
+    root = logging.getLogger()
+    if _queue_handler in root.handlers:
+        root.removeHandler(_queue_handler)
+        for h in _listener.handlers:
+            for f in _queue_handler.filters:
+                h.addFilter(f)
+            root.addHandler(h)
+    _listener = None
+    _queue_handler = None
+
+
+def setup_logging(
+    stream: Optional[TextIO] = None, log_level: Optional[str] = None
+) -> None:
+    """Configura el sistema de logging para la aplicación.
+
+    `stream` (default stdout) and `log_level` (default LOG_LEVEL) let the CLI
+    keep stdout for results. Entry points (API app, CLI) call this at
+    startup; importing this module configures nothing, so modules that only
+    need `logger` stay cheap to import.
+    """
+    from src.config import get_core_settings
+
+    global _listener, _queue_handler
+    settings = get_core_settings()
+    shutdown_logging()
+    handler = logging.StreamHandler(stream or sys.stdout)
+    if getattr(settings, "LOG_JSON", False):
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(RequestIdFormatter(LOG_FORMAT, datefmt=DATE_FORMAT))
+
+    root_handler: logging.Handler = handler
+    if getattr(settings, "LOG_ASYNC", True):
+        # Writes (and formatting) happen on a background thread so a slow
+        # stdout pipe never blocks request handling.
+        log_queue: queue.Queue = queue.Queue(
+            maxsize=getattr(settings, "LOG_QUEUE_SIZE", 10000)
+        )
+        root_handler = _queue_handler = DeferredQueueHandler(log_queue)
+        _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+        _listener.start()
+
+    rates = _parse_sampling(getattr(settings, "LOG_SAMPLING", None))
+    max_per_second = getattr(settings, "LOG_RATE_LIMIT", 0)
+    if rates or max_per_second:
+        root_handler.addFilter(SamplingFilter(rates, max_per_second))
+
     root = logging.getLogger()
     # Clear default handlers to avoid duplicate logs
     for h in list(root.handlers):
         root.removeHandler(h)
-    root.addHandler(handler)
+    root.addHandler(root_handler)
     # Read the configured log level from central settings (core_settings.LOG_LEVEL).
     # This keeps logging configuration in sync with application settings.
-    level_name = getattr(settings, "LOG_LEVEL", "DEBUG")
+    level_name = log_level or getattr(settings, "LOG_LEVEL", "DEBUG")
     try:
         level = getattr(logging, str(level_name).upper())
     except Exception:
@@ -51,8 +236,7 @@ def setup_logging():
         logging.getLogger("uvicorn").setLevel(logging.WARNING)
 
 
-# Inicializa el logging al cargar el módulo
-setup_logging()
+atexit.register(shutdown_logging)
 logger = logging.getLogger("fastapi_backend")
 
 
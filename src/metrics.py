@@ -0,0 +1,75 @@
+import threading
+from typing import Any, Dict, Tuple
+
+# Clave interna de una métrica: nombre + etiquetas ordenadas
+_Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, Any]) -> _Key:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _render(key: _Key) -> str:
+    name, labels = key
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{k}={v}" for k, v in labels) + "}"
+
+
+class MetricsRegistry:
+    """Minimal in-process metrics registry (counters and summaries).
+
+    Adapters record values with `incr` / `observe` and the API exposes a JSON
+    `snapshot()`. It is intentionally tiny: no exporters or histograms, just
+    enough to compare averages and totals between deployments.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[_Key, float] = {}
+        # summary -> [count, sum, min, max]
+        self._summaries: Dict[_Key, list] = {}
+
+    def incr(self, name: str, value: float = 1, **labels: Any) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                self._summaries[key] = [1, value, value, value]
+            else:
+                summary[0] += 1
+                summary[1] += value
+                summary[2] = min(summary[2], value)
+                summary[3] = max(summary[3], value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = {_render(k): v for k, v in self._counters.items()}
+            summaries = {
+                _render(k): {
+                    "count": s[0],
+                    "sum": s[1],
+                    "avg": s[1] / s[0],
+                    "min": s[2],
+                    "max": s[3],
+                }
+                for k, s in self._summaries.items()
+            }
+        return {"counters": counters, "summaries": summaries}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+
+
+# Registro global del proceso
+metrics = MetricsRegistry()
+
+
+__all__ = ["MetricsRegistry", "metrics"]
@@ -0,0 +1,436 @@
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Protocol, Union
+from uuid import uuid4
+
+from src.log import logger, request_id_ctx_var
+from src.metrics import metrics
+
+
+@dataclass
+class Span:
+    """One timed operation of a trace (timestamps in unix nanoseconds).
+
+    The trace id of a request is its `request_id`, so spans can be joined
+    with the request logs.
+    """
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    sampled = True
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Stand-in for spans that are not recorded (tracing off or not sampled)."""
+
+    sampled = False
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+AnySpan = Union[Span, _NoopSpan]
+
+# Span enclosing the running code (NOOP_SPAN inside an unsampled trace)
+_current: contextvars.ContextVar[Optional[AnySpan]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+def current_span() -> AnySpan:
+    return _current.get() or NOOP_SPAN
+
+
+def _new_span_id() -> str:
+    return os.urandom(8).hex()
+
+
+class SpanSink(Protocol):
+    def write(self, spans: List[Span]) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class FileSpanSink:
+    """Append spans as JSON lines (one span per line)."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, spans: List[Span]) -> None:
+        lines = "".join(
+            json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n"
+            for span in spans
+        )
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(lines)
+
+    def close(self) -> None:
+        pass
+
+
+def _otlp_id(value: str, size: int) -> str:
+    # OTLP wants 16-byte trace / 8-byte span ids in hex; custom request ids
+    # (X-Request-ID) are hashed into that shape
+    try:
+        if len(value) == size * 2:
+            bytes.fromhex(value)
+            return value
+    except ValueError:
+        pass
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[: size * 2]
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_payload(spans: List[Span], service_name: str) -> Dict[str, Any]:
+    """Encode spans as an OTLP/HTTP JSON `ExportTraceServiceRequest`."""
+    encoded = []
+    for span in spans:
+        attributes = {**span.attributes, "request_id": span.trace_id}
+        item: Dict[str, Any] = {
+            "traceId": _otlp_id(span.trace_id, 16),
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": [
+                {"key": k, "value": _otlp_value(v)} for k, v in attributes.items()
+            ],
+            "status": (
+                {"code": 2, "message": span.error} if span.error else {"code": 1}
+            ),
+        }
+        if span.parent_id:
+            item["parentSpanId"] = span.parent_id
+        encoded.append(item)
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": service_name}}
+                    ]
+                },
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": encoded}],
+            }
+        ]
+    }
+
+
+class OtlpHttpSpanSink:
+    """POST spans as OTLP/JSON to a collector (e.g. `http://localhost:4318/v1/traces`)."""
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def write(self, spans: List[Span]) -> None:
+        # stdlib client: runs on the exporter thread, away from the event loop
+        import urllib.request
+
+        body = json.dumps(otlp_payload(spans, self.service_name)).encode("utf-8")
+        request = urllib.request.Request(
+            self.endpoint,
+            data=body,
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as resp:
+            resp.read()
+
+    def close(self) -> None:
+        pass
+
+
+class BatchSpanExporter:
+    """Queue finished spans and write them to a sink in batches.
+
+    A daemon thread flushes every `flush_interval` seconds or as soon as
+    `max_batch` spans are queued. Beyond `max_queue` queued spans new spans
+    are dropped (`tracing.dropped_spans`) rather than growing memory.
+    """
+
+    def __init__(
+        self,
+        sink: SpanSink,
+        max_batch: int = 512,
+        flush_interval: float = 2.0,
+        max_queue: int = 10_000,
+    ):
+        self.sink = sink
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self._queue: Deque[Span] = deque()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        if len(self._queue) >= self.max_queue:
+            metrics.incr("tracing.dropped_spans")
+            return
+        self._queue.append(span)
+        if self._thread is None:
+            self._start()
+        if len(self._queue) >= self.max_batch:
+            self._wake.set()
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._thread is None and not self._stopped:
+                self._thread = threading.Thread(
+                    target=self._run, name="span-exporter", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            while self._queue:
+                batch: List[Span] = []
+                while self._queue and len(batch) < self.max_batch:
+                    batch.append(self._queue.popleft())
+                try:
+                    self.sink.write(batch)
+                except Exception as exc:
+                    metrics.incr("tracing.export_errors")
+                    logger.warning("Span export failed (%s spans): %s", len(batch), exc)
+                    return
+                metrics.incr("tracing.exported_spans", len(batch))
+
+    def shutdown(self) -> None:
+        self._stopped = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+        self.sink.close()
+
+
+class Tracer:
+    """Creates spans and hands finished ones to an exporter.
+
+    Sampling is decided once per trace, at its root span, from a hash of
+    the trace id: every span of a sampled request is kept and an unsampled
+    request costs one context lookup per span. Without an exporter tracing
+    is off and `span()` yields `NOOP_SPAN`.
+    """
+
+    def __init__(
+        self, exporter: Optional[BatchSpanExporter] = None, sample_rate: float = 1.0
+    ):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def configure(
+        self, exporter: Optional[BatchSpanExporter], sample_rate: float = 1.0
+    ) -> None:
+        self.shutdown()
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    def shutdown(self) -> None:
+        """Flush queued spans and stop the exporter thread."""
+        exporter, self.exporter = self.exporter, None
+        if exporter is not None:
+            exporter.shutdown()
+
+    def sampled(self, trace_id: str) -> bool:
+        if self.sample_rate >= 1:
+            return True
+        if self.sample_rate <= 0:
+            return False
+        # same decision for the same request id in every worker
+        return zlib.crc32(trace_id.encode("utf-8")) < self.sample_rate * 2**32
+
+    def start_span(self, name: str, attributes: Dict[str, Any]) -> AnySpan:
+        parent = _current.get()
+        if parent is None:
+            if self.exporter is None:
+                return NOOP_SPAN
+            rid = request_id_ctx_var.get()
+            trace_id = rid if rid and rid != "-" else uuid4().hex
+            if not self.sampled(trace_id):
+                return NOOP_SPAN
+            parent_id = None
+        elif isinstance(parent, Span):
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        else:
+            return NOOP_SPAN
+        return Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=_new_span_id(),
+            parent_id=parent_id,
+            start_ns=time.time_ns(),
+            attributes=attributes,
+        )
+
+    def end_span(self, span: Span, end_ns: Optional[int] = None) -> None:
+        span.end_ns = end_ns or time.time_ns()
+        if self.exporter is not None:
+            self.exporter.export(span)
+
+    def span(self, name: str, **attributes: Any) -> "_SpanScope":
+        """Record the enclosed `with` block as a child of the current span."""
+        return _SpanScope(self, name, attributes)
+
+    def record(
+        self,
+        name: str,
+        start_ns: int,
+        end_ns: int,
+        parent: AnySpan,
+        **attributes: Any,
+    ) -> None:
+        """Record an already finished operation (e.g. from httpx trace events)."""
+        if not isinstance(parent, Span):
+            return
+        self.end_span(
+            Span(
+                name=name,
+                trace_id=parent.trace_id,
+                span_id=_new_span_id(),
+                parent_id=parent.span_id,
+                start_ns=start_ns,
+                attributes=attributes,
+            ),
+            end_ns,
+        )
+
+
+class _SpanScope:
+    # plain class instead of @contextmanager: spans wrap every request phase,
+    # so entering one must stay cheap even when tracing is off
+    __slots__ = ("_tracer", "_name", "_attributes", "_span", "_token")
+
+    def __init__(self, tracer: Tracer, name: str, attributes: Dict[str, Any]):
+        self._tracer = tracer
+        self._name = name
+        self._attributes = attributes
+
+    def __enter__(self) -> AnySpan:
+        self._span = self._tracer.start_span(self._name, self._attributes)
+        self._token = _current.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        _current.reset(self._token)
+        span = self._span
+        if isinstance(span, Span):
+            if exc is not None:
+                span.error = f"{exc_type.__name__}: {exc}"
+            self._tracer.end_span(span)
+
+
+def build_exporter(settings: Any) -> Optional[BatchSpanExporter]:
+    """Exporter described by the TRACING_* settings (None when disabled)."""
+    if not getattr(settings, "TRACING_ENABLED", False):
+        return None
+    kind = settings.TRACING_EXPORTER.lower()
+    sink: SpanSink
+    if kind == "file":
+        sink = FileSpanSink(settings.TRACING_FILE_PATH)
+    elif kind == "otlp":
+        sink = OtlpHttpSpanSink(
+            settings.TRACING_OTLP_ENDPOINT, service_name=settings.PROJECT_NAME
+        )
+    else:
+        raise ValueError(f"Unknown TRACING_EXPORTER {settings.TRACING_EXPORTER!r}")
+    return BatchSpanExporter(
+        sink,
+        max_batch=settings.TRACING_BATCH_SIZE,
+        flush_interval=settings.TRACING_FLUSH_INTERVAL,
+    )
+
+
+def configure_tracing(settings: Any) -> None:
+    """Set up the process tracer from settings (entry points call this)."""
+    exporter = build_exporter(settings)
+    tracer.configure(exporter, getattr(settings, "TRACING_SAMPLE_RATE", 1.0))
+    if exporter is not None:
+        logger.info(
+            "Tracing enabled exporter=%s sample_rate=%s",
+            settings.TRACING_EXPORTER,
+            tracer.sample_rate,
+        )
+
+
+# Tracer global del proceso (desactivado hasta configure_tracing)
+tracer = Tracer()
+
+
+__all__ = [
+    "NOOP_SPAN",
+    "BatchSpanExporter",
+    "FileSpanSink",
+    "OtlpHttpSpanSink",
+    "Span",
+    "Tracer",
+    "build_exporter",
+    "configure_tracing",
+    "current_span",
+    "otlp_payload",
+    "tracer",
+]
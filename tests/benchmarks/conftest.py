@@ -0,0 +1,28 @@
+import os
+
+import pytest
+
+
+@pytest.fixture
+def bench_scale() -> int:
+    """Multiplier for benchmark sizes (BENCH_SCALE env var, default 1).
+
+    The defaults keep the suite fast; use e.g. `BENCH_SCALE=20 pytest -s
+    tests/benchmarks` for numbers worth comparing.
+    """
+    try:
+        return max(1, int(os.getenv("BENCH_SCALE", "1")))
+    except ValueError:
+        return 1
+
+
+def _report(title: str, rows) -> None:
+    print(f"\n{title}")
+    for label, value in rows:
+        print(f"  {label:<40} {value}")
+
+
+@pytest.fixture
+def report():
+    """Print a small aligned table of results (visible with `pytest -s`)."""
+    return _report
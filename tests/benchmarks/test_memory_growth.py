@@ -0,0 +1,89 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytestmark = pytest.mark.benchmark
+
+# Runs in a fresh interpreter per mode so RSS numbers don't leak between them
+_SCRIPT = r"""
+import gc, json, sys, time
+from bs4 import BeautifulSoup
+from src.adapters.api.memory import read_rss_bytes
+from src.domain.scrape_service import extract_data
+from src.domain.selectors import apply_specs, parse_selectors
+
+mode, pages, cards = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+page = "<html><body>" + "".join(
+    f'<div class="card" id="c{i}"><h2>Item {i}</h2><p>{"lorem ipsum " * 20}</p>'
+    f'<a href="/item/{i}">more</a><span class="price">${i}</span></div>'
+    for i in range(cards)
+) + "</body></html>"
+selectors = {"titles": "h2", "links": {"selector": "a", "attr": "href"},
+             "price": {"selector": ".price", "many": False}}
+specs = parse_selectors(selectors)
+
+def retained(content):
+    # previous behaviour: the tree is left to the cyclic GC
+    return apply_specs(BeautifulSoup(content, "html.parser"), specs)
+
+extract = extract_data if mode == "teardown" else lambda c, s: retained(c)
+extract(page, selectors)
+gc.collect()
+start_rss = peak_rss = read_rss_bytes() or 0
+start = time.perf_counter()
+results = []
+for i in range(pages):
+    results.append(extract(page, selectors))
+    if i % 10 == 0:
+        peak_rss = max(peak_rss, read_rss_bytes() or 0)
+elapsed = time.perf_counter() - start
+end_rss = read_rss_bytes() or 0
+print(json.dumps({
+    "elapsed": elapsed,
+    "peak_growth_mb": (max(peak_rss, end_rss) - start_rss) / 2**20,
+    "end_growth_mb": (end_rss - start_rss) / 2**20,
+    "gc_garbage": gc.collect(),
+    "page_kb": len(page) / 1024,
+}))
+"""
+
+
+def _run(mode: str, pages: int, cards: int) -> dict:
+    env = {**os.environ, "PROJECT_NAME": "bench", "ENVIRONMENT": "test"}
+    out = subprocess.run(
+        [sys.executable, "-c", _SCRIPT, mode, str(pages), str(cards)],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+        cwd=os.getcwd(),
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def test_memory_growth_over_many_large_pages(bench_scale, report):
+    if not os.path.exists("/proc/self/statm"):
+        pytest.skip("RSS is read from /proc")
+    # ~70 KiB pages; BENCH_SCALE=25 parses thousands of them
+    pages = 100 * bench_scale
+    cards = 200
+    retained = _run("retained", pages, cards)
+    teardown = _run("teardown", pages, cards)
+
+    report(
+        f"Memory growth over {pages} pages of {teardown['page_kb']:.0f} KiB",
+        [
+            (
+                f"{name}",
+                f"peak +{r['peak_growth_mb']:6.1f} MiB  end +{r['end_growth_mb']:6.1f}"
+                f" MiB  leftover cycles {r['gc_garbage']:7d}  {r['elapsed']:5.1f} s",
+            )
+            for name, r in (("tree left to GC", retained), ("decompose", teardown))
+        ],
+    )
+    # torn-down documents leave nothing for the cyclic collector
+    assert teardown["gc_garbage"] == 0
+    assert teardown["peak_growth_mb"] <= retained["peak_growth_mb"]
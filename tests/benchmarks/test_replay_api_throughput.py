@@ -0,0 +1,87 @@
+import asyncio
+import os
+import time
+
+import httpx
+import pytest
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.fixture
+def api_env(monkeypatch):
+    """Provide the settings api_app needs when the benchmark runs on its own."""
+    for name, value in (
+        ("PROJECT_NAME", "bench"),
+        ("ENVIRONMENT", "bench"),
+        ("API_KEY", "bench-key"),
+    ):
+        if not os.getenv(name):
+            monkeypatch.setenv(name, value)
+
+
+def _page(i: int) -> str:
+    rows = "".join(
+        f'<div class="item"><h2>Item {i}-{j}</h2><span class="price">{j}.99</span></div>'
+        for j in range(200)
+    )
+    return f"<html><body><h1>Page {i}</h1>{rows}</body></html>"
+
+
+@pytest.mark.asyncio
+async def test_full_api_offline_against_replayed_pages(
+    api_env, tmp_path, monkeypatch, bench_scale, report
+):
+    # imported after api_env: these modules read the settings
+    from src.adapters.api.ratelimit import KeyQuota, RateLimiter, get_rate_limiter
+    from src.adapters.http.recording import CassetteArchive, ReplayScrapeProvider
+    from src.application.factory import create_facade
+
+    archive = CassetteArchive(str(tmp_path / "bench.jsonl.gz"))
+    urls = [f"https://shop.example/{i}" for i in range(20)]
+    for i, url in enumerate(urls):
+        archive.append({"url": url, "status": 200, "body": _page(i), "elapsed": 0.0})
+
+    from src.application import api_app as api_app_module
+
+    facade = create_facade(
+        project_name="bench",
+        environment="bench",
+        provider=ReplayScrapeProvider(archive),
+    )
+    monkeypatch.setattr(api_app_module, "api_facade", facade)
+    # measure the service, not the anonymous quota
+    unlimited = RateLimiter({}, KeyQuota(rate=1e9, burst=10**9, max_concurrent=0))
+    api_app_module.app.dependency_overrides[get_rate_limiter] = lambda: unlimited
+
+    requests = 100 * bench_scale
+    payloads = [
+        {
+            "url": urls[i % len(urls)],
+            "selectors": {"title": "h1", "names": ".item h2", "prices": ".price"},
+        }
+        for i in range(requests)
+    ]
+    transport = httpx.ASGITransport(app=api_app_module.app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://b") as c:
+            start = time.perf_counter()
+            responses = await asyncio.gather(
+                *(c.post("/scrape", json=p) for p in payloads)
+            )
+            elapsed = time.perf_counter() - start
+    finally:
+        api_app_module.app.dependency_overrides.clear()
+
+    ok = sum(1 for r in responses if r.status_code == 200)
+    report(
+        f"Offline API benchmark ({requests} requests, replayed pages)",
+        [
+            ("successful responses", ok),
+            ("throughput", f"{requests / elapsed:9.1f} req/s"),
+            ("mean latency (concurrent)", f"{elapsed / requests * 1000:9.2f} ms"),
+        ],
+    )
+    # admission control may shed some requests on a slow machine
+    assert ok > 0
+    assert all(r.status_code in (200, 503) for r in responses)
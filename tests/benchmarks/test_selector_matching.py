@@ -0,0 +1,86 @@
+import time
+
+import pytest
+
+from src.domain.selectors import apply_spec, apply_specs, parse_selectors
+
+pytestmark = pytest.mark.benchmark
+
+
+def _page(cards: int) -> str:
+    items = "".join(
+        f'<div class="card c{i % 7}" id="card-{i}" data-sku="{i}">'
+        f'<h2 class="title">Item {i}</h2><span class="price">${i}.99</span>'
+        f'<ul class="tags"><li>a</li><li class="hot">b</li></ul>'
+        f'<a class="link" href="/item/{i}">more</a></div>'
+        for i in range(cards)
+    )
+    return f"<html><head><title>Shop</title></head><body>{items}</body></html>"
+
+
+# Realistic mix: tags, classes, ids, compounds and descendant combinators
+_POOL = [
+    "title",
+    "h2",
+    ".price",
+    "a.link",
+    "#card-3 .title",
+    "div.card > h2",
+    "li.hot",
+    ".c3 .price",
+    "ul.tags li",
+    "div[data-sku='10'] a",
+    ".card:nth-of-type(5) h2",
+    "#card-7",
+    "span",
+    ".c1 a",
+    "li:first-child",
+]
+
+
+def _selectors(count: int):
+    return parse_selectors(
+        {
+            f"k{i}": _POOL[i % len(_POOL)] + ("" if i < len(_POOL) else f", .x{i}")
+            for i in range(count)
+        }
+    )
+
+
+def _best_ms(fn, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def test_single_pass_vs_per_selector_loop(bench_scale, report):
+    from bs4 import BeautifulSoup
+
+    rows = []
+    for cards in (50 * bench_scale, 500 * bench_scale):
+        soup = BeautifulSoup(_page(cards), "html.parser")
+        for count in (1, 5, 10, 30):
+            specs = _selectors(count)
+            expected = {n: apply_spec(soup, s) for n, s in specs.items()}
+            assert apply_specs(soup, specs) == expected
+
+            loop_ms = _best_ms(
+                lambda: {n: apply_spec(soup, s) for n, s in specs.items()}, 3
+            )
+            single_ms = _best_ms(lambda: apply_specs(soup, specs), 3)
+            rows.append(
+                (
+                    f"{cards} cards, {count} selectors",
+                    f"loop {loop_ms:8.1f} ms  single-pass {single_ms:8.1f} ms"
+                    f"  ({loop_ms / single_ms:4.1f}x)",
+                )
+            )
+            if count == 30:
+                thirty = (loop_ms, single_ms)
+
+    report("Selector matching: per-selector loop vs single pass", rows)
+    # one walk for 30 selectors beats 30 walks
+    assert thirty[1] < thirty[0]
@@ -0,0 +1,54 @@
+import importlib.util
+import json
+import time
+
+import pytest
+
+from src.adapters.sinks.jsonl_sink import JsonlSink
+from src.adapters.sinks.sqlite_sink import SQLiteSink
+from src.domain.scrape import ScrapeResult
+
+pytestmark = pytest.mark.benchmark
+
+
+def _results(count: int):
+    data = {"title": ["Product title"], "price": ["$9.99"], "links": [f"/p/{i}" for i in range(20)]}
+    return [ScrapeResult(url=f"https://example.com/{i}", data=data) for i in range(count)]
+
+
+async def _rows_per_second(sink, results) -> float:
+    start = time.perf_counter()
+    for result in results:
+        await sink.write(result)
+    await sink.close()
+    return len(results) / (time.perf_counter() - start)
+
+
+def _naive_jsonl(path, results) -> float:
+    # baseline: one open/serialize/write per result, as a caller persisting
+    # an HTTP response would do
+    start = time.perf_counter()
+    for result in results:
+        with open(path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps({"url": result.url, "data": result.data}) + "\n")
+    return len(results) / (time.perf_counter() - start)
+
+
+async def test_sink_throughput(tmp_path, bench_scale, report):
+    count = 2000 * bench_scale
+    results = _results(count)
+    rows = [("jsonl, open per row", f"{_naive_jsonl(tmp_path / 'naive.jsonl', results):10.0f} rows/s")]
+
+    for flush_size in (1, 500):
+        jsonl = JsonlSink(str(tmp_path / f"out{flush_size}.jsonl"), flush_size=flush_size, flush_interval=None)
+        rows.append((f"JsonlSink flush_size={flush_size}", f"{await _rows_per_second(jsonl, results):10.0f} rows/s"))
+        sqlite = SQLiteSink(str(tmp_path / f"out{flush_size}.sqlite3"), flush_size=flush_size, flush_interval=None)
+        rows.append((f"SQLiteSink flush_size={flush_size}", f"{await _rows_per_second(sqlite, results):10.0f} rows/s"))
+
+    if importlib.util.find_spec("pyarrow") is not None:
+        from src.adapters.sinks.parquet_sink import ParquetSink
+
+        parquet = ParquetSink(str(tmp_path / "out.parquet"), flush_size=1000)
+        rows.append(("ParquetSink flush_size=1000", f"{await _rows_per_second(parquet, results):10.0f} rows/s"))
+
+    report(f"Result sink throughput ({count} results)", rows)
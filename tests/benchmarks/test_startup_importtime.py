@@ -0,0 +1,61 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Tuple
+
+import pytest
+
+pytestmark = pytest.mark.benchmark
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def _importtime(module: str) -> Tuple[int, Dict[str, Tuple[int, int]]]:
+    """Import `module` in a fresh interpreter under `-X importtime`.
+
+    Returns the cumulative microseconds of `module` and, per imported module,
+    its (self, cumulative) microseconds.
+    """
+    env = {
+        **os.environ,
+        "PROJECT_NAME": "bench",
+        "ENVIRONMENT": "test",
+        "API_KEY": "bench",
+    }
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules: Dict[str, Tuple[int, int]] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules[module][1], modules
+
+
+def test_api_app_import_graph(report):
+    total_us, modules = _importtime("src.application.api_app")
+    heaviest = sorted(modules.items(), key=lambda kv: kv[1][0], reverse=True)[:8]
+    report(
+        f"import src.application.api_app: {total_us / 1000:.1f} ms ({len(modules)} modules)",
+        [(name, f"{self_us / 1000:7.1f} ms self") for name, (self_us, _) in heaviest],
+    )
+    # parsers and the HTTP client are loaded on first use / during warmup
+    for lazy in ("bs4", "soupsieve", "httpx", "httpcore"):
+        assert lazy not in modules, f"{lazy} imported eagerly"
+
+
+@pytest.mark.parametrize("module", ["src.log", "src.domain.scrape_service"])
+def test_core_modules_do_not_load_settings(module, report):
+    total_us, modules = _importtime(module)
+    report(f"import {module}", [("cumulative", f"{total_us / 1000:7.1f} ms")])
+    # settings (and pydantic_settings) are only built when first used
+    assert "pydantic_settings" not in modules
+    assert "src.config" not in modules
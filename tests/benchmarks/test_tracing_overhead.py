@@ -0,0 +1,62 @@
+import time
+
+import pytest
+
+from src.log import request_id_ctx_var
+from src.tracing import BatchSpanExporter, Tracer
+
+pytestmark = pytest.mark.benchmark
+
+
+class NullSink:
+    def __init__(self):
+        self.spans = 0
+
+    def write(self, spans):
+        self.spans += len(spans)
+
+    def close(self):
+        pass
+
+
+def _emit_request(tracer: Tracer) -> None:
+    # Mirrors the spans of one scrape: middleware, facade, service, provider
+    # phases, parse and extract.
+    with tracer.span("http.request", method="POST", path="/scrape"):
+        with tracer.span("facade.scrape", url="https://x"):
+            with tracer.span("scrape", url="https://x", selectors=2):
+                with tracer.span("fetch", url="https://x"):
+                    with tracer.span("robots", url="https://x/robots.txt"):
+                        pass
+                    with tracer.span("download", status_code=200):
+                        pass
+                with tracer.span("parse", chars=1000):
+                    pass
+                with tracer.span("extract", selectors=2):
+                    pass
+
+
+def _per_request_us(tracer: Tracer, requests: int) -> float:
+    start = time.perf_counter()
+    for i in range(requests):
+        token = request_id_ctx_var.set(f"{i:032x}")
+        try:
+            _emit_request(tracer)
+        finally:
+            request_id_ctx_var.reset(token)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def test_tracing_overhead_per_request(bench_scale, report):
+    requests = 2000 * bench_scale
+    rows = [("tracing off", f"{_per_request_us(Tracer(), requests):9.1f} us")]
+    for rate in (0.01, 0.1, 1.0):
+        sink = NullSink()
+        exporter = BatchSpanExporter(sink, max_queue=requests * 8)
+        us = _per_request_us(Tracer(exporter, sample_rate=rate), requests)
+        exporter.shutdown()
+        rows.append((f"sample rate {rate:g} ({sink.spans} spans)", f"{us:9.1f} us"))
+
+    report(f"Tracing overhead per request ({requests} requests, 8 spans each)", rows)
+    # fully sampled traces export every span
+    assert sink.spans == requests * 8
@@ -0,0 +1,191 @@
+import asyncio
+import socket
+
+import httpx
+import pytest
+
+from src.adapters.http.dns import (
+    DNSCache,
+    SystemResolver,
+    build_dns_transport,
+    build_resolver,
+    happy_eyeballs,
+    interleave_families,
+)
+from src.metrics import MetricsRegistry
+
+V4 = int(socket.AF_INET)
+V6 = int(socket.AF_INET6)
+
+
+class StubResolver:
+    """Local stub resolver: static records, counts lookups."""
+
+    def __init__(self, records, ttl=None, delay=0.0):
+        self.records = records
+        self.ttl = ttl
+        self.delay = delay
+        self.lookups = 0
+
+    async def resolve(self, host, port):
+        self.lookups += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if host not in self.records:
+            raise socket.gaierror(f"unknown host {host}")
+        return list(self.records[host]), self.ttl
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_cache_respects_ttl():
+    clock = FakeClock()
+    resolver = StubResolver({"a.test": [(V4, "10.0.0.1")]}, ttl=30)
+    cache = DNSCache(resolver=resolver, clock=clock, metrics=MetricsRegistry())
+
+    assert await cache.resolve("a.test", 80) == [(V4, "10.0.0.1")]
+    clock.now += 10
+    await cache.resolve("a.test", 80)
+    assert resolver.lookups == 1
+
+    clock.now += 25
+    await cache.resolve("a.test", 80)
+    assert resolver.lookups == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_are_coalesced():
+    resolver = StubResolver({"a.test": [(V4, "10.0.0.1")]}, delay=0.01)
+    cache = DNSCache(resolver=resolver, metrics=MetricsRegistry())
+
+    results = await asyncio.gather(*(cache.resolve("a.test", 443) for _ in range(10)))
+    assert all(r == [(V4, "10.0.0.1")] for r in results)
+    assert resolver.lookups == 1
+
+
+@pytest.mark.asyncio
+async def test_prefetches_entries_close_to_expiry():
+    clock = FakeClock()
+    registry = MetricsRegistry()
+    resolver = StubResolver({"a.test": [(V4, "10.0.0.1")]}, ttl=100)
+    cache = DNSCache(
+        resolver=resolver, clock=clock, prefetch_ratio=0.1, metrics=registry
+    )
+
+    await cache.resolve("a.test", 80)
+    clock.now += 95  # inside the last 10% of the TTL
+    await cache.resolve("a.test", 80)
+    assert len(cache._tasks) == 1
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert resolver.lookups == 2
+    assert not cache._tasks
+    snapshot = registry.snapshot()
+    assert snapshot["counters"]["dns.prefetches"] == 1
+    assert snapshot["summaries"]["dns.resolve_seconds"]["count"] == 2
+
+
+def test_interleave_families_alternates():
+    addrs = [(V6, "::1"), (V6, "::2"), (V4, "10.0.0.1"), (V4, "10.0.0.2")]
+    assert [a[1] for a in interleave_families(addrs)] == [
+        "::1",
+        "10.0.0.1",
+        "::2",
+        "10.0.0.2",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_happy_eyeballs_falls_back_to_next_family():
+    async def connect(ip):
+        if ip == "::1":
+            await asyncio.sleep(10)
+        return ip
+
+    result = await happy_eyeballs([(V6, "::1"), (V4, "127.0.0.1")], connect, delay=0.01)
+    assert result == "127.0.0.1"
+
+
+@pytest.mark.asyncio
+async def test_transport_resolves_through_stub_resolver():
+    async def handle(reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: close\r\n\r\nok"
+        )
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    resolver = StubResolver({"stub.test": [(V4, "127.0.0.1")]})
+    cache = DNSCache(resolver=resolver, metrics=MetricsRegistry())
+
+    try:
+        async with httpx.AsyncClient(transport=build_dns_transport(cache)) as client:
+            resp = await client.get(f"http://stub.test:{port}/")
+            with pytest.raises(httpx.ConnectError):
+                await client.get(f"http://missing.test:{port}/")
+    finally:
+        server.close()
+        await server.wait_closed()
+
+    assert resp.text == "ok"
+    assert resolver.lookups == 2
+
+
+@pytest.mark.asyncio
+async def test_system_resolver_runs_on_its_own_thread_pool(monkeypatch):
+    import threading
+
+    threads = []
+
+    def fake_getaddrinfo(host, port, type=0):
+        threads.append(threading.current_thread().name)
+        return [(V4, socket.SOCK_STREAM, 6, "", ("10.0.0.9", port))]
+
+    monkeypatch.setattr(socket, "getaddrinfo", fake_getaddrinfo)
+    resolver = build_resolver("system", threads=2)
+    assert isinstance(resolver, SystemResolver)
+    try:
+        assert await resolver.resolve("a.test", 80) == ([(V4, "10.0.0.9")], None)
+    finally:
+        resolver.close()
+    assert threads[0].startswith("dns")
+
+
+@pytest.mark.asyncio
+async def test_proxy_transport_resolves_proxy_host_through_cache():
+    request_lines = []
+
+    async def handle(reader, writer):
+        head = await reader.readuntil(b"\r\n\r\n")
+        request_lines.append(head.split(b"\r\n")[0])
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: close\r\n\r\nok")
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    resolver = StubResolver({"proxy.test": [(V4, "127.0.0.1")]})
+    cache = DNSCache(resolver=resolver, metrics=MetricsRegistry())
+    transport = build_dns_transport(cache, proxy=f"http://proxy.test:{port}")
+
+    try:
+        async with httpx.AsyncClient(transport=transport) as client:
+            resp = await client.get("http://origin.test/page")
+    finally:
+        server.close()
+        await server.wait_closed()
+
+    assert resp.text == "ok"
+    assert request_lines == [b"GET http://origin.test/page HTTP/1.1"]
+    assert resolver.lookups == 1
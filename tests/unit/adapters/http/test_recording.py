@@ -0,0 +1,72 @@
+import time
+
+import httpx
+import pytest
+
+from src.adapters.http.recording import (
+    CassetteArchive,
+    RecordingScrapeProvider,
+    ReplayScrapeProvider,
+)
+from src.adapters.http.scrape_provider_http import HttpxScrapeProvider
+from src.domain.exceptions import ScrapeError
+
+
+def _make_factory(handler):
+    OriginalAsyncClient = httpx.AsyncClient
+
+    def factory(*a, **kw):
+        return OriginalAsyncClient(transport=httpx.MockTransport(handler), **kw)
+
+    return factory
+
+
+@pytest.mark.asyncio
+async def test_record_then_replay_round_trip(tmp_path, monkeypatch):
+    async def handler(request):
+        if request.url.path == "/robots.txt":
+            return httpx.Response(404)
+        if request.url.path == "/missing":
+            return httpx.Response(404, text="nope")
+        return httpx.Response(
+            200, text="<h1>Hola</h1>", headers={"Content-Type": "text/html"}
+        )
+
+    monkeypatch.setattr(
+        "src.adapters.http.scrape_provider_http.httpx.AsyncClient",
+        _make_factory(handler),
+    )
+    archive = CassetteArchive(str(tmp_path / "cassette.jsonl.gz"))
+    recorder = RecordingScrapeProvider(HttpxScrapeProvider(), archive)
+
+    assert await recorder.fetch("https://example.com/page") == "<h1>Hola</h1>"
+    with pytest.raises(ScrapeError):
+        await recorder.fetch("https://example.com/missing")
+
+    entries = archive.load()
+    page = entries["https://example.com/page"][0]
+    assert page["status"] == 200
+    assert page["headers"]["content-type"] == "text/html"
+
+    replay = ReplayScrapeProvider(archive)
+    assert await replay.fetch("https://example.com/page") == "<h1>Hola</h1>"
+    with pytest.raises(ScrapeError) as excinfo:
+        await replay.fetch("https://example.com/missing")
+    assert excinfo.value.status_code == 404
+    with pytest.raises(ScrapeError):
+        await replay.fetch("https://example.com/never-recorded")
+
+
+@pytest.mark.asyncio
+async def test_replay_round_robin_and_simulated_latency(tmp_path):
+    archive = CassetteArchive(str(tmp_path / "cassette.jsonl.gz"))
+    archive.append({"url": "https://a", "status": 200, "body": "one", "elapsed": 0.05})
+    archive.append({"url": "https://a", "status": 200, "body": "two", "elapsed": 0.05})
+
+    replay = ReplayScrapeProvider(archive, simulate_latency=True, latency_scale=0.5)
+    start = time.perf_counter()
+    bodies = [await replay.fetch("https://a") for _ in range(3)]
+    elapsed = time.perf_counter() - start
+
+    assert bodies == ["one", "two", "one"]
+    assert elapsed >= 3 * 0.025
@@ -0,0 +1,154 @@
+import asyncio
+
+import pytest
+
+from src.adapters.http.resilient_provider import (
+    LatencyTracker,
+    ResilientScrapeProvider,
+    RetryBudget,
+)
+from src.domain.exceptions import ScrapeError
+
+
+class ScriptedProvider:
+    """Fake provider returning (or raising) the scripted outcomes in order."""
+
+    def __init__(self, outcomes, delays=None):
+        self.outcomes = list(outcomes)
+        self.delays = list(delays or [])
+        self.calls = 0
+        self.cancelled = 0
+
+    async def fetch(self, url, headers=None, timeout=None, respect_robots=True):
+        idx = self.calls
+        self.calls += 1
+        if idx < len(self.delays) and self.delays[idx]:
+            try:
+                await asyncio.sleep(self.delays[idx])
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+        outcome = self.outcomes[min(idx, len(self.outcomes) - 1)]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+async def _no_sleep(delay):
+    return None
+
+
+@pytest.mark.asyncio
+async def test_retries_retryable_status_then_succeeds():
+    inner = ScriptedProvider([ScrapeError("busy", status_code=503), "<html>ok</html>"])
+    provider = ResilientScrapeProvider(inner, hedge_enabled=False, sleep=_no_sleep)
+
+    assert await provider.fetch("https://example.com/") == "<html>ok</html>"
+    assert inner.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_does_not_retry_non_retryable_status():
+    inner = ScriptedProvider([ScrapeError("missing", status_code=404), "never"])
+    provider = ResilientScrapeProvider(inner, hedge_enabled=False, sleep=_no_sleep)
+
+    with pytest.raises(ScrapeError):
+        await provider.fetch("https://example.com/")
+    assert inner.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_honours_retry_after_and_gives_up_when_too_long():
+    slept = []
+
+    async def record_sleep(delay):
+        slept.append(delay)
+
+    inner = ScriptedProvider(
+        [ScrapeError("slow down", status_code=429, retry_after=2.0), "ok"]
+    )
+    provider = ResilientScrapeProvider(inner, hedge_enabled=False, sleep=record_sleep)
+    assert await provider.fetch("https://example.com/") == "ok"
+    assert slept and slept[0] >= 2.0
+
+    inner = ScriptedProvider([ScrapeError("later", status_code=503, retry_after=600)])
+    provider = ResilientScrapeProvider(inner, hedge_enabled=False, sleep=record_sleep)
+    with pytest.raises(ScrapeError):
+        await provider.fetch("https://example.com/")
+    assert inner.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_empty_retry_budget_stops_retries():
+    budget = RetryBudget(ratio=0.0, min_per_second=0.0)
+    budget.try_withdraw()  # drain the initial token
+    inner = ScriptedProvider([ScrapeError("connect failed"), "ok"])
+    provider = ResilientScrapeProvider(
+        inner, hedge_enabled=False, retry_budget=budget, sleep=_no_sleep
+    )
+
+    with pytest.raises(ScrapeError):
+        await provider.fetch("https://example.com/")
+    assert inner.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_hedges_slow_request_and_cancels_loser():
+    tracker = LatencyTracker(min_samples=1)
+    tracker.record("example.com", 0.01)
+    # first call hangs, the hedge returns immediately
+    inner = ScriptedProvider(["slow", "fast"], delays=[5.0, 0])
+    provider = ResilientScrapeProvider(
+        inner, latency_tracker=tracker, hedge_min_delay=0.01
+    )
+
+    assert await provider.fetch("https://example.com/") == "fast"
+    await asyncio.sleep(0)
+    assert inner.calls == 2
+    assert inner.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_retries_stay_within_the_request_timeout():
+    now = [0.0]
+    timeouts = []
+
+    class TimedProvider(ScriptedProvider):
+        async def fetch(self, url, headers=None, timeout=None, respect_robots=True):
+            timeouts.append(timeout)
+            now[0] += 1.0  # each attempt takes a second
+            return await super().fetch(url)
+
+    async def clock_sleep(delay):
+        now[0] += delay
+
+    busy = ScrapeError("busy", status_code=503, retry_after=2.0)
+    inner = TimedProvider([busy, busy, "ok"])
+    provider = ResilientScrapeProvider(
+        inner, max_attempts=5, hedge_enabled=False, sleep=clock_sleep, clock=lambda: now[0]
+    )
+    # 1s attempt + 2s Retry-After leaves 2s of the 5s timeout for attempt 2;
+    # after it another 2s wait would leave nothing, so attempt 3 never starts
+    with pytest.raises(ScrapeError):
+        await provider.fetch("https://example.com/", timeout=5.0)
+    assert inner.calls == 2
+    assert timeouts == [5.0, pytest.approx(2.0)]
+
+
+def test_from_settings_shares_process_wide_budgets():
+    from types import SimpleNamespace
+
+    settings = SimpleNamespace(
+        SCRAPE_RETRY_MAX_ATTEMPTS=3,
+        SCRAPE_RETRY_BACKOFF_BASE=0.2,
+        SCRAPE_RETRY_BACKOFF_MAX=5.0,
+        SCRAPE_RETRY_BUDGET_RATIO=0.1,
+        SCRAPE_HEDGE_ENABLED=False,
+        SCRAPE_HEDGE_PERCENTILE=95.0,
+        SCRAPE_HEDGE_BUDGET_RATIO=0.05,
+    )
+    first = ResilientScrapeProvider.from_settings(ScriptedProvider(["ok"]), settings)
+    second = ResilientScrapeProvider.from_settings(ScriptedProvider(["ok"]), settings)
+    assert first.retry_budget is second.retry_budget
+    assert first.hedge_budget is second.hedge_budget
+    assert first.retry_budget is not first.hedge_budget
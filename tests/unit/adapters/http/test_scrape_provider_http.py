@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 
 import httpx
@@ -106,3 +108,196 @@ async def test_fetch_robots_network_error_proceeds(monkeypatch):
     provider = HttpxScrapeProvider()
     text = await provider.fetch("https://example.com/page")
     assert "ok" in text
+
+
+@pytest.mark.asyncio
+async def test_shared_client_and_robots_cache_fetch_robots_once():
+    calls = {"robots": 0, "page": 0}
+
+    async def handler(request):
+        if request.url.path == "/robots.txt":
+            calls["robots"] += 1
+            return httpx.Response(200, text="User-agent: *\nDisallow: /private")
+        calls["page"] += 1
+        return httpx.Response(200, text="<html><h1>OK</h1></html>")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    provider = HttpxScrapeProvider(client=client, robots_cache_ttl=60)
+
+    texts = await asyncio.gather(
+        *(provider.fetch(f"https://example.com/p{i}") for i in range(5))
+    )
+    assert all("OK" in t for t in texts)
+    with pytest.raises(ScrapeError):
+        await provider.fetch("https://example.com/private/x")
+    assert calls == {"robots": 1, "page": 5}
+
+    # injected clients belong to the caller
+    await provider.aclose()
+    assert not client.is_closed
+    await client.aclose()
+
+
+def _gzip_client(body: bytes, encoding: str = "gzip"):
+    import gzip
+    import zlib
+
+    payload = gzip.compress(body) if encoding == "gzip" else zlib.compress(body)
+    seen = {}
+
+    async def handler(request):
+        seen["accept_encoding"] = request.headers.get("Accept-Encoding")
+        # stream=... keeps the body unread, as a network response would be
+        return httpx.Response(
+            200,
+            stream=httpx.ByteStream(payload),
+            headers={"Content-Encoding": encoding, "Content-Type": "text/html"},
+        )
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler)), seen
+
+
+@pytest.mark.asyncio
+async def test_fetch_decodes_gzip_and_records_byte_metrics():
+    from src.metrics import metrics
+
+    metrics.reset()
+    body = b"<html><h1>OK</h1>" + b"<p>filler</p>" * 1000 + b"</html>"
+    client, seen = _gzip_client(body)
+    provider = HttpxScrapeProvider(client=client)
+
+    page = await provider.fetch_page("https://example.com/", respect_robots=False)
+    assert page.text == body.decode()
+    assert page.size < len(body)
+    assert "gzip" in seen["accept_encoding"]
+
+    counters = metrics.snapshot()["counters"]
+    assert counters["fetch.bytes_compressed{encoding=gzip}"] == page.size
+    assert counters["fetch.bytes_decompressed{encoding=gzip}"] == len(body)
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_fetch_decodes_deflate():
+    client, _ = _gzip_client(b"<p>deflated</p>", encoding="deflate")
+    provider = HttpxScrapeProvider(client=client)
+    assert await provider.fetch("https://example.com/", respect_robots=False) == (
+        "<p>deflated</p>"
+    )
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_fetch_rejects_body_over_size_limit():
+    client, _ = _gzip_client(b"x" * 5000)
+    provider = HttpxScrapeProvider(client=client, max_body_bytes=4096)
+    with pytest.raises(ScrapeError, match="exceeds 4096 bytes"):
+        await provider.fetch("https://example.com/", respect_robots=False)
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_unsupported_encoding_is_not_offered_and_rejected():
+    from src.adapters.http.compression import accept_encoding
+
+    seen = {}
+
+    async def handler(request):
+        seen["accept_encoding"] = request.headers["Accept-Encoding"]
+        return httpx.Response(
+            200, stream=httpx.ByteStream(b"\x1f\x9d"), headers={"Content-Encoding": "compress"}
+        )
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    provider = HttpxScrapeProvider(client=client)
+    with pytest.raises(ScrapeError, match="unsupported Content-Encoding compress"):
+        await provider.fetch("https://example.com/", respect_robots=False)
+    # br/zstd are only offered when a bounded decoder is installed
+    assert seen["accept_encoding"] == accept_encoding()
+    assert seen["accept_encoding"].endswith("gzip, deflate")
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("encoding", ["br", "zstd"])
+async def test_brotli_and_zstd_are_decoded_within_the_budget(encoding):
+    if encoding == "br":
+        brotli = pytest.importorskip("brotli")
+        if not hasattr(brotli.Decompressor, "can_accept_more_data"):
+            pytest.skip("brotli < 1.1 cannot bound its output")
+        compress = brotli.compress
+    else:
+        compress = pytest.importorskip("zstandard").ZstdCompressor().compress
+
+    def client_for(body: bytes):
+        async def handler(request):
+            assert encoding in request.headers["Accept-Encoding"]
+            return httpx.Response(
+                200,
+                stream=httpx.ByteStream(compress(body)),
+                headers={"Content-Encoding": encoding, "Content-Type": "text/html"},
+            )
+
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    client = client_for(b"<h1>hello</h1>")
+    provider = HttpxScrapeProvider(client=client)
+    assert await provider.fetch("https://example.com/", respect_robots=False) == "<h1>hello</h1>"
+    await client.aclose()
+
+    # a tiny compressed body expanding far past the limit is cut off
+    client = client_for(b"x" * 50_000_000)
+    provider = HttpxScrapeProvider(client=client, max_body_bytes=1_000_000)
+    with pytest.raises(ScrapeError, match="exceeds 1000000 bytes"):
+        await provider.fetch("https://example.com/", respect_robots=False)
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_rejected_bodies_are_not_retried():
+    from src.adapters.http.resilient_provider import ResilientScrapeProvider
+
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url)
+        return httpx.Response(200, stream=httpx.ByteStream(b"x" * 5000))
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    provider = ResilientScrapeProvider(
+        HttpxScrapeProvider(client=client, max_body_bytes=4096),
+        hedge_enabled=False,
+        sleep=lambda delay: asyncio.sleep(0),
+    )
+    with pytest.raises(ScrapeError) as excinfo:
+        await provider.fetch("https://example.com/", respect_robots=False)
+    assert excinfo.value.retryable is False
+    assert len(calls) == 1
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_fetch_rejects_decompression_bomb_by_ratio():
+    from src.metrics import metrics
+
+    metrics.reset()
+    # ~8 MiB of zeros compress to a few KiB (ratio ~1000)
+    client, _ = _gzip_client(b"\0" * (8 * 1024 * 1024))
+    provider = HttpxScrapeProvider(client=client, max_compression_ratio=100)
+    with pytest.raises(ScrapeError, match="compression ratio"):
+        await provider.fetch("https://example.com/", respect_robots=False)
+    assert metrics.snapshot()["counters"]["fetch.rejected_bodies{reason=ratio}"] == 1
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_oversized_robots_txt_is_ignored():
+    async def handler(request):
+        if request.url.path == "/robots.txt":
+            return httpx.Response(200, text="User-agent: *\nDisallow: /\n" * 50_000)
+        return httpx.Response(200, text="<p>ok</p>")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    provider = HttpxScrapeProvider(client=client)
+    assert "ok" in await provider.fetch("https://example.com/page")
+    await client.aclose()
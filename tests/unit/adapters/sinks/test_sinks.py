@@ -0,0 +1,158 @@
+import asyncio
+import json
+import sqlite3
+
+import pytest
+
+from src.adapters.sinks.jsonl_sink import JsonlSink
+from src.adapters.sinks.sqlite_sink import SQLiteSink
+from src.application.facade import ApplicationFacade
+from src.domain.exceptions import ScrapeError
+from src.domain.scrape import ScrapeRequest, ScrapeResult
+from src.domain.scrape_service import ScrapeService
+
+
+def _result(i: int) -> ScrapeResult:
+    return ScrapeResult(url=f"https://example.com/{i}", data={"title": [f"T{i}"]})
+
+
+def _read_jsonl(path):
+    with open(path, encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh]
+
+
+async def test_jsonl_sink_batches_by_size(tmp_path):
+    path = tmp_path / "out.jsonl"
+    sink = JsonlSink(str(path), flush_size=3, flush_interval=None)
+    for i in range(4):
+        await sink.write(_result(i))
+    # three rows flushed, one still buffered
+    assert len(_read_jsonl(path)) == 3
+    await sink.close()
+    rows = _read_jsonl(path)
+    assert [r["url"] for r in rows] == [f"https://example.com/{i}" for i in range(4)]
+    assert rows[0]["data"] == {"title": ["T0"]} and rows[0]["error"] is None
+
+
+async def test_jsonl_sink_flushes_on_interval(tmp_path):
+    path = tmp_path / "out.jsonl"
+    sink = JsonlSink(str(path), flush_size=100, flush_interval=0.01)
+    await sink.write(_result(1))
+    await asyncio.sleep(0.1)
+    assert len(_read_jsonl(path)) == 1
+    await sink.close()
+
+
+async def test_jsonl_sink_rotates(tmp_path):
+    path = tmp_path / "out.jsonl"
+    async with JsonlSink(str(path), max_bytes=200, flush_size=2, flush_interval=None) as sink:
+        for i in range(10):
+            await sink.write(_result(i))
+    assert sink.rotated and sink.rotated[0].endswith("out.00001.jsonl")
+    files = sink.rotated + ([str(path)] if path.exists() else [])
+    assert sum(len(_read_jsonl(f)) for f in files) == 10
+
+
+async def test_sqlite_sink_inserts_batches(tmp_path):
+    path = str(tmp_path / "out.sqlite3")
+    sink = SQLiteSink(path, flush_size=2, flush_interval=None)
+    for i in range(5):
+        await sink.write(_result(i))
+    await sink.write(ScrapeResult(url="https://bad", data={}), "boom")
+    await sink.close()
+
+    conn = sqlite3.connect(path)
+    rows = conn.execute("SELECT url, data, error FROM scrape_results ORDER BY id").fetchall()
+    conn.close()
+    assert len(rows) == 6
+    assert json.loads(rows[0][1]) == {"title": ["T0"]}
+    assert rows[-1] == ("https://bad", "{}", "boom")
+
+
+async def test_parquet_sink_writes_row_groups(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    from src.adapters.sinks.parquet_sink import ParquetSink
+
+    path = str(tmp_path / "out.parquet")
+    sink = ParquetSink(path, flush_size=4)
+    for i in range(10):
+        await sink.write(_result(i))
+    await sink.close()
+
+    meta = pq.ParquetFile(path).metadata
+    assert meta.num_rows == 10 and meta.num_row_groups == 3
+    table = pq.read_table(path)
+    assert json.loads(table.column("data")[0].as_py()) == {"title": ["T0"]}
+
+
+class FlakyProvider:
+    async def fetch(self, url: str, headers=None, timeout=None, respect_robots: bool = True):
+        if url.endswith("/bad"):
+            raise ScrapeError("upstream failed", status_code=500)
+        return "<h1>ok</h1>"
+
+
+async def test_facade_scrape_batch_writes_results_and_errors(tmp_path):
+    facade = ApplicationFacade("p", "test", scrape_service=ScrapeService(FlakyProvider()))
+    path = tmp_path / "out.jsonl"
+    urls = ["https://e.com/1", "https://e.com/bad", "https://e.com/2"]
+    async with JsonlSink(str(path), flush_interval=None) as sink:
+        counts = await facade.scrape_batch(
+            (ScrapeRequest(url=u, selectors={"h": "h1"}) for u in urls), sink, concurrency=2
+        )
+    # bytes of the two pages fetched ("<h1>ok</h1>" each)
+    assert counts == {"written": 2, "failed": 1, "bytes": 22}
+    rows = {r["url"]: r for r in _read_jsonl(path)}
+    assert rows["https://e.com/bad"]["error"] == "upstream failed"
+    assert rows["https://e.com/1"]["data"] == {"h": ["ok"]}
+
+
+async def test_facade_scrape_batch_records_unexpected_errors_per_item(tmp_path):
+    facade = ApplicationFacade("p", "test", scrape_service=ScrapeService(FlakyProvider()))
+    path = tmp_path / "out.jsonl"
+    requests = [
+        ScrapeRequest(url="https://e.com/1", selectors={"h": "h1"}),
+        ScrapeRequest(url="https://e.com/2", selectors={"h": "a["}),
+        ScrapeRequest(url="https://e.com/3", selectors={"h": "h1"}),
+    ]
+    async with JsonlSink(str(path), flush_interval=None) as sink:
+        counts = await facade.scrape_batch(requests, sink, concurrency=2)
+    assert (counts["written"], counts["failed"]) == (2, 1)
+    rows = {r["url"]: r for r in _read_jsonl(path)}
+    assert len(rows) == 3
+    assert rows["https://e.com/2"]["error"]
+    assert rows["https://e.com/3"]["data"] == {"h": ["ok"]}
+
+
+async def test_failed_batch_write_keeps_rows_and_fails_close(tmp_path):
+    path = tmp_path / "out.jsonl"
+    sink = JsonlSink(str(path), flush_size=100, flush_interval=None)
+    calls = []
+    write_batch = sink._write_batch
+
+    def flaky(rows):
+        calls.append(len(rows))
+        if len(calls) == 1:
+            raise OSError("disk full")
+        write_batch(rows)
+
+    sink._write_batch = flaky
+    await sink.write(_result(1))
+    with pytest.raises(OSError):
+        await sink.flush()
+    await sink.write(_result(2))
+    await sink.close()
+    # the failed rows were retried ahead of the new ones
+    assert calls == [1, 2]
+    assert [r["url"] for r in _read_jsonl(path)] == [
+        "https://example.com/1",
+        "https://example.com/2",
+    ]
+
+    broken = JsonlSink(str(tmp_path / "broken.jsonl"), flush_size=100, flush_interval=None)
+    broken._write_batch = lambda rows: (_ for _ in ()).throw(OSError("disk full"))
+    await broken.write(_result(3))
+    with pytest.raises(OSError):
+        await broken.close()
+    with pytest.raises(RuntimeError):
+        await broken.write(_result(4))
@@ -0,0 +1,103 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.adapters.api.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    LoopLagMonitor,
+)
+from src.adapters.api.middleware import add_middlewares
+
+
+@pytest.mark.asyncio
+async def test_waiter_gets_slot_handed_over():
+    ctrl = AdmissionController(max_inflight=1, max_queue=1, queue_timeout=1.0)
+    await ctrl.acquire()
+
+    waiter = asyncio.ensure_future(ctrl.acquire())
+    await asyncio.sleep(0)
+    assert ctrl.waiting == 1
+
+    ctrl.release()
+    await waiter
+    assert ctrl.inflight == 1 and ctrl.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_full_or_wait_times_out():
+    ctrl = AdmissionController(max_inflight=1, max_queue=1, queue_timeout=0.01)
+    await ctrl.acquire()
+    waiter = asyncio.ensure_future(ctrl.acquire())
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejected) as excinfo:
+        await ctrl.acquire()
+    assert excinfo.value.reason == "queue_full"
+
+    with pytest.raises(AdmissionRejected) as excinfo:
+        await waiter
+    assert excinfo.value.reason == "queue_timeout"
+    assert ctrl.waiting == 0 and ctrl.inflight == 1
+
+
+@pytest.mark.asyncio
+async def test_sheds_when_loop_lag_is_high():
+    monitor = LoopLagMonitor()
+    ctrl = AdmissionController(max_inflight=10, max_loop_lag=0.1, lag_monitor=monitor)
+    monitor.ensure_started()
+    monitor.lag = 0.5
+    try:
+        with pytest.raises(AdmissionRejected) as excinfo:
+            await ctrl.acquire()
+    finally:
+        monitor.stop()
+    assert excinfo.value.reason == "loop_lag"
+
+
+def test_middleware_returns_503_with_retry_after():
+    settings = SimpleNamespace(
+        ADMISSION_MAX_INFLIGHT=1,
+        ADMISSION_MAX_QUEUE=0,
+        ADMISSION_QUEUE_TIMEOUT=0.1,
+        ADMISSION_MAX_LOOP_LAG=0,
+        ADMISSION_RETRY_AFTER=3,
+    )
+    app = FastAPI()
+    add_middlewares(app, settings)
+
+    @app.post("/scrape")
+    async def scrape():
+        return {"ok": True}
+
+    client = TestClient(app)
+    assert client.post("/scrape").status_code == 200
+
+    # occupy the only slot so the next scrape is shed
+    app.state.admission.inflight = 1
+    resp = client.post("/scrape")
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "3"
+    assert "X-Request-ID" in resp.headers
+
+
+@pytest.mark.asyncio
+async def test_drain_rejects_new_requests_and_waits_for_inflight():
+    # limit disabled: requests are only counted
+    ctrl = AdmissionController(max_inflight=0)
+    await ctrl.acquire()
+    assert ctrl.inflight == 1
+
+    drain = asyncio.ensure_future(ctrl.drain(timeout=1.0, poll=0.01))
+    await asyncio.sleep(0.02)
+    assert not drain.done()
+    with pytest.raises(AdmissionRejected) as excinfo:
+        await ctrl.acquire()
+    assert excinfo.value.reason == "draining"
+
+    ctrl.release()
+    assert await drain is True
+    assert await AdmissionController(max_inflight=1).drain(timeout=0) is True
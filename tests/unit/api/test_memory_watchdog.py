@@ -0,0 +1,80 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from src.adapters.api.admission import AdmissionController
+from src.adapters.api.memory import MemoryWatchdog, read_rss_bytes
+
+MiB = 1024 * 1024
+
+
+class FakeMemory:
+    def __init__(self, *readings):
+        self.readings = list(readings)
+        self.trims = 0
+        self.trim_threads = []
+
+    def read(self):
+        return self.readings.pop(0) if len(self.readings) > 1 else self.readings[0]
+
+    def trim(self):
+        self.trims += 1
+        self.trim_threads.append(threading.current_thread())
+
+
+def _watchdog(memory, admission=None, recycled=None):
+    return MemoryWatchdog(
+        admission or AdmissionController(max_inflight=0),
+        max_rss_bytes=100 * MiB,
+        drain_timeout=1.0,
+        read_rss=memory.read,
+        trim=memory.trim,
+        recycle=lambda: recycled.append(True),
+    )
+
+
+def test_read_rss_bytes_reports_a_plausible_size():
+    rss = read_rss_bytes()
+    if rss is None:
+        pytest.skip("/proc/self/statm not available")
+    assert 1 * MiB < rss < 64 * 1024 * MiB
+
+
+@pytest.mark.asyncio
+async def test_below_limit_or_reclaimed_by_trim_keeps_the_worker():
+    recycled = []
+    assert await _watchdog(FakeMemory(50 * MiB), recycled=recycled).check() is False
+
+    memory = FakeMemory(150 * MiB, 80 * MiB)
+    assert await _watchdog(memory, recycled=recycled).check() is False
+    assert memory.trims == 1 and recycled == []
+    # the trim does not run on the event loop thread
+    assert memory.trim_threads[0] is not threading.current_thread()
+
+
+@pytest.mark.asyncio
+async def test_above_limit_drains_then_recycles():
+    recycled = []
+    admission = AdmissionController(max_inflight=0)
+    await admission.acquire()
+    watchdog = _watchdog(FakeMemory(150 * MiB), admission, recycled)
+
+    check = asyncio.ensure_future(watchdog.check())
+    await asyncio.sleep(0.1)
+    # new scrapes are refused while the in-flight one finishes
+    assert admission.draining and recycled == []
+    admission.release()
+
+    assert await check is True
+    assert recycled == [True] and watchdog.recycling
+
+
+def test_from_settings_is_disabled_by_default():
+    admission = AdmissionController()
+    assert MemoryWatchdog.from_settings(SimpleNamespace(), admission) is None
+    watchdog = MemoryWatchdog.from_settings(
+        SimpleNamespace(MEMORY_MAX_RSS_MB=512), admission
+    )
+    assert watchdog.max_rss_bytes == 512 * MiB
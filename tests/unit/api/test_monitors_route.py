@@ -0,0 +1,61 @@
+from fastapi.testclient import TestClient
+
+from src.application import api_app as api_app_module
+from src.config import api_settings
+
+
+def test_monitor_crud_and_validation():
+    client = TestClient(api_app_module.app)
+    headers = {"X-API-Key": api_settings.API_KEY}
+    payload = {"url": "https://example.com", "selectors": {"title": "h1"}, "interval": 3600}
+
+    assert client.post("/monitors", json=payload).status_code == 403
+
+    too_fast = dict(payload, interval=0.1)
+    assert client.post("/monitors", json=too_fast, headers=headers).status_code == 422
+
+    created = client.post("/monitors", json=payload, headers=headers)
+    assert created.status_code == 201
+    monitor_id = created.json()["id"]
+    try:
+        listed = client.get("/monitors", headers=headers).json()["monitors"]
+        assert [m["id"] for m in listed] == [monitor_id]
+        assert client.get(f"/monitors/{monitor_id}", headers=headers).json()["url"] == "https://example.com/"
+    finally:
+        assert client.delete(f"/monitors/{monitor_id}", headers=headers).status_code == 204
+    assert client.get(f"/monitors/{monitor_id}", headers=headers).status_code == 404
+
+
+def test_monitors_are_scoped_to_the_creating_key(monkeypatch):
+    monkeypatch.setattr(api_settings, "API_KEYS", "other-key")
+    monkeypatch.setattr(api_settings, "MONITOR_MAX_PER_KEY", 1)
+    client = TestClient(api_app_module.app)
+    mine = {"X-API-Key": api_settings.API_KEY}
+    theirs = {"X-API-Key": "other-key"}
+    payload = {
+        "url": "https://example.com",
+        "selectors": {"title": "h1"},
+        "interval": 3600,
+        "headers": {"Authorization": "Bearer secret"},
+    }
+
+    created = client.post("/monitors", json=payload, headers=mine)
+    assert created.status_code == 201
+    monitor_id = created.json()["id"]
+    try:
+        assert "headers" not in created.json()
+        assert "owner" not in created.json()
+        assert "secret" not in client.get(f"/monitors/{monitor_id}", headers=mine).text
+
+        assert client.get("/monitors", headers=theirs).json()["monitors"] == []
+        assert client.get(f"/monitors/{monitor_id}", headers=theirs).status_code == 404
+        assert client.get(f"/monitors/{monitor_id}/events", headers=theirs).status_code == 404
+        assert client.delete(f"/monitors/{monitor_id}", headers=theirs).status_code == 404
+
+        # per-key cap: the first key is full, the other one is not
+        assert client.post("/monitors", json=payload, headers=mine).status_code == 409
+        other = client.post("/monitors", json=payload, headers=theirs)
+        assert other.status_code == 201
+        assert client.delete(f"/monitors/{other.json()['id']}", headers=theirs).status_code == 204
+    finally:
+        assert client.delete(f"/monitors/{monitor_id}", headers=mine).status_code == 204
@@ -0,0 +1,97 @@
+from fastapi.testclient import TestClient
+
+from src.adapters.api import profiling
+from src.adapters.api.ratelimit import KeyQuota, RateLimiter, get_rate_limiter
+
+
+def _client(monkeypatch):
+    from src.application import api_app as api_app_module
+    from src.domain.scrape import ScrapeResult
+
+    async def fake_scrape(req):
+        # allocate something so the memory report has content
+        blob = [str(i) * 10 for i in range(2000)]
+        return ScrapeResult(url="https://example.com", data={"n": [str(len(blob))]})
+
+    monkeypatch.setattr(api_app_module.api_facade, "scrape", fake_scrape)
+    monkeypatch.setattr(profiling, "_admin_keys", lambda: frozenset({"admin-key"}))
+    limiter = RateLimiter({"admin-key": KeyQuota(), "user-key": KeyQuota()}, KeyQuota())
+    api_app_module.app.dependency_overrides[get_rate_limiter] = lambda: limiter
+    return api_app_module.app, TestClient(api_app_module.app)
+
+
+PAYLOAD = {"url": "https://example.com", "selectors": {"n": "p"}}
+
+
+def test_profiling_requires_admin_key(monkeypatch):
+    app, client = _client(monkeypatch)
+    try:
+        resp = client.post(
+            "/scrape",
+            json=PAYLOAD,
+            headers={"X-API-Key": "user-key", "X-Profile": "cprofile"},
+        )
+        assert resp.status_code == 403
+        assert client.get(
+            "/admin/profiles", headers={"X-API-Key": "user-key"}
+        ).status_code == 403
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_profiled_scrape_is_stored_by_request_id(monkeypatch):
+    app, client = _client(monkeypatch)
+    headers = {"X-API-Key": "admin-key", "X-Request-ID": "prof-1"}
+    try:
+        resp = client.post(
+            "/scrape?profile=cprofile,memory,sample", json=PAYLOAD, headers=headers
+        )
+        assert resp.status_code == 200
+        assert resp.headers["X-Profile-Id"] == "prof-1"
+
+        profile = client.get("/admin/profiles/prof-1", headers=headers).json()
+        assert profile["modes"] == ["cprofile", "memory", "sample"]
+        assert "fake_scrape" in profile["cprofile"]
+        assert profile["memory"]["peak_kb"] > 0
+        assert isinstance(profile["collapsed_stacks"], list)
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_unprofiled_requests_store_nothing(monkeypatch):
+    app, client = _client(monkeypatch)
+    before = list(profiling.profile_store.ids())
+    try:
+        resp = client.post("/scrape", json=PAYLOAD)
+        assert resp.status_code == 200
+        assert "X-Profile-Id" not in resp.headers
+        assert profiling.profile_store.ids() == before
+    finally:
+        app.dependency_overrides.clear()
+
+
+async def test_lock_is_released_when_building_the_report_fails(monkeypatch):
+    def broken(profiler):
+        raise RuntimeError("pstats failed")
+
+    monkeypatch.setattr(profiling, "_cprofile_top", broken)
+    store = profiling.ProfileStore()
+    async with profiling.profile_request("r1", frozenset({"cprofile"}), store):
+        pass
+    # a second profiled request is not refused with 409
+    async with profiling.profile_request("r2", frozenset({"sample"}), store):
+        pass
+    assert store.ids() == ["r2"]
+
+
+async def test_memory_report_captures_allocations_freed_before_exit():
+    store = profiling.ProfileStore()
+    async with profiling.profile_request("mem", frozenset({"memory"}), store) as profile:
+        # like a parsed document torn down before the scrape returns
+        blob = bytearray(4 * 1024 * 1024)
+        del blob
+        kept = [str(i) * 10 for i in range(5000)]
+    assert profile["memory"]["peak_kb"] >= 4096
+    assert profile["memory"]["current_kb"] < 4096
+    assert any(row["size_diff_kb"] > 0 for row in profile["memory"]["top"])
+    assert kept
@@ -0,0 +1,183 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from src.adapters.api.ratelimit import (
+    ANONYMOUS,
+    KeyQuota,
+    RateLimiter,
+    SQLiteQuotaStore,
+    get_rate_limiter,
+    parse_api_keys,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_parse_api_keys_json_and_list():
+    default = KeyQuota(rate=1, burst=2)
+    quotas = parse_api_keys('{"a": {"rate": 5}, "b": {}}', default)
+    assert quotas["a"].rate == 5 and quotas["a"].burst == 2
+    assert quotas["b"] == default
+    assert parse_api_keys("x, y", default) == {"x": default, "y": default}
+
+
+def test_token_bucket_limits_and_refills():
+    clock = FakeClock()
+    limiter = RateLimiter({"k": KeyQuota(rate=1, burst=2)}, KeyQuota(), clock=clock)
+    identity, quota = limiter.identify("k")
+
+    limiter.check(identity, quota)
+    ctx = limiter.check(identity, quota)
+    assert ctx.headers()["X-RateLimit-Remaining"] == "0"
+    with pytest.raises(HTTPException) as excinfo:
+        limiter.check(identity, quota)
+    assert excinfo.value.status_code == 429
+    assert excinfo.value.headers["Retry-After"] == "1"
+
+    clock.now += 1
+    limiter.check(identity, quota)
+
+
+def test_unknown_key_rejected_and_missing_key_is_anonymous():
+    limiter = RateLimiter({"k": KeyQuota()}, KeyQuota())
+    with pytest.raises(HTTPException) as excinfo:
+        limiter.identify("nope")
+    assert excinfo.value.status_code == 403
+    assert limiter.identify(None)[0] == ANONYMOUS
+
+
+def test_concurrency_and_daily_byte_quota():
+    limiter = RateLimiter(
+        {"k": KeyQuota(max_concurrent=1, daily_bytes=100)}, KeyQuota()
+    )
+    ctx = limiter.check(*limiter.identify("k"))
+    limiter.acquire(ctx)
+    with pytest.raises(HTTPException):
+        limiter.acquire(limiter.check(*limiter.identify("k")))
+    limiter.release(ctx)
+
+    limiter.record_bytes(ctx, 120)
+    with pytest.raises(HTTPException) as excinfo:
+        limiter.check(*limiter.identify("k"))
+    assert excinfo.value.detail == "Daily byte quota exceeded"
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "rl.sqlite3")
+    clock = FakeClock()
+    quotas = {"k": KeyQuota(rate=0.001, burst=2, max_concurrent=1)}
+    first = RateLimiter(quotas, KeyQuota(), SQLiteQuotaStore(path), clock=clock)
+    second = RateLimiter(quotas, KeyQuota(), SQLiteQuotaStore(path), clock=clock)
+
+    ctx = first.check(*first.identify("k"))
+    first.acquire(ctx)
+    second.check(*second.identify("k"))
+    with pytest.raises(HTTPException):
+        second.check(*second.identify("k"))
+    with pytest.raises(HTTPException):
+        second.acquire(ctx)
+
+
+def test_sqlite_store_limits_instead_of_waiting_for_a_held_lock(tmp_path):
+    import sqlite3
+    import time
+
+    path = str(tmp_path / "rl.sqlite3")
+    store = SQLiteQuotaStore(path, busy_timeout=0.01)
+    assert store.acquire_slot("k", 2)
+
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    try:
+        start = time.perf_counter()
+        assert store.take_token("k", 1.0, 5, 0.0) == (False, 0.0)
+        assert store.acquire_slot("k", 2) is False
+        assert time.perf_counter() - start < 1.0
+        # bookkeeping is kept until the lock is free again
+        store.release_slot("k")
+        assert store.add_bytes("k", "2024-01-01", 10) == 10
+    finally:
+        other.execute("ROLLBACK")
+        other.close()
+
+    assert store.take_token("k", 1.0, 5, 0.0)[0] is True
+    assert store.get_bytes("k", "2024-01-01") == 10
+    assert store.acquire_slot("k", 1)
+    assert not store.acquire_slot("k", 1)
+
+
+def test_scrape_route_returns_rate_limit_headers(monkeypatch):
+    from src.application import api_app as api_app_module
+    from src.domain.scrape import ScrapeResult
+
+    async def fake_scrape(req):
+        return ScrapeResult(url="https://example.com", data={"title": ["X"]})
+
+    monkeypatch.setattr(api_app_module.api_facade, "scrape", fake_scrape)
+    limiter = RateLimiter({}, KeyQuota(rate=0.001, burst=1))
+    api_app_module.app.dependency_overrides[get_rate_limiter] = lambda: limiter
+    try:
+        client = TestClient(api_app_module.app)
+        payload = {"url": "https://example.com", "selectors": {"title": "h1"}}
+        resp = client.post("/scrape", json=payload)
+        assert resp.status_code == 200
+        assert resp.headers["X-RateLimit-Limit"] == "1"
+        assert resp.headers["X-RateLimit-Remaining"] == "0"
+
+        assert client.post("/scrape", json=payload).status_code == 429
+    finally:
+        api_app_module.app.dependency_overrides.clear()
+
+
+def test_scrape_route_charges_fetched_bytes_to_the_injected_limiter(monkeypatch):
+    from src.application import api_app as api_app_module
+    from src.domain.scrape import ScrapeResult
+
+    async def fake_scrape(req):
+        return ScrapeResult(url="https://example.com", data={"title": ["X"]}, meta={"bytes": 300})
+
+    monkeypatch.setattr(api_app_module.api_facade, "scrape", fake_scrape)
+    limiter = RateLimiter({}, KeyQuota(daily_bytes=1000))
+    api_app_module.app.dependency_overrides[get_rate_limiter] = lambda: limiter
+    try:
+        client = TestClient(api_app_module.app)
+        payload = {"url": "https://example.com", "selectors": {"title": "h1"}}
+        resp = client.post("/scrape", json=payload)
+        assert resp.status_code == 200
+        # the fetched page size, as /scrape/batch charges, not the JSON size
+        assert limiter.store.get_bytes(ANONYMOUS, limiter._today()) == 300
+        assert resp.headers["X-RateLimit-Bytes-Remaining"] == "700"
+    finally:
+        api_app_module.app.dependency_overrides.clear()
+
+
+def test_error_responses_carry_rate_limit_headers(monkeypatch):
+    from src.application import api_app as api_app_module
+    from src.domain.exceptions import ScrapeError
+
+    async def failing_scrape(req):
+        raise ScrapeError("upstream down", status_code=500)
+
+    monkeypatch.setattr(api_app_module.api_facade, "scrape", failing_scrape)
+    limiter = RateLimiter({}, KeyQuota(rate=0.001, burst=3))
+    api_app_module.app.dependency_overrides[get_rate_limiter] = lambda: limiter
+    try:
+        client = TestClient(api_app_module.app)
+        payload = {"url": "https://example.com", "selectors": {"title": "h1"}}
+        resp = client.post("/scrape", json=payload)
+        assert resp.status_code == 502
+        assert resp.headers["X-RateLimit-Remaining"] == "2"
+
+        # /scrape/batch refuses anonymous callers after taking their token
+        batch = client.post("/scrape/batch", json={"items": [payload]})
+        assert batch.status_code == 403
+        assert batch.headers["X-RateLimit-Remaining"] == "1"
+    finally:
+        api_app_module.app.dependency_overrides.clear()
@@ -0,0 +1,117 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from src.adapters.api.ratelimit import KeyQuota, RateLimiter, get_rate_limiter
+from src.adapters.api.security import key_namespace
+from src.application import api_app as api_app_module
+from src.config import api_settings
+from src.domain.scrape_service import ScrapeService
+
+KEY = {"X-API-Key": "k1"}
+
+
+class FakeProvider:
+    async def fetch(self, url: str, headers=None, timeout=None, respect_robots: bool = True):
+        return f"<h1>{url}</h1>"
+
+
+def test_scrape_batch_writes_to_server_sink(monkeypatch, tmp_path):
+    monkeypatch.setattr(api_settings, "SINK_DIR", str(tmp_path))
+    monkeypatch.setattr(api_app_module.api_facade, "scrape_service", ScrapeService(FakeProvider()))
+    limiter = RateLimiter({"k1": KeyQuota()}, KeyQuota())
+    api_app_module.app.dependency_overrides[get_rate_limiter] = lambda: limiter
+    try:
+        client = TestClient(api_app_module.app)
+        items = [{"url": f"https://example.com/{i}", "selectors": {"t": "h1"}} for i in range(3)]
+
+        resp = client.post("/scrape/batch", json={"items": items, "name": "job1"}, headers=KEY)
+        assert resp.status_code == 200
+        assert resp.json()["written"] == 3
+        with open(tmp_path / key_namespace("k1") / "job1.jsonl", encoding="utf-8") as fh:
+            assert len([json.loads(line) for line in fh]) == 3
+
+        bad_name = client.post("/scrape/batch", json={"items": items, "name": "../x"}, headers=KEY)
+        assert bad_name.status_code == 400
+        assert client.post("/scrape/batch", json={"items": []}, headers=KEY).status_code == 400
+    finally:
+        api_app_module.app.dependency_overrides.clear()
+
+
+def test_scrape_batch_outputs_are_namespaced_per_api_key(monkeypatch, tmp_path):
+    monkeypatch.setattr(api_settings, "SINK_DIR", str(tmp_path))
+    monkeypatch.setattr(api_app_module.api_facade, "scrape_service", ScrapeService(FakeProvider()))
+    limiter = RateLimiter({"k1": KeyQuota(), "k2": KeyQuota()}, KeyQuota())
+    api_app_module.app.dependency_overrides[get_rate_limiter] = lambda: limiter
+    try:
+        client = TestClient(api_app_module.app)
+        body = {"items": [{"url": "https://example.com/", "selectors": {"t": "h1"}}], "name": "job"}
+
+        assert client.post("/scrape/batch", json=body).status_code == 403
+        assert not any(tmp_path.iterdir())
+
+        first = client.post("/scrape/batch", json=body, headers=KEY)
+        second = client.post("/scrape/batch", json=body, headers={"X-API-Key": "k2"})
+        assert first.status_code == second.status_code == 200
+        # only the relative file name is returned, never a server path
+        assert first.json()["name"] == "job.jsonl"
+        assert "path" not in first.json()
+        for key in ("k1", "k2"):
+            lines = (tmp_path / key_namespace(key) / "job.jsonl").read_text().splitlines()
+            assert len(lines) == 1
+        assert "k1" not in {p.name for p in tmp_path.iterdir()}
+    finally:
+        api_app_module.app.dependency_overrides.clear()
+
+
+def test_scrape_batch_charges_a_token_per_item_and_fetched_bytes(monkeypatch, tmp_path):
+    monkeypatch.setattr(api_settings, "SINK_DIR", str(tmp_path))
+    monkeypatch.setattr(api_app_module.api_facade, "scrape_service", ScrapeService(FakeProvider()))
+    limiter = RateLimiter({"k1": KeyQuota(rate=0.001, burst=5, daily_bytes=10**6)}, KeyQuota())
+    api_app_module.app.dependency_overrides[get_rate_limiter] = lambda: limiter
+    try:
+        client = TestClient(api_app_module.app)
+        items = [{"url": f"https://example.com/{i}", "selectors": {"t": "h1"}} for i in range(3)]
+
+        resp = client.post("/scrape/batch", json={"items": items, "name": "job1"}, headers=KEY)
+        assert resp.status_code == 200
+        assert resp.headers["X-RateLimit-Remaining"] == "2"
+        # "<h1>https://example.com/N</h1>" per item, not the summary size
+        fetched = sum(len(f"<h1>https://example.com/{i}</h1>") for i in range(3))
+        assert resp.json()["bytes"] == fetched
+        assert resp.headers["X-RateLimit-Bytes-Remaining"] == str(10**6 - fetched)
+
+        # 2 tokens left: a 3-item batch is refused without taking any
+        refused = client.post("/scrape/batch", json={"items": items, "name": "job2"}, headers=KEY)
+        assert refused.status_code == 429
+        assert not (tmp_path / key_namespace("k1") / "job2.jsonl").exists()
+        one = client.post("/scrape/batch", json={"items": items[:1], "name": "job3"}, headers=KEY)
+        assert one.status_code == 200
+
+        fresh = RateLimiter({"k1": KeyQuota(rate=0.001, burst=5)}, KeyQuota())
+        api_app_module.app.dependency_overrides[get_rate_limiter] = lambda: fresh
+        too_big = [items[0]] * 6
+        assert client.post("/scrape/batch", json={"items": too_big}, headers=KEY).status_code == 400
+    finally:
+        api_app_module.app.dependency_overrides.clear()
+
+
+def test_scrape_batch_reports_failed_sink_writes(monkeypatch, tmp_path):
+    from src.adapters.sinks.jsonl_sink import JsonlSink
+
+    def broken_write(self, rows):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(api_settings, "SINK_DIR", str(tmp_path))
+    monkeypatch.setattr(api_app_module.api_facade, "scrape_service", ScrapeService(FakeProvider()))
+    monkeypatch.setattr(JsonlSink, "_write_batch", broken_write)
+    limiter = RateLimiter({"k1": KeyQuota()}, KeyQuota())
+    api_app_module.app.dependency_overrides[get_rate_limiter] = lambda: limiter
+    try:
+        client = TestClient(api_app_module.app)
+        body = {"items": [{"url": "https://example.com/", "selectors": {"t": "h1"}}], "name": "job"}
+        resp = client.post("/scrape/batch", json=body, headers=KEY)
+        assert resp.status_code == 500
+        assert "written" not in resp.json()
+    finally:
+        api_app_module.app.dependency_overrides.clear()
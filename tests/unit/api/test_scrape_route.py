@@ -24,3 +24,39 @@ def test_scrape_route_calls_facade(monkeypatch):
     body = resp.json()
     assert body["url"] == "https://example.com"
     assert body["data"]["title"] == ["X"]
+
+
+def test_scrape_route_accepts_selector_specs_and_rejects_invalid(monkeypatch):
+    from src.application import api_app as api_app_module
+    from src.domain.scrape import ScrapeResult
+
+    seen = {}
+
+    async def fake_scrape(req):
+        seen["selectors"] = req.selectors
+        return ScrapeResult(url=req.url, data={"cards": [{"t": "X"}]})
+
+    monkeypatch.setattr(api_app_module.api_facade, "scrape", fake_scrape)
+    client = TestClient(api_app_module.app)
+    spec = {"selector": ".card", "fields": {"t": "h2", "u": {"selector": "a", "attr": "href"}}}
+
+    resp = client.post("/scrape", json={"url": "https://example.com", "selectors": {"cards": spec}})
+    assert resp.status_code == 200
+    assert resp.json()["data"] == {"cards": [{"t": "X"}]}
+    assert seen["selectors"]["cards"]["fields"]["u"] == {
+        "selector": "a",
+        "attr": "href",
+        "many": True,
+    }
+
+    bad = {"selector": "a", "extract": "attr"}
+    resp = client.post("/scrape", json={"url": "https://example.com", "selectors": {"x": bad}})
+    assert resp.status_code == 422
+
+    # malformed CSS is rejected before any fetch, at any nesting level
+    seen.clear()
+    nested_bad = {"selector": ".card", "fields": {"t": "h2[", "u": {"selector": "a"}}}
+    for selectors in ({"x": "a["}, {"x": nested_bad}):
+        resp = client.post("/scrape", json={"url": "https://example.com", "selectors": selectors})
+        assert resp.status_code == 422
+    assert seen == {}
@@ -0,0 +1,123 @@
+import io
+import json
+
+from src.application.cli import Checkpoint, build_parser, read_requests, run
+from src.domain.exceptions import ScrapeError
+from src.domain.scrape import ScrapeResult
+
+
+def _args(*extra):
+    return build_parser().parse_args(["-", *extra])
+
+
+def test_read_requests_jsonl_and_csv():
+    args = _args("--selectors", '{"t": "h1"}')
+    jsonl = io.StringIO(
+        '{"url": "https://a", "selectors": {"p": ".p"}, "timeout": 3}\n'
+        '"https://b"\n'
+        "not json\n"
+    )
+    rows = list(read_requests(jsonl, "jsonl", args))
+    assert rows[0][1].selectors == {"p": ".p"} and rows[0][1].timeout == 3
+    assert rows[1][1].url == "https://b" and rows[1][1].selectors == {"t": "h1"}
+    assert isinstance(rows[2][1], str) and rows[2][1].startswith("invalid input")
+
+    csv_input = io.StringIO("url,title,respect_robots\nhttps://c,h1,false\n,h1,\n")
+    rows = list(read_requests(csv_input, "csv", _args()))
+    assert rows[0][1].selectors == {"title": "h1"}
+    assert rows[0][1].respect_robots is False
+    assert "missing url" in rows[1][1]
+
+
+def test_checkpoint_tracks_out_of_order_rows(tmp_path):
+    path = str(tmp_path / "ckpt")
+    checkpoint = Checkpoint(path)
+    for line in (0, 2, 3):
+        checkpoint.mark(line)
+    checkpoint.save()
+
+    loaded = Checkpoint.load(path)
+    assert loaded.next == 1 and loaded.done == {2, 3}
+    assert loaded.is_done(0) and not loaded.is_done(1) and loaded.is_done(3)
+
+
+class FakeFacade:
+    def __init__(self):
+        self.urls = []
+
+    async def scrape(self, request):
+        self.urls.append(request.url)
+        if request.url.endswith("bad"):
+            raise ScrapeError("boom", status_code=500)
+        return ScrapeResult(url=request.url, data={"t": [request.url]})
+
+
+async def test_run_writes_results_and_resumes(tmp_path):
+    urls = ["https://x/1", "https://x/bad", "https://x/3", "https://x/4"]
+    source = "".join(json.dumps(u) + "\n" for u in urls)
+    args = _args("--selectors", '{"t": "h1"}')
+    checkpoint = Checkpoint(str(tmp_path / "ckpt"))
+    checkpoint.mark(0)
+    checkpoint.mark(3)
+
+    out = io.StringIO()
+    facade = FakeFacade()
+    stats = await run(
+        read_requests(io.StringIO(source), "jsonl", args),
+        out,
+        facade,
+        concurrency=2,
+        checkpoint=checkpoint,
+    )
+
+    assert sorted(facade.urls) == ["https://x/3", "https://x/bad"]
+    assert (stats.ok, stats.failed, stats.skipped) == (1, 1, 2)
+    rows = {r["line"]: r for r in map(json.loads, out.getvalue().splitlines())}
+    assert rows[1]["error"] == "boom" and rows[1]["status_code"] == 500
+    assert rows[2]["data"] == {"t": ["https://x/3"]}
+    assert Checkpoint.load(checkpoint.path).next == 4
+    assert stats.summary()["latency_ms"]["p50"] >= 0
+
+
+class HtmlProvider:
+    async def fetch(self, url, headers=None, timeout=None, respect_robots=True):
+        return "<h1>ok</h1>"
+
+
+async def test_run_records_unexpected_row_errors_and_continues():
+    from src.application.facade import ApplicationFacade
+    from src.domain.scrape_service import ScrapeService
+
+    rows_in = [
+        {"url": "https://x/1", "selectors": {"t": "h1"}},
+        {"url": "https://x/2", "selectors": {"t": "a["}},
+        {"url": "https://x/3", "selectors": {"t": "h1"}},
+    ]
+    source = "".join(json.dumps(r) + "\n" for r in rows_in)
+    facade = ApplicationFacade("p", "test", scrape_service=ScrapeService(HtmlProvider()))
+    out = io.StringIO()
+
+    stats = await run(read_requests(io.StringIO(source), "jsonl", _args()), out, facade, concurrency=2)
+
+    assert (stats.ok, stats.failed) == (2, 1)
+    rows = {r["line"]: r for r in map(json.loads, out.getvalue().splitlines())}
+    assert "invalid CSS selector" in rows[1]["error"]
+    assert rows[2]["data"] == {"t": ["ok"]}
+
+
+async def test_run_survives_unexpected_exceptions_from_the_facade():
+    class BrokenFacade(FakeFacade):
+        async def scrape(self, request):
+            if request.url.endswith("2"):
+                raise RuntimeError("parser exploded")
+            return await super().scrape(request)
+
+    source = "".join(json.dumps(f"https://x/{i}") + "\n" for i in range(1, 4))
+    out = io.StringIO()
+    args = _args("--selectors", '{"t": "h1"}')
+
+    stats = await run(read_requests(io.StringIO(source), "jsonl", args), out, BrokenFacade(), concurrency=2)
+
+    assert (stats.ok, stats.failed) == (2, 1)
+    rows = {r["line"]: r for r in map(json.loads, out.getvalue().splitlines())}
+    assert rows[1] == {"line": 1, "url": "https://x/2", "data": None, "error": "RuntimeError: parser exploded"}
@@ -0,0 +1,17 @@
+from src.adapters.http.resilient_provider import ResilientScrapeProvider
+from src.adapters.http.scrape_provider_http import HttpxScrapeProvider
+from src.application.facade import ApplicationFacade
+from src.domain.scrape_service import ScrapeService
+
+
+async def test_warmup_creates_pooled_client_through_wrappers_and_aclose_releases_it():
+    http = HttpxScrapeProvider(pooled=True)
+    service = ScrapeService(ResilientScrapeProvider(http))
+    facade = ApplicationFacade("p", "test", scrape_service=service)
+
+    await facade.warmup(["div.price > span", "a[href]"])
+    client = http._client
+    assert client is not None and not client.is_closed
+
+    await facade.aclose()
+    assert client.is_closed and http._client is None
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from src.application.monitor_scheduler import MonitorScheduler
+from src.domain.exceptions import ScrapeError
+from src.domain.monitor import Monitor
+from src.domain.scrape_service import ScrapeService
+
+
+class FakeProvider:
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.calls = 0
+
+    async def fetch(self, url: str, headers=None, timeout=None, respect_robots: bool = True):
+        page = self.pages[min(self.calls, len(self.pages) - 1)]
+        self.calls += 1
+        if isinstance(page, Exception):
+            raise page
+        return page
+
+
+class CountingService(ScrapeService):
+    def __init__(self, provider):
+        super().__init__(provider=provider)
+        self.extract_calls = 0
+
+    def extract(self, content, selectors):
+        self.extract_calls += 1
+        return super().extract(content, selectors)
+
+
+def _monitor(**kwargs):
+    return Monitor(
+        id="m1", url="https://example.com", selectors={"title": "h1", "p": ".p"}, interval=60, **kwargs
+    )
+
+
+async def test_unchanged_body_skips_parsing_and_only_deltas_are_emitted():
+    page1 = "<h1>A</h1><span class='p'>1</span>"
+    page2 = "<h1>A</h1><span class='p'>2</span>"
+    service = CountingService(FakeProvider([page1, page1, page2]))
+    scheduler = MonitorScheduler(service)
+    monitor = scheduler.add(_monitor())
+
+    first = await scheduler.check(monitor)
+    assert first.initial and set(first.changes) == {"title", "p"}
+
+    assert await scheduler.check(monitor) is None
+    assert service.extract_calls == 1
+
+    delta = await scheduler.check(monitor)
+    assert delta.changes == {"p": {"added": ["2"], "removed": ["1"], "value": ["2"]}}
+    assert monitor.checks == 3 and monitor.changes == 2
+
+
+async def test_body_change_without_data_change_emits_nothing():
+    service = ScrapeService(FakeProvider(["<h1>A</h1><i>x</i>", "<h1>A</h1><i>y</i>"]))
+    scheduler = MonitorScheduler(service)
+    monitor = scheduler.add(_monitor())
+
+    await scheduler.check(monitor)
+    assert await scheduler.check(monitor) is None
+
+
+async def test_fetch_errors_are_counted():
+    scheduler = MonitorScheduler(ScrapeService(FakeProvider([ScrapeError("boom")])))
+    monitor = scheduler.add(_monitor())
+    assert await scheduler.check(monitor) is None
+    assert monitor.errors == 1
+
+
+async def test_callbacks_and_subscriptions_receive_events():
+    scheduler = MonitorScheduler(ScrapeService(FakeProvider(["<h1>A</h1>"])))
+    received = []
+
+    async def callback(event):
+        received.append(event)
+
+    scheduler.add_callback(callback)
+    other = scheduler.subscription("other")
+    mine = scheduler.subscription("m1")
+
+    scheduler.add(_monitor())
+    scheduler.start()
+    try:
+        event = await mine.get(timeout=1)
+    finally:
+        await scheduler.stop()
+        mine.close()
+        other.close()
+
+    assert event is not None and event.monitor_id == "m1"
+    assert received == [event]
+    assert await other.get(timeout=0.01) is None
+
+
+async def test_slow_subscriber_drops_oldest_events():
+    scheduler = MonitorScheduler(
+        ScrapeService(FakeProvider(["<h1>1</h1>", "<h1>2</h1>", "<h1>3</h1>"])),
+        subscriber_queue_size=2,
+    )
+    subscription = scheduler.subscription()
+    monitor = scheduler.add(_monitor())
+    for _ in range(3):
+        await scheduler.check(monitor)
+
+    first = await subscription.get(timeout=0)
+    assert first.changes["title"]["value"] == ["2"]
+    subscription.close()
@@ -0,0 +1,29 @@
+from src.domain.monitor import diff_data, fingerprint
+
+
+def test_fingerprint_ignores_key_order():
+    assert fingerprint({"a": ["1"], "b": ["2"]}) == fingerprint({"b": ["2"], "a": ["1"]})
+    assert fingerprint({"a": ["1"]}) != fingerprint({"a": ["2"]})
+
+
+def test_diff_data_reports_only_changed_keys():
+    old = {"title": ["T"], "price": ["$1", "$2"], "gone": ["x"]}
+    new = {"title": ["T"], "price": ["$2", "$3"], "links": ["/a"]}
+
+    changes = diff_data(old, new)
+
+    assert set(changes) == {"price", "gone", "links"}
+    assert changes["price"] == {"added": ["$3"], "removed": ["$1"], "value": ["$2", "$3"]}
+    assert changes["gone"] == {"added": [], "removed": ["x"], "value": []}
+    assert changes["links"]["added"] == ["/a"]
+
+
+def test_diff_data_counts_repeated_items():
+    changes = diff_data({"tag": ["a", "a"]}, {"tag": ["a"]})
+    assert changes["tag"]["removed"] == ["a"]
+    assert diff_data(None, {"k": ["v"]})["k"]["added"] == ["v"]
+
+
+def test_diff_data_handles_single_values_and_records():
+    changes = diff_data({"title": "A", "cards": [{"t": "x"}]}, {"title": "B", "cards": [{"t": "x"}]})
+    assert changes == {"title": {"added": ["B"], "removed": ["A"], "value": "B"}}
@@ -36,3 +36,34 @@ async def test_scrape_service_extracts_selectors(monkeypatch):
     assert "title" in result.data and result.data["title"] == ["Title Example"]
     assert "price" in result.data and result.data["price"] == ["$9.99"]
     assert "links" in result.data and any("Link A" in s for s in result.data["links"]) 
+
+
+@pytest.mark.asyncio
+async def test_scrape_service_parses_in_parser_pool():
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        svc = ScrapeService(provider=FakeProvider("<h1>Pooled</h1>"), parser_pool=pool)
+        result = await svc.scrape(ScrapeRequest(url="https://example.com", selectors={"t": "h1"}))
+    assert result.data == {"t": ["Pooled"]}
+
+
+def test_extract_data_tears_the_document_down():
+    import gc
+
+    from src.domain.scrape_service import extract_data
+
+    html = "<html><body>" + "<div class='c'><h2>T</h2><a href='/x'>l</a></div>" * 200
+    extract_data(html, {"t": "h2"})
+    gc.collect()
+    gc.disable()
+    try:
+        fields = {"href": {"selector": "a", "attr": "href"}}
+        data = extract_data(
+            html, {"t": "h2", "rec": {"selector": ".c", "fields": fields}}
+        )
+        # no parse tree left for the cyclic collector to find
+        assert gc.collect() == 0
+    finally:
+        gc.enable()
+    assert len(data["t"]) == 200 and data["rec"][0] == {"href": ["/x"]}
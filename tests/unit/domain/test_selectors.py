@@ -0,0 +1,131 @@
+import pytest
+
+from src.domain.scrape_service import extract_data
+from src.domain.selectors import apply_spec, apply_specs, parse_selectors, parse_spec
+
+HTML = """
+<html><body>
+  <div class="card" data-id="1">
+    <h2>First</h2><span class="price">$1</span>
+    <a href="/one" class="link primary">More</a>
+    <img src="/1.png">
+  </div>
+  <div class="card" data-id="2">
+    <h2>Second</h2>
+    <a href="/two">More</a>
+  </div>
+  <p id="intro">Hello <b>world</b></p>
+</body></html>
+"""
+
+
+def test_attributes_and_html_in_one_call():
+    data = extract_data(
+        HTML,
+        {
+            "titles": "h2",
+            "links": {"selector": "a", "attr": "href"},
+            "classes": {"selector": "a.primary", "attr": "class"},
+            "images": {"selector": "img", "extract": "attr", "attr": "src"},
+            "intro_html": {"selector": "#intro", "extract": "html", "many": False},
+            "intro_outer": {"selector": "#intro", "extract": "outer_html"},
+            "missing": {"selector": ".nope", "many": False},
+        },
+    )
+    assert data["titles"] == ["First", "Second"]
+    assert data["links"] == ["/one", "/two"]
+    assert data["classes"] == ["link primary"]
+    assert data["images"] == ["/1.png"]
+    assert data["intro_html"] == "Hello <b>world</b>"
+    assert data["intro_outer"] == ['<p id="intro">Hello <b>world</b></p>']
+    assert data["missing"] is None
+
+
+def test_records_are_scoped_to_each_parent_match():
+    data = extract_data(
+        HTML,
+        {
+            "cards": {
+                "selector": ".card",
+                "fields": {
+                    "id": {"attr": "data-id", "many": False},
+                    "title": {"selector": "h2", "many": False},
+                    "price": {"selector": ".price", "many": False},
+                    "links": {"selector": "a", "attr": "href"},
+                },
+            }
+        },
+    )
+    assert data["cards"] == [
+        {"id": "1", "title": "First", "price": "$1", "links": ["/one"]},
+        {"id": "2", "title": "Second", "price": None, "links": ["/two"]},
+    ]
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        "",
+        {"selector": "a", "extract": "attr"},
+        {"selector": "a", "extract": "json"},
+        {"selector": "a", "nope": 1},
+        {"selector": "a", "fields": {}},
+        "a[",
+        {"selector": "div >"},
+        {"selector": ".card", "fields": {"t": "h2", "u": {"selector": "a[href"}}},
+        42,
+    ],
+)
+def test_invalid_specs_are_rejected(raw):
+    with pytest.raises(ValueError):
+        parse_spec(raw)
+
+
+def test_malformed_css_is_reported_as_value_error():
+    with pytest.raises(ValueError, match=r"invalid CSS selector 'a\['"):
+        parse_selectors({"links": "a["})
+
+
+def test_parse_selectors_names_the_bad_key():
+    with pytest.raises(ValueError, match="'links'"):
+        parse_selectors({"ok": "h1", "links": {"selector": "a", "extract": "attr"}})
+
+
+def test_single_pass_matches_per_selector_evaluation():
+    from bs4 import BeautifulSoup
+
+    selectors = {
+        "tag": "h2",
+        "class": ".card",
+        "id": "#intro",
+        "compound": "div.card > a.link",
+        "descendant": "div[data-id='2'] a",
+        "list": "h2, .price, #intro",
+        "overlap": "a, .link",
+        "universal": "*",
+        "negation": ":not(div):not(html)",
+        "nth": "div:nth-of-type(2) h2",
+        "scope": ":scope > html > body > p",
+        "quirks_case": "A.LINK",
+        "missing": ".nope",
+        "first": {"selector": "h2", "many": False},
+        "first_missing": {"selector": ".nope", "many": False},
+        "hrefs": {"selector": "a", "attr": "href"},
+        "records": {
+            "selector": ".card",
+            "fields": {"title": "h2", "id": {"attr": "data-id"}},
+        },
+    }
+    specs = parse_selectors(selectors)
+    soup = BeautifulSoup(HTML, "html.parser")
+    assert apply_specs(soup, specs) == {
+        name: apply_spec(soup, spec) for name, spec in specs.items()
+    }
+
+
+def test_single_pass_stops_early_when_only_first_matches_are_needed():
+    from bs4 import BeautifulSoup
+
+    html = "<h1>a</h1>" + "<p>x</p>" * 100 + "<h1>b</h1>"
+    specs = parse_selectors({"h": {"selector": "h1", "many": False}})
+    assert apply_specs(BeautifulSoup(html, "html.parser"), specs) == {"h": "a"}
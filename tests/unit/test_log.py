@@ -0,0 +1,62 @@
+import json
+import logging
+import queue
+import threading
+
+from src.log import (
+    DeferredQueueHandler,
+    JsonFormatter,
+    SamplingFilter,
+    _parse_sampling,
+    request_id_ctx_var,
+)
+
+
+def _record(name="fastapi_backend", level=logging.INFO, msg="hello %s", **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, ("world",), None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_includes_request_id_and_extras():
+    token = request_id_ctx_var.set("abc123")
+    try:
+        line = JsonFormatter().format(_record(duration_ms=12.5))
+    finally:
+        request_id_ctx_var.reset(token)
+
+    payload = json.loads(line)
+    assert payload["message"] == "hello world"
+    assert payload["request_id"] == "abc123"
+    assert payload["duration_ms"] == 12.5
+
+
+def test_deferred_handler_captures_request_id_before_thread_hop():
+    q: queue.Queue = queue.Queue()
+    handler = DeferredQueueHandler(q)
+    token = request_id_ctx_var.set("rid-1")
+    try:
+        handler.handle(_record())
+    finally:
+        request_id_ctx_var.reset(token)
+
+    seen = []
+    t = threading.Thread(target=lambda: seen.append(q.get().request_id))
+    t.start()
+    t.join()
+    assert seen == ["rid-1"]
+
+
+def test_sampling_filter_drops_info_but_keeps_warnings():
+    f = SamplingFilter(_parse_sampling("fastapi_backend=0"))
+    assert not f.filter(_record())
+    assert not f.filter(_record(name="fastapi_backend.child"))
+    assert f.filter(_record(level=logging.WARNING))
+    assert f.filter(_record(name="other"))
+
+
+def test_sampling_filter_rate_limits_per_template():
+    f = SamplingFilter(max_per_second=2)
+    kept = [f.filter(_record()) for _ in range(10)]
+    assert kept.count(True) == 2
+    assert f.filter(_record(msg="another template %s"))
@@ -0,0 +1,190 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from src.adapters.http.scrape_provider_http import HttpxScrapeProvider
+from src.domain.scrape import ScrapeRequest
+from src.domain.scrape_service import ScrapeService
+from src.log import request_id_ctx_var
+from src.tracing import (
+    BatchSpanExporter,
+    FileSpanSink,
+    OtlpHttpSpanSink,
+    Tracer,
+    otlp_payload,
+    tracer,
+)
+
+
+class ListSink:
+    def __init__(self):
+        self.spans = []
+
+    def write(self, spans):
+        self.spans.extend(spans)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def sink():
+    # api_app configures the global tracer on import: import it first
+    from src.application import api_app  # noqa: F401
+
+    sink = ListSink()
+    tracer.configure(BatchSpanExporter(sink, flush_interval=60), sample_rate=1.0)
+    yield sink
+    tracer.configure(None)
+
+
+def _flush():
+    tracer.exporter.flush()
+
+
+def _service():
+    async def handler(request):
+        if request.url.path == "/robots.txt":
+            return httpx.Response(200, text="User-agent: *\nAllow: /")
+        return httpx.Response(200, text="<html><h1>A</h1><h1>B</h1></html>")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return ScrapeService(HttpxScrapeProvider(client=client)), client
+
+
+@pytest.mark.asyncio
+async def test_scrape_records_phase_spans_linked_by_request_id(sink):
+    service, client = _service()
+    token = request_id_ctx_var.set("0123456789abcdef0123456789abcdef")
+    try:
+        result = await service.scrape(
+            ScrapeRequest(url="https://example.com/p", selectors={"h": "h1"})
+        )
+    finally:
+        request_id_ctx_var.reset(token)
+        await client.aclose()
+    assert result.data == {"h": ["A", "B"]}
+    _flush()
+
+    spans = {span.name: span for span in sink.spans}
+    assert set(spans) >= {"scrape", "fetch", "robots", "download", "parse", "extract"}
+    assert {span.trace_id for span in sink.spans} == {
+        "0123456789abcdef0123456789abcdef"
+    }
+    assert spans["scrape"].parent_id is None
+    assert spans["fetch"].parent_id == spans["scrape"].span_id
+    assert spans["robots"].parent_id == spans["fetch"].span_id
+    assert spans["parse"].parent_id == spans["scrape"].span_id
+    assert spans["extract"].attributes["selectors"] == 1
+    assert all(span.end_ns >= span.start_ns for span in sink.spans)
+
+
+@pytest.mark.asyncio
+async def test_unsampled_requests_record_nothing(sink):
+    tracer.sample_rate = 0.0
+    service, client = _service()
+    await service.scrape(ScrapeRequest(url="https://example.com/p", selectors={}))
+    await client.aclose()
+    _flush()
+    assert sink.spans == []
+
+
+def test_head_sampling_is_deterministic_per_trace_id():
+    sampler = Tracer(sample_rate=0.5)
+    ids = [f"{i:032x}" for i in range(2000)]
+    decisions = [sampler.sampled(trace_id) for trace_id in ids]
+    assert decisions == [sampler.sampled(trace_id) for trace_id in ids]
+    assert 800 < sum(decisions) < 1200
+
+
+def test_span_error_is_recorded(sink):
+    with pytest.raises(ValueError):
+        with tracer.span("work"):
+            raise ValueError("boom")
+    _flush()
+    assert sink.spans[0].error == "ValueError: boom"
+
+
+def test_exporter_batches_drops_when_full_and_writes_jsonl(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    exporter = BatchSpanExporter(
+        FileSpanSink(str(path)), max_batch=2, flush_interval=60, max_queue=3
+    )
+    local = Tracer(exporter)
+    for i in range(5):
+        with local.span("s", i=i):
+            pass
+    exporter.shutdown()
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    # the background thread may have flushed a full batch before the queue
+    # filled up; spans beyond max_queue are dropped otherwise
+    assert 3 <= len(rows) <= 5
+    assert rows[0]["name"] == "s" and rows[0]["parent_id"] is None
+
+
+def test_otlp_sink_posts_to_collector():
+    received = []
+
+    class Collector(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers["Content-Length"])
+            received.append((self.path, json.loads(self.rfile.read(length))))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Collector)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        local = Tracer(BatchSpanExporter(ListSink()))
+        spans = []
+        token = request_id_ctx_var.set("custom-request-id")
+        try:
+            span = local.start_span("root", {"n": 1})
+            local.end_span(span)
+            spans.append(span)
+        finally:
+            request_id_ctx_var.reset(token)
+        endpoint = f"http://127.0.0.1:{server.server_port}/v1/traces"
+        OtlpHttpSpanSink(endpoint, service_name="svc").write(spans)
+    finally:
+        server.shutdown()
+
+    path, body = received[0]
+    assert path == "/v1/traces"
+    otlp_span = body["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert otlp_span["name"] == "root"
+    # non-hex request ids are hashed into a 16-byte trace id
+    assert len(otlp_span["traceId"]) == 32
+    assert {"key": "request_id", "value": {"stringValue": "custom-request-id"}} in (
+        otlp_span["attributes"]
+    )
+    assert body == otlp_payload(spans, "svc")
+
+
+def test_middleware_opens_root_span_with_request_id(sink, monkeypatch):
+    from src.application import api_app as api_app_module
+
+    service, _ = _service()
+    monkeypatch.setattr(api_app_module.api_facade, "scrape_service", service)
+    client = TestClient(api_app_module.app)
+    resp = client.post(
+        "/scrape",
+        json={"url": "https://example.com/p", "selectors": {"h": "h1"}},
+        headers={"X-Request-ID": "rid-trace-1"},
+    )
+    assert resp.status_code == 200
+    _flush()
+
+    spans = {span.name: span for span in sink.spans}
+    assert spans["http.request"].parent_id is None
+    assert spans["http.request"].attributes["status_code"] == 200
+    assert spans["facade.scrape"].parent_id == spans["http.request"].span_id
+    assert {span.trace_id for span in sink.spans} == {"rid-trace-1"}